@@ -0,0 +1,264 @@
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from custom_collections.array_set import ArraySet
+from custom_collections.list_set import ListSet
+from finite_fields.field_array import FieldArray
+from finite_fields.finite_field import FiniteField
+from primitive_element_finders.dumb_primitive_element_finder import DumbPrimitiveElementFinder
+from primitive_element_finders.fast_primitive_finder import FastPrimitiveFinder
+from utils.memo_cache import shared_memo_cache
+from wrappers.disable_logging import disable_logging
+
+DEFAULT_SIZES = ((2, 4), (2, 8), (3, 5), (5, 3), (2, 12), (2, 16))
+
+FORMAT_VERSION = 1
+
+# Entry points that must come up quickly, and the import budget of each of them in seconds.
+STARTUP_MODULES = {"gui.finite_fields_app": 1.0, "cli.build_fields": 1.0}
+# Heavy optional dependencies that must not be imported by entry points.
+LAZY_MODULES = ("sympy", "formation")
+
+_STARTUP_SCRIPT = """
+import json, sys, time, tracemalloc
+trace = sys.argv[2] == "trace"
+if trace:
+    tracemalloc.start()
+start = time.perf_counter()
+__import__(sys.argv[1])
+seconds = time.perf_counter() - start
+peak = tracemalloc.get_traced_memory()[1] if trace else 0
+print(json.dumps({"seconds": seconds, "peak_bytes": peak, "modules": sorted(sys.modules)}))
+"""
+
+
+def _primitive(p, n):
+    return FastPrimitiveFinder(p, n).find_first()
+
+
+def _fast_find_first(p, n):
+    finder = FastPrimitiveFinder(p, n)
+    return finder.find_first
+
+
+def _fast_find_next(p, n):
+    finder = FastPrimitiveFinder(p, n)
+    finder.find_first()
+    return finder.find_next
+
+
+def _fast_find_all(p, n):
+    return FastPrimitiveFinder(p, n).find_all
+
+
+def _dumb_find_first(p, n):
+    return DumbPrimitiveElementFinder(p, n, batch_size=256).find_first
+
+
+def _dumb_find_all(p, n):
+    return DumbPrimitiveElementFinder(p, n, batch_size=256).find_all
+
+
+def _field_elements(view):
+    def setup(p, n):
+        field = FiniteField(p, n, _primitive(p, n))
+        return lambda: field.get_elements(view=view)
+    return setup
+
+
+def _field_matrices(p, n):
+    return FiniteField(p, n, _primitive(p, n)).get_elements(view='matrix').array.copy()
+
+
+def _list_set_add(p, n):
+    matrices = _field_matrices(p, n)
+
+    def run():
+        s = ListSet()
+        for matrix in matrices:
+            s.add(matrix)
+        return s
+    return run
+
+
+def _list_set_contains(p, n):
+    matrices = _field_matrices(p, n)
+    s = ListSet()
+    for matrix in matrices:
+        s.add(matrix)
+    return lambda: all(matrix in s for matrix in matrices)
+
+
+def _list_set_remove(p, n):
+    matrices = _field_matrices(p, n)
+
+    def run():
+        s = ListSet()
+        for matrix in matrices:
+            s.add(matrix)
+        for matrix in matrices:
+            s.remove(matrix)
+    return run
+
+
+def _array_set_add(p, n):
+    matrices = _field_matrices(p, n)
+    return lambda: ArraySet(matrices)
+
+
+def _array_set_contains(p, n):
+    matrices = _field_matrices(p, n)
+    s = ArraySet(matrices)
+    return lambda: bool(s.contains_many(matrices).all())
+
+
+def _field_array(operation):
+    def setup(p, n):
+        field = FiniteField(p, n, _primitive(p, n))
+        a = FieldArray.random(field, (256, 256), seed=1)
+        b = FieldArray.random(field, (256, 256), seed=2)
+        a[:1] @ b[:, :1]  # builds arithmetic tables of the field outside of the measurement
+        return lambda: operation(a, b)
+    return setup
+
+
+# name -> (largest field order the benchmark is run for, setup(p, n) returning the measured callable).
+# Setup is not measured.
+BENCHMARKS = {
+    "fast_primitive_finder.find_first": (1 << 24, _fast_find_first),
+    "fast_primitive_finder.find_next": (1 << 24, _fast_find_next),
+    "fast_primitive_finder.find_all": (1 << 20, _fast_find_all),
+    "dumb_primitive_element_finder.find_first": (1 << 12, _dumb_find_first),
+    "dumb_primitive_element_finder.find_all": (1 << 10, _dumb_find_all),
+    "finite_field.get_elements.matrix": (1 << 20, _field_elements('matrix')),
+    "finite_field.get_elements.vector": (1 << 20, _field_elements('vector')),
+    "list_set.add": (1 << 16, _list_set_add),
+    "list_set.contains": (1 << 16, _list_set_contains),
+    "list_set.remove": (1 << 16, _list_set_remove),
+    "array_set.add": (1 << 20, _array_set_add),
+    "array_set.contains": (1 << 20, _array_set_contains),
+    "field_array.matmul": (1 << 16, _field_array(lambda a, b: a @ b)),
+    "field_array.rank": (1 << 16, _field_array(lambda a, b: a.rank())),
+}
+
+
+def measure(setup, p, n, repeat=3):
+    """
+    Measures a benchmark. Time is the best of repeat runs, every run gets a fresh setup
+    and an empty shared memo cache, so runs do not reuse tables built by previous ones.
+    Peak memory is measured by tracemalloc in one more run, since tracing slows the code down.
+    :return: dict with seconds (best), mean_seconds and peak_bytes.
+    """
+    times = []
+    for _ in range(repeat):
+        run = setup(p, n)
+        shared_memo_cache().clear()
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    run = setup(p, n)
+    shared_memo_cache().clear()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(times), "mean_seconds": sum(times) / len(times), "peak_bytes": peak}
+
+
+def measure_startup(module: str, repeat=3):
+    """
+    Measures import time of a module in fresh interpreters, best of repeat runs.
+    Peak memory is measured by tracemalloc in one more run.
+    :return: dict with seconds (best), mean_seconds, peak_bytes and sorted list of imported modules.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def run(mode):
+        output = subprocess.run([sys.executable, "-c", _STARTUP_SCRIPT, module, mode], cwd=root,
+                                capture_output=True, text=True, check=True).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    runs = [run("time") for _ in range(repeat)]
+    times = [r["seconds"] for r in runs]
+    return {"seconds": min(times), "mean_seconds": sum(times) / len(times),
+            "peak_bytes": run("trace")["peak_bytes"], "modules": runs[0]["modules"]}
+
+
+@disable_logging
+def run_suite(sizes=DEFAULT_SIZES, names=None, repeat=3, progress=None, startup=False):
+    """
+    Runs every benchmark for every field size it is enabled for.
+    :param sizes: iterable of (p, n).
+    :param names: names of benchmarks to run, every benchmark by default.
+    :param repeat: number of timed runs.
+    :param progress: optional callable(result), called after every measured benchmark.
+    :param startup: also measure import time of STARTUP_MODULES, reported with p = n = 0.
+    :return: dict with environment description and list of results.
+    """
+    names = list(BENCHMARKS) if names is None else list(names)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(unknown)}")
+    results = []
+    for p, n in sizes:
+        for name in names:
+            max_order, setup = BENCHMARKS[name]
+            if p ** n > max_order:
+                continue
+            result = {"name": name, "p": p, "n": n, **measure(setup, p, n, repeat)}
+            results.append(result)
+            if progress is not None:
+                progress(result)
+    if startup:
+        for module in STARTUP_MODULES:
+            measured = measure_startup(module, repeat)
+            del measured["modules"]
+            result = {"name": f"startup.{module}", "p": 0, "n": 0, **measured}
+            results.append(result)
+            if progress is not None:
+                progress(result)
+    return {
+        "version": FORMAT_VERSION,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, time_tolerance=0.25, memory_tolerance=0.25, min_seconds=1e-3):
+    """
+    Compares a report of run_suite with a baseline report.
+    A benchmark regressed when it is slower or uses more peak memory than the baseline
+    by more than given relative tolerance. Runs faster than min_seconds are too noisy to compare time.
+    :return: list of dicts with name, p, n, metric, baseline, current and ratio for every regression.
+    """
+    baseline_results = {(r["name"], r["p"], r["n"]): r for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        previous = baseline_results.get((result["name"], result["p"], result["n"]))
+        if previous is None:
+            continue
+        for metric, tolerance in (("seconds", time_tolerance), ("peak_bytes", memory_tolerance)):
+            if metric == "seconds" and max(previous[metric], result[metric]) < min_seconds:
+                continue
+            if result[metric] > previous[metric] * (1 + tolerance):
+                regressions.append({
+                    "name": result["name"], "p": result["p"], "n": result["n"], "metric": metric,
+                    "baseline": previous[metric], "current": result[metric],
+                    "ratio": result[metric] / previous[metric] if previous[metric] else float("inf"),
+                })
+    return regressions
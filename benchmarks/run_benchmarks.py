@@ -0,0 +1,61 @@
+"""
+Runs the benchmark suite and writes results to a JSON file.
+
+usage:
+
+python -m benchmarks.run_benchmarks --sizes 2^8 3^5 2^16 --output bench.json
+python -m benchmarks.run_benchmarks --output new.json --baseline bench.json
+
+With --baseline the exit code is 1 if any benchmark regressed.
+"""
+import argparse
+import json
+import sys
+
+from benchmarks.benchmark_suite import BENCHMARKS, DEFAULT_SIZES, compare, run_suite
+from utils.field_size import parse_field_size
+
+
+def parse_size(text):
+    try:
+        return parse_field_size(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks of finite field construction.")
+    parser.add_argument("--sizes", nargs="+", type=parse_size, default=list(DEFAULT_SIZES),
+                        help="field sizes of form p^n")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument("--startup", action="store_true", help="also measure import time of entry points")
+    parser.add_argument("--repeat", type=int, default=3, help="number of timed runs")
+    parser.add_argument("--output", default="bench_output.json", help="file for results")
+    parser.add_argument("--baseline", help="results to compare with")
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    parser.add_argument("--memory-tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    def print_result(result):
+        print(f"{result['name']:45} {result['p']}^{result['n']:<4} "
+              f"{result['seconds'] * 1000:12.2f} ms {result['peak_bytes'] / 2 ** 20:10.2f} MiB")
+
+    report = run_suite(args.sizes, args.only, args.repeat, progress=print_result, startup=args.startup)
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    if args.baseline is None:
+        return 0
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    regressions = compare(report, baseline, args.time_tolerance, args.memory_tolerance)
+    for r in regressions:
+        print(f"REGRESSION {r['name']} {r['p']}^{r['n']} {r['metric']}: "
+              f"{r['baseline']:.6g} -> {r['current']:.6g} (x{r['ratio']:.2f})")
+    if not regressions:
+        print("No regressions.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
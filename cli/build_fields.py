@@ -0,0 +1,138 @@
+"""
+Headless batch builder of finite fields, it does not import tkinter or formation.
+
+usage:
+
+python -m cli.build_fields 2^16 3^10 7^5 --output-dir fields --processes 4
+
+For every field size a directory <output-dir>/<p>^<n> is created with
+    primitive.npy   - primitive element (companion matrix of a primitive polynomial),
+    elements.npy    - table of powers A^1, ..., A^(p^n - 1) in vector (p^n - 1, n) or matrix (p^n - 1, n, n) view,
+                      elements.arrow or elements.parquet with --format (needs pyarrow),
+    primitives.npy  - every primitive element, only with --all-primitives,
+    trace.json      - spans and counters in Chrome trace format, only with --trace,
+and timings of every stage are written to <output-dir>/summary.json.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from finite_fields.export import write_table
+from finite_fields.field_cache import FieldCache
+from finite_fields.finite_field import FiniteField
+from primitive_element_finders.fast_primitive_finder import FastPrimitiveFinder
+from utils import instrumentation
+from utils.field_size import parse_field_size
+from utils.logger import logger
+
+
+def build_field_files(p: int, n: int, output_dir: str, view: str = 'vector', all_primitives: bool = False,
+                      cache_dir: str = None, chunk_size: int = 1 << 16, trace: bool = False,
+                      file_format: str = 'npy') -> dict:
+    """
+    Finds a primitive element of GF(p^n), builds the field and writes results to output_dir/<p>^<n>.
+    Element table is streamed to the file by chunks (see export.write_table),
+    so memory usage does not grow with the field.
+    :param cache_dir: directory of FieldCache, the cache is not used if None. With a cache the field table
+        is built in memory and stored there before it is written, so later runs load it instead of stepping powers.
+    :param file_format: format of the element table, 'npy' | 'arrow' | 'parquet'.
+    :param trace: record instrumentation spans and write them to trace.json of the field directory.
+    :return: dict with p, n, directory and timings in seconds.
+    """
+    directory = os.path.join(output_dir, f"{p}^{n}")
+    os.makedirs(directory, exist_ok=True)
+    if trace:
+        with instrumentation.tracing(os.path.join(directory, "trace.json")):
+            return _build_field_files(p, n, directory, view, all_primitives, cache_dir, chunk_size, file_format)
+    return _build_field_files(p, n, directory, view, all_primitives, cache_dir, chunk_size, file_format)
+
+
+def _build_field_files(p, n, directory, view, all_primitives, cache_dir, chunk_size, file_format):
+    cache = FieldCache(cache_dir) if cache_dir is not None else None
+    timings = {}
+
+    start = time.perf_counter()
+    finder = FastPrimitiveFinder(p, n, cache=cache)
+    primitive = finder.find_first()
+    timings["find_first"] = time.perf_counter() - start
+    np.save(os.path.join(directory, "primitive.npy"), primitive)
+
+    start = time.perf_counter()
+    field = FiniteField(p, n, primitive, cache=cache)
+    if cache is not None:
+        field.build()
+    write_table(field, os.path.join(directory, f"elements.{file_format}"), view, file_format, chunk_size)
+    timings["build_field"] = time.perf_counter() - start
+
+    if all_primitives:
+        start = time.perf_counter()
+        primitives = finder.find_all()
+        np.save(os.path.join(directory, "primitives.npy"), primitives)
+        timings["find_all"] = time.perf_counter() - start
+
+    logger.info(f"Field {p}^{n} is written to {directory}.")
+    return {"p": p, "n": n, "directory": directory, "timings": timings}
+
+
+def build_fields(sizes, output_dir: str, processes: int = None, **options) -> list:
+    """
+    Builds fields of given sizes concurrently in a process pool.
+    :param sizes: iterable of (p, n).
+    :param options: keyword arguments of build_field_files.
+    :return: list of results of build_field_files in order of sizes;
+        failed fields have "error" instead of "timings".
+    """
+    sizes = list(sizes)
+    results = [None] * len(sizes)
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {executor.submit(build_field_files, p, n, output_dir, **options): i
+                   for i, (p, n) in enumerate(sizes)}
+        for future in as_completed(futures):
+            i = futures[future]
+            p, n = sizes[i]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                logger.error(f"Building field {p}^{n} failed: {e}")
+                results[i] = {"p": p, "n": n, "error": repr(e)}
+    return results
+
+
+def main(argv=None):
+    def field_size(text):
+        try:
+            return parse_field_size(text)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+
+    parser = argparse.ArgumentParser(description="Builds finite fields without GUI.")
+    parser.add_argument("sizes", nargs="+", type=field_size, help="field sizes of form p^n or p^n as a number")
+    parser.add_argument("--output-dir", default="fields", help="directory for results")
+    parser.add_argument("--processes", type=int, default=None, help="size of the process pool")
+    parser.add_argument("--view", choices=("vector", "matrix"), default="vector", help="view of element table")
+    parser.add_argument("--all-primitives", action="store_true", help="also find every primitive element")
+    parser.add_argument("--cache-dir", default=None,
+                        help="directory of the cache of primitive elements and field tables, not used by default")
+    parser.add_argument("--format", choices=("npy", "arrow", "parquet"), default="npy",
+                        help="format of element tables, arrow and parquet need pyarrow")
+    parser.add_argument("--trace", action="store_true", help="write trace.json of every field")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    start = time.perf_counter()
+    results = build_fields(args.sizes, args.output_dir, args.processes, view=args.view,
+                           all_primitives=args.all_primitives, cache_dir=args.cache_dir, trace=args.trace,
+                           file_format=args.format)
+    summary = {"total_seconds": time.perf_counter() - start, "fields": results}
+    with open(os.path.join(args.output_dir, "summary.json"), "w") as file:
+        json.dump(summary, file, indent=2)
+    return 1 if any("error" in result for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+import numpy as np
+
+from utils import instrumentation
+
+
+class ArraySet:
+    """
+    Set of equally shaped integer ndarrays stored in insertion order.
+
+    Elements are kept as rows of one contiguous array, and membership is answered
+    by an open-addressing hash index (linear probing) that is also a NumPy array,
+    so bulk operations are vectorized and there is no per-element Python object.
+
+    Setlike behaviors:
+        for x in S:          # Yields read-only views of stored elements.
+        if x in S:
+        S.add(x)
+        S.add_many(xs)       # Vectorized, xs is an array of elements.
+        S.contains_many(xs)  # Vectorized, returns bool array.
+        S.remove(x)
+        len(S)
+
+    Listlike behaviors use internal positions:
+        S[3], S[-1]   # Returns a view of an element.
+        S[10:20]      # Returns a view of a stacked array.
+        S.array       # View of every element as one (len(S), *element_shape) array.
+        S.index(x)
+    """
+
+    __EMPTY = -1
+    __DELETED = -2
+    __MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+    def __init__(self, items=None, element_shape: tuple = None, dtype=np.int32, capacity: int = 16):
+        self.__dtype = np.dtype(dtype)
+        self.__element_shape = tuple(element_shape) if element_shape is not None else None
+        self.__width = None
+        self.__data: np.ndarray = None
+        self.__size = 0
+        self.__deleted = 0
+        self.__capacity = max(16, capacity)
+        self.__index = np.full(self.__table_size(self.__capacity), self.__EMPTY, dtype=np.int64)
+        self.__multipliers: np.ndarray = None
+        if self.__element_shape is not None:
+            self.__init_storage(self.__element_shape)
+        if items is not None:
+            if isinstance(items, ArraySet):
+                items = items.array
+            self.add_many(items)
+
+    @property
+    def element_shape(self):
+        return self.__element_shape
+
+    @property
+    def dtype(self):
+        return self.__dtype
+
+    @property
+    def array(self) -> np.ndarray:
+        """ Read-only view of all elements as one array of shape (len(S), *element_shape). """
+        if self.__data is None:
+            return np.empty((0,), dtype=self.__dtype)
+        view = self.__data[:self.__size].reshape((self.__size,) + self.__element_shape)
+        view.flags.writeable = False
+        return view
+
+    @property
+    def nbytes(self):
+        data_bytes = 0 if self.__data is None else self.__data.nbytes
+        return data_bytes + self.__index.nbytes
+
+    def add(self, item):
+        self.add_many(np.asarray(item)[np.newaxis])
+
+    def append(self, item):
+        """ Same as add(), for compatibility with ListSet. """
+        self.add(item)
+
+    def add_many(self, items) -> np.ndarray:
+        """
+        Adds every element of items that is not in the set yet, keeping the order of first occurrence.
+        :param items: array of shape (m, *element_shape).
+        :return: np.ndarray of internal positions of every given element.
+        """
+        with instrumentation.span("array_set.add_many"):
+            return self.__add_many(items)
+
+    def __add_many(self, items) -> np.ndarray:
+        keys = self.__as_keys(items)
+        if len(keys) == 0:
+            return np.empty(0, dtype=np.int64)
+        hashes = self.__hash(keys)
+        positions = self.__find(keys, hashes)
+        new = np.flatnonzero(positions < 0)
+        if len(new) == 0:
+            return positions
+
+        representatives = self.__first_occurrences(keys[new], hashes[new])
+        unique = np.flatnonzero(representatives == np.arange(len(new)))
+        rank = np.zeros(len(new), dtype=np.int64)
+        rank[unique] = np.arange(len(unique))
+        positions[new] = self.__size + rank[representatives]
+
+        unique = new[unique]
+        self.__reserve(self.__size + len(unique))
+        self.__data[self.__size:self.__size + len(unique)] = keys[unique]
+        self.__insert(hashes[unique], np.arange(self.__size, self.__size + len(unique)))
+        self.__size += len(unique)
+        instrumentation.count("array_set.inserted", len(unique))
+        return positions
+
+    def contains_many(self, items) -> np.ndarray:
+        """
+        Vectorized membership test.
+        :param items: array of shape (m, *element_shape).
+        :return: bool np.ndarray of shape (m,).
+        """
+        return self.index_many(items) >= 0
+
+    def index_many(self, items) -> np.ndarray:
+        """
+        Vectorized search of internal positions.
+        :param items: array of shape (m, *element_shape).
+        :return: np.ndarray of positions, -1 for elements that are not in the set.
+        """
+        keys = self.__as_keys(items)
+        if len(keys) == 0 or self.__size == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+        return self.__find(keys, self.__hash(keys))
+
+    def index(self, item) -> int:
+        position = int(self.index_many(np.asarray(item)[np.newaxis])[0])
+        if position < 0:
+            raise ValueError(f"{item} is not in ArraySet")
+        return position
+
+    def remove(self, item):
+        """
+        Remove an element from a set; it must be a member.
+        The last element is moved to the freed position.
+
+        If the element is not a member, raise a KeyError.
+        """
+        keys = self.__as_keys(np.asarray(item)[np.newaxis])
+        hashes = self.__hash(keys)
+        position = int(self.__find(keys, hashes)[0])
+        if position < 0:
+            raise KeyError(item)
+        self.__index[self.__slot_of(hashes[0], position)] = self.__DELETED
+        self.__deleted += 1
+        last = self.__size - 1
+        if position != last:
+            last_hash = self.__hash(self.__data[last:last + 1])[0]
+            self.__index[self.__slot_of(last_hash, last)] = position
+            self.__data[position] = self.__data[last]
+        self.__size -= 1
+
+    def pop(self, i=-1):
+        """ Remove by internal position. """
+        item = np.array(self[i])
+        self.remove(item)
+        return item
+
+    def copy(self):
+        return ArraySet(self, element_shape=self.__element_shape, dtype=self.__dtype)
+
+    def __contains__(self, item):
+        if self.__element_shape is not None and np.shape(item) != self.__element_shape:
+            return False
+        return bool(self.contains_many(np.asarray(item)[np.newaxis])[0])
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return self.array[item]
+        if item < 0:
+            item += self.__size
+        if not 0 <= item < self.__size:
+            raise IndexError("ArraySet index out of range")
+        return self.array[item]
+
+    def __iter__(self):
+        array = self.array
+        for i in range(len(array)):
+            yield array[i]
+
+    def __len__(self):
+        return self.__size
+
+    def __iadd__(self, items):
+        """ self += items """
+        self.add_many(np.asarray(list(items)) if not isinstance(items, np.ndarray) else items)
+        return self
+
+    def _str_body(self):
+        return ", ".join(repr(item) for item in self)
+
+    def __repr__(self):
+        return "ArraySet([" + self._str_body() + "])"
+
+    def __str__(self):
+        if self:
+            return "{" + self._str_body() + "}"
+        else:
+            return "ArraySet()"
+
+    def __init_storage(self, element_shape):
+        self.__element_shape = tuple(element_shape)
+        self.__width = int(np.prod(self.__element_shape, dtype=np.int64))
+        self.__data = np.empty((self.__capacity, self.__width), dtype=self.__dtype)
+        rng = np.random.default_rng(self.__width)
+        self.__multipliers = rng.integers(1, 2 ** 63, size=self.__width, dtype=np.uint64) | np.uint64(1)
+
+    def __as_keys(self, items) -> np.ndarray:
+        items = np.asarray(items)
+        if self.__element_shape is None:
+            if len(items) == 0:
+                return np.empty((0, 0), dtype=self.__dtype)
+            self.__init_storage(items.shape[1:])
+        if items.shape[1:] != self.__element_shape:
+            raise ValueError(f"Expected elements of shape {self.__element_shape}, got {items.shape[1:]}")
+        return np.ascontiguousarray(items, dtype=self.__dtype).reshape(len(items), self.__width)
+
+    def __hash(self, keys: np.ndarray) -> np.ndarray:
+        h = (keys.astype(np.uint64) * self.__multipliers).sum(axis=1, dtype=np.uint64)
+        h ^= h >> np.uint64(29)
+        h *= self.__MULTIPLIER
+        h ^= h >> np.uint64(32)
+        return h
+
+    @staticmethod
+    def __first_occurrences(keys, hashes):
+        """ For every key returns the index of its first occurrence in keys. """
+        representatives = np.arange(len(keys))
+        order = np.argsort(hashes, kind='stable')
+        sorted_hashes = hashes[order]
+        collided = np.zeros(len(keys), dtype=bool)
+        same = sorted_hashes[1:] == sorted_hashes[:-1]
+        collided[1:] |= same
+        collided[:-1] |= same
+        involved = np.sort(order[collided])
+        if len(involved) > 0:
+            _, first, inverse = np.unique(keys[involved], axis=0, return_index=True, return_inverse=True)
+            representatives[involved] = involved[first[inverse.reshape(-1)]]
+        return representatives
+
+    @staticmethod
+    def __table_size(capacity):
+        return 1 << (2 * capacity - 1).bit_length()
+
+    def __mask(self):
+        return np.uint64(len(self.__index) - 1)
+
+    def __find(self, keys, hashes):
+        positions = np.full(len(keys), -1, dtype=np.int64)
+        pending = np.arange(len(keys))
+        slots = (hashes & self.__mask()).astype(np.int64)
+        while len(pending) > 0:
+            occupants = self.__index[slots]
+            stored = occupants >= 0
+            equal = np.zeros(len(pending), dtype=bool)
+            equal[stored] = (self.__data[occupants[stored]] == keys[pending[stored]]).all(axis=1)
+            positions[pending[equal]] = occupants[equal]
+            probing = ~equal & (occupants != self.__EMPTY)
+            pending = pending[probing]
+            slots = (slots[probing] + 1) & (len(self.__index) - 1)
+        return positions
+
+    def __insert(self, hashes, positions):
+        """ Inserts positions of keys that are known to be absent. """
+        slots = (hashes & self.__mask()).astype(np.int64)
+        while len(positions) > 0:
+            free = self.__index[slots] < 0
+            candidates = np.flatnonzero(free)
+            _, winners = np.unique(slots[candidates], return_index=True)
+            winners = candidates[winners]
+            self.__deleted -= int(np.count_nonzero(self.__index[slots[winners]] == self.__DELETED))
+            self.__index[slots[winners]] = positions[winners]
+            rest = np.ones(len(positions), dtype=bool)
+            rest[winners] = False
+            positions = positions[rest]
+            hashes = hashes[rest]
+            slots = (slots[rest] + 1) & (len(self.__index) - 1)
+
+    def __slot_of(self, hash_value, position):
+        slot = int(hash_value & self.__mask())
+        while self.__index[slot] != position:
+            slot = (slot + 1) & (len(self.__index) - 1)
+        return slot
+
+    def __reserve(self, size):
+        if size > self.__capacity:
+            self.__capacity = max(size, 2 * self.__capacity)
+            data = np.empty((self.__capacity, self.__width), dtype=self.__dtype)
+            data[:self.__size] = self.__data[:self.__size]
+            self.__data = data
+        if 2 * (size + self.__deleted) > len(self.__index):
+            self.__index = np.full(self.__table_size(self.__capacity), self.__EMPTY, dtype=np.int64)
+            self.__deleted = 0
+            if self.__size > 0:
+                self.__insert(self.__hash(self.__data[:self.__size]), np.arange(self.__size))
@@ -1,5 +1,7 @@
 import numpy as np
 
+from utils import instrumentation
+
 
 class ListSet(list):
     """
@@ -46,6 +48,7 @@ class ListSet(list):
         if item not in self.idx_of:
             super(ListSet, self).append(item)
             self.idx_of[item] = len(self) - 1
+            instrumentation.count("list_set.inserted")
 
     def append(self, item):
         """
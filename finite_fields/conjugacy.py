@@ -0,0 +1,115 @@
+import numpy as np
+
+from finite_fields.finite_field import FiniteField
+from finite_fields.parallel_build import share_array, shared_view
+from utils.memo_cache import MemoCache, array_key
+from wrappers.traced import traced
+
+
+def primitive_class_representatives(p: int, n: int) -> np.ndarray:
+    """
+    Exponents k coprime to p^n - 1, one per Frobenius conjugacy class {k, k·p, k·p^2, ...} mod p^n - 1.
+    α^k for these k are pairwise non-conjugate primitive elements, so their minimal polynomials
+    are exactly the primitive polynomials of degree n.
+    :return: sorted np.ndarray of the smallest exponent of every class.
+    """
+    order = p ** n - 1
+    k = np.arange(1, order + 1, dtype=np.int64) % order
+    k = k[np.gcd(k, order) == 1]
+    smallest = k.copy()
+    conjugate = k.copy()
+    for _ in range(n - 1):
+        conjugate = conjugate * p % order
+        np.minimum(smallest, conjugate, out=smallest)
+    return np.sort(k[k == smallest])
+
+
+def frobenius_orbit_sizes(exponents: np.ndarray, p: int, n: int) -> np.ndarray:
+    """
+    Sizes of Frobenius orbits {k, k·p, k·p^2, ...} mod p^n - 1 of exponents k: the smallest d >= 1
+    with k·p^d = k. α^k has d conjugates and lies in the subfield GF(p^d), so d divides n.
+    """
+    order = p ** n - 1
+    exponents = np.asarray(exponents, dtype=np.int64) % order
+    sizes = np.zeros(exponents.shape, dtype=np.int64)
+    conjugate = exponents
+    for d in range(1, n + 1):
+        conjugate = conjugate * p % order
+        sizes[(sizes == 0) & (conjugate == exponents)] = d
+    return sizes
+
+
+@traced("conjugacy.minimal_polynomials")
+def minimal_polynomials(field: FiniteField, exponents: np.ndarray) -> np.ndarray:
+    """
+    Minimal polynomials of nonzero elements A^k over GF(p), computed as products of (x - A^(k·p^i))
+    over the d distinct conjugates (d is the Frobenius orbit size of k) with vectorized field arithmetic
+    (log and Zech tables of the field).
+    :param exponents: np.ndarray of exponents k.
+    :return: np.ndarray of shape (len(exponents), n + 1) of coefficients, lowest degree first;
+        a polynomial of degree d < n has zeros after its leading coefficient.
+    """
+    p, n, order = field.p, field.n, field.order - 1
+    exponents = np.asarray(exponents, dtype=np.int64)
+    sizes = frobenius_orbit_sizes(exponents, p, n)
+    antilog = field.antilog_table
+    # Coefficients are indices of field elements, index 1 is the unit.
+    coefficients = np.zeros((len(exponents), n + 1), dtype=np.int64)
+    coefficients[:, 0] = 1
+    conjugate = exponents % order
+    for degree in range(1, n + 1):
+        rows = np.flatnonzero(sizes >= degree)
+        if len(rows) == 0:
+            break
+        minus_root = field.neg(antilog[conjugate[rows]])
+        shifted = coefficients[rows, :degree]
+        updated = np.zeros((len(rows), degree + 1), dtype=np.int64)
+        updated[:, 1:] = shifted
+        updated[:, :degree] = field.add(updated[:, :degree], field.mul(minus_root[:, np.newaxis], shifted))
+        coefficients[rows, :degree + 1] = updated
+        conjugate = conjugate * p % order
+    if np.any(coefficients >= p):
+        raise ArithmeticError("Minimal polynomial has coefficients outside of GF(p)")
+    return coefficients
+
+
+_worker_field: FiniteField = None
+
+
+def _init_worker(p, n, primitive_matrix, log_tables):
+    global _worker_field
+    # The field is not built in workers: its log tables are views of the shared tables of the parent.
+    log_tables = tuple(shared_view(table) for table in log_tables)
+    memo_cache = MemoCache(max_bytes=sum(table.nbytes for table in log_tables))
+    memo_cache.put(array_key("log_tables", p, n, primitive_matrix), log_tables)
+    _worker_field = FiniteField(p, n, primitive_matrix, memo_cache=memo_cache)
+
+
+def _minimal_polynomials_shard(exponents):
+    return minimal_polynomials(_worker_field, exponents)
+
+
+def all_primitive_polynomials(field: FiniteField, primitive_matrix: np.ndarray, workers: int = 1,
+                              shards_per_worker: int = 4) -> np.ndarray:
+    """
+    Every primitive polynomial of degree n over GF(p), obtained from one primitive element A:
+    minimal polynomials of A^k for one k of every conjugacy class (see primitive_class_representatives).
+    With workers > 1 classes are split into shards that are processed by a process pool,
+    the antilog, log and Zech tables of the field are copied into shared memory once and read by every worker.
+    :param field: field built from primitive_matrix.
+    :return: np.ndarray of shape (φ(p^n - 1) / n, n + 1) of coefficients, lowest degree first,
+        in lexicographic order (the order of primitive_polynomials.primitive_polys).
+    """
+    representatives = primitive_class_representatives(field.p, field.n)
+    if workers > 1 and len(representatives) > workers:
+        from concurrent.futures import ProcessPoolExecutor
+
+        log_tables = tuple(share_array(table) for table in (field.antilog_table, field.log_table, field.zech_table))
+        shards = np.array_split(representatives, workers * shards_per_worker)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(field.p, field.n, primitive_matrix, log_tables)) as executor:
+            polynomials = np.concatenate(list(executor.map(_minimal_polynomials_shard, shards)))
+    else:
+        polynomials = minimal_polynomials(field, representatives)
+    keys = polynomials[:, :-1].dot(field.p ** np.arange(field.n, dtype=np.int64))
+    return polynomials[np.argsort(keys, kind='stable')]
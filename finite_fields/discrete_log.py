@@ -0,0 +1,65 @@
+import math
+
+from utils.number_theory import factorize
+from wrappers.traced import traced
+
+# Fields of at most this many nonzero elements are tabulated for discrete logarithms,
+# bigger ones are answered by Pohlig–Hellman unless their tables are already built.
+TABULATION_LIMIT = 1 << 24
+
+
+def power(g, exponent: int, mul, identity):
+    """ g^exponent by repeated squaring with given multiplication. """
+    result = identity
+    while exponent > 0:
+        if exponent & 1:
+            result = mul(result, g)
+        g = mul(g, g)
+        exponent >>= 1
+    return result
+
+
+def baby_step_giant_step(h, g, order: int, mul, identity) -> int:
+    """
+    Finds x in [0, order) with g^x = h in a cyclic group of given order generated by g.
+    Elements must be hashable. Takes about 2·sqrt(order) multiplications and sqrt(order) memory.
+    :raise ValueError: if h is not a power of g.
+    """
+    m = math.isqrt(order - 1) + 1
+    baby_steps = {}
+    current = identity
+    for j in range(m):
+        baby_steps.setdefault(current, j)
+        current = mul(current, g)
+    giant_step = power(g, (order - m) % order, mul, identity)
+    gamma = h
+    for i in range(m):
+        j = baby_steps.get(gamma)
+        if j is not None:
+            return (i * m + j) % order
+        gamma = mul(gamma, giant_step)
+    raise ValueError("Element is not a power of the generator")
+
+
+@traced("discrete_log.pohlig_hellman")
+def pohlig_hellman(h, g, order: int, mul, identity) -> int:
+    """
+    Finds x in [0, order) with g^x = h, where g generates a cyclic group of given order.
+    The problem is split by the factorization of order into subgroups of prime order q,
+    each solved by baby_step_giant_step, and the answers are combined by the Chinese remainder theorem.
+    """
+    x, modulus = 0, 1
+    for q, e in factorize(order) if order > 1 else ():
+        q_e = q ** e
+        g_i = power(g, order // q_e, mul, identity)
+        h_i = power(h, order // q_e, mul, identity)
+        gamma = power(g_i, q_e // q, mul, identity)
+        x_i = 0
+        for k in range(e):
+            shifted = mul(power(g_i, (q_e - x_i) % q_e, mul, identity), h_i)
+            digit = baby_step_giant_step(power(shifted, q ** (e - 1 - k), mul, identity), gamma, q, mul, identity)
+            x_i += digit * q ** k
+        # x = x (mod modulus), x = x_i (mod q^e)
+        x += modulus * ((x_i - x) * pow(modulus, -1, q_e) % q_e)
+        modulus *= q_e
+    return x % order
@@ -0,0 +1,124 @@
+"""
+Export of field tables to other libraries and to disk.
+
+Element tables map to Arrow as fixed-size lists: a FixedSizeList<int32>[n] column (n·n for 'matrix' view,
+words of uint64 for 'packed' view) whose child values are the contiguous table itself,
+so to_arrow() shares memory with the built table. pyarrow is optional and is imported only here,
+by functions that need it.
+
+write_table() streams a table to .npy, Arrow IPC (.arrow) or Parquet (.parquet) file by chunks
+of iter_elements(), so fields larger than memory are written without building the whole table.
+"""
+import os
+
+import numpy as np
+
+from finite_fields.finite_field import FiniteField
+from finite_fields.packed import words_per_element
+from utils import instrumentation
+
+FORMATS = {".npy": "npy", ".arrow": "arrow", ".parquet": "parquet"}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("Arrow and Parquet export needs pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def element_width(field: FiniteField, view: str) -> int:
+    """ Number of values per element in the given view. """
+    if view in ('coefficients', 'vector'):
+        return field.n
+    if view == 'matrix':
+        return field.n * field.n
+    if view == 'packed':
+        return words_per_element(field.p, field.n)
+    raise ValueError(f"Unknown view {view}")
+
+
+def _arrow_type(field: FiniteField, view: str):
+    pa = _pyarrow()
+    values = pa.uint64() if view == 'packed' else pa.int32()
+    return pa.list_(values, element_width(field, view))
+
+
+def _schema(field: FiniteField, view: str):
+    pa = _pyarrow()
+    metadata = {"p": str(field.p), "n": str(field.n), "view": view}
+    return pa.schema([pa.field("element", _arrow_type(field, view), nullable=False)], metadata=metadata)
+
+
+def _arrow_array(field: FiniteField, view: str, table: np.ndarray):
+    pa = _pyarrow()
+    list_type = _arrow_type(field, view)
+    values = np.ascontiguousarray(table).reshape(-1)
+    child = pa.Array.from_buffers(list_type.value_type, len(values), [None, pa.py_buffer(values)])
+    return pa.FixedSizeListArray.from_arrays(child, list_size=list_type.list_size)
+
+
+def to_arrow(field: FiniteField, view: str = 'coefficients'):
+    """
+    The table of elements as pyarrow.FixedSizeListArray. It shares memory with the table
+    for 'coefficients', 'matrix' and 'packed' views (see FiniteField.as_array()); 'vector' view is a copy,
+    because its columns are reversed.
+    """
+    return _arrow_array(field, view, field.as_array(view))
+
+
+def _chunks(field: FiniteField, view: str, chunk_size: int):
+    if view == 'coefficients':
+        for chunk in field.iter_elements('vector', chunk_size=chunk_size):
+            yield np.ascontiguousarray(chunk[:, ::-1])
+    else:
+        yield from field.iter_elements(view, chunk_size=chunk_size)
+
+
+def write_table(field: FiniteField, path: str, view: str = 'vector', file_format: str = None,
+                chunk_size: int = 1 << 16) -> int:
+    """
+    Writes elements A^1, ..., A^(p^n - 1) to a file by chunks, memory usage is bounded by chunk_size.
+    .npy file holds an array of shape (p^n - 1, n), (p^n - 1, n, n) or (p^n - 1, words) (see as_array()),
+    Arrow and Parquet files have one column "element" of fixed-size lists and p, n and view in metadata.
+    :param view: 'coefficients' | 'vector' | 'matrix' | 'packed'.
+    :param file_format: 'npy' | 'arrow' | 'parquet', by default inferred from the extension of path.
+    :return: number of written elements.
+    """
+    if file_format is None:
+        file_format = FORMATS.get(os.path.splitext(path)[1].lower())
+        if file_format is None:
+            raise ValueError(f"Unknown format of {path}, use one of {', '.join(FORMATS)}")
+    if file_format not in FORMATS.values():
+        raise ValueError(f"Unknown format {file_format}")
+    width = element_width(field, view)
+    written = 0
+    with instrumentation.span("export.write_table", p=field.p, n=field.n, view=view, format=file_format):
+        if file_format == 'npy':
+            shape = (field.order - 1,) + ((field.n, field.n) if view == 'matrix' else (width,))
+            dtype = np.uint64 if view == 'packed' else np.int32
+            table = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+            for chunk in _chunks(field, view, chunk_size):
+                table[written:written + len(chunk)] = chunk
+                written += len(chunk)
+            table.flush()
+            del table
+            return written
+
+        pa = _pyarrow()
+        schema = _schema(field, view)
+        if file_format == 'arrow':
+            writer = pa.ipc.new_file(path, schema)
+        else:
+            import pyarrow.parquet
+            writer = pyarrow.parquet.ParquetWriter(path, schema)
+        with writer:
+            for chunk in _chunks(field, view, chunk_size):
+                batch = pa.record_batch([_arrow_array(field, view, chunk)], schema=schema)
+                if file_format == 'arrow':
+                    writer.write_batch(batch)
+                else:
+                    writer.write_batch(batch, row_group_size=len(chunk))
+                written += len(chunk)
+    return written
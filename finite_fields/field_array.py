@@ -0,0 +1,428 @@
+import numpy as np
+
+from finite_fields.finite_field import FiniteField
+from finite_fields.log_tables import decode_indices, radix_weights
+from utils import instrumentation
+from utils.memo_cache import array_key
+
+# Temporary arrays of matmul and row reduction are limited to about this many elements.
+BLOCK_ELEMENTS = 1 << 22
+# Multiplication matrices of all elements are tabulated while they have at most this many entries.
+MULTIPLICATION_MATRICES_LIMIT = 1 << 24
+# Number of columns eliminated together by row_reduce().
+PANEL_COLUMNS = 64
+
+
+class _Tables:
+    """
+    Lookup tables of FieldArray arithmetic, built from log, antilog and Zech tables of a field.
+
+    Logarithms are shifted so that zero has the logarithm zero_log = 2·(p^n - 1). A sum of two logarithms
+    then is a logarithm of the product when it is below zero_log, and means zero otherwise,
+    so products are looked up without branches in antilog extended to [0, zero_log].
+    """
+    def __init__(self, field: FiniteField):
+        self.p = field.p
+        self.order = field.order - 1
+        self.zero_log = 2 * self.order
+        dtype = np.int32 if 2 * self.zero_log < 1 << 31 else np.int64
+        self.log = field.log_table.astype(dtype)
+        self.log[0] = self.zero_log
+        antilog = field.antilog_table
+        self.antilog = np.concatenate((antilog, antilog, [0])).astype(dtype)
+        self.zech = field.zech_table.astype(dtype)
+        self.minus_one_log = 0 if self.p == 2 else self.order // 2
+        self.n = field.n
+        self.weights = radix_weights(self.p, self.n)
+        self.matrices = None
+        if self.p < 256 and field.order * self.n * self.n <= MULTIPLICATION_MATRICES_LIMIT:
+            # matrices[a] is the matrix of x -> a·x over GF(p): column c holds coordinates of a·e_c,
+            # where the basis vector e_c is the element of index p^c (it is α^c only for companion matrices).
+            basis_logs = self.log[self.weights]
+            products = self.antilog[self.mul_logs(self.log[:, np.newaxis], basis_logs)]
+            self.matrices = np.ascontiguousarray(decode_indices(products, self.p, self.n).transpose(0, 2, 1),
+                                                 dtype=np.uint8)
+
+    @property
+    def nbytes(self):
+        matrices = 0 if self.matrices is None else self.matrices.nbytes
+        return self.log.nbytes + self.antilog.nbytes + self.zech.nbytes + matrices
+
+    def mul_logs(self, log_a, log_b):
+        """ Logarithms of products, zero_log for zero; log_a and log_b must be broadcastable. """
+        s = log_a + log_b
+        np.minimum(s, self.zero_log, out=s)
+        return s
+
+    def add_logs(self, log_a, log_b):
+        """ Logarithms of sums by Zech logarithms: log(α^a + α^b) = a + zech(b - a). """
+        log_a, log_b = np.broadcast_arrays(self.__reduce(log_a), self.__reduce(log_b))
+        zech = self.zech[(log_b - log_a) % self.order]
+        result = log_a + zech
+        result %= self.order
+        result[zech < 0] = self.zero_log
+        result = np.where(log_a == self.zero_log, log_b, result)
+        return np.where(log_b == self.zero_log, log_a, result)
+
+    def __reduce(self, logs):
+        return np.where(logs >= self.zero_log, self.zero_log, logs % self.order)
+
+    def add(self, a, b):
+        if self.p == 2:
+            # Indices are coordinate bits, so addition in characteristic 2 is XOR.
+            return np.bitwise_xor(a, b)
+        return self.antilog[self.add_logs(self.log[a], self.log[b])].astype(np.int64)
+
+    def sub(self, a, b):
+        if self.p == 2:
+            return np.bitwise_xor(a, b)
+        return self.antilog[self.add_logs(self.log[a], self.mul_logs(self.log[b], self.minus_one_log))] \
+            .astype(np.int64)
+
+    def mul(self, a, b):
+        return self.antilog[self.mul_logs(self.log[a], self.log[b])].astype(np.int64)
+
+    def matmul(self, a, b):
+        """
+        Matrix product of index matrices by BLAS on GF(p) coordinates: a is expanded into a block matrix
+        of multiplication matrices, b into columns of coordinate vectors, so coordinates of the product
+        are a float product of them reduced mod p. Float sums are exact, the inner dimension is split
+        into chunks small enough for that.
+        """
+        m, k = a.shape
+        columns = b.shape[1]
+        n, p = self.n, self.p
+        bound = n * (p - 1) ** 2
+        dtype = np.float32 if k * bound < 1 << 24 else np.float64
+        chunk = max(1, min(k, ((1 << 24 if dtype == np.float32 else 1 << 53) - 1) // bound))
+        vectors = decode_indices(b, p, n).transpose(0, 2, 1).astype(dtype).reshape(k * n, columns)
+        rows = max(1, min(m, BLOCK_ELEMENTS // (min(k, chunk) * n * n)))
+        result = np.empty((m, columns), dtype=np.int64)
+        for row in range(0, m, rows):
+            tile = a[row:row + rows]
+            coordinates = np.zeros((len(tile) * n, columns), dtype=np.int64)
+            for start in range(0, k, chunk):
+                expanded = self.matrices[tile[:, start:start + chunk]].transpose(0, 2, 1, 3)
+                expanded = expanded.reshape(len(tile) * n, -1).astype(dtype)
+                coordinates += (expanded @ vectors[start * n:(start + chunk) * n]).astype(np.int64)
+            coordinates %= p
+            result[row:row + rows] = np.tensordot(self.weights, coordinates.reshape(len(tile), n, columns), (0, 1))
+        return result
+
+    def sum_logs(self, logs, axis):
+        """ Sum of elements given by logarithms along axis, by pairwise Zech additions. """
+        logs = np.moveaxis(logs, axis, 0)
+        while len(logs) > 1:
+            if len(logs) % 2:
+                logs = np.concatenate((logs, np.full((1,) + logs.shape[1:], self.zero_log, dtype=logs.dtype)))
+            logs = self.add_logs(logs[0::2], logs[1::2])
+        return logs[0]
+
+
+def _tables(field: FiniteField) -> _Tables:
+    key = array_key("field_array_tables", field.p, field.n, field.primitive_matrix)
+    return field.memo_cache.get_or_create(key, lambda: _Tables(field))
+
+
+class FieldArray:
+    """
+    Array of elements of a finite field for vectorized arithmetic and linear algebra.
+
+    Elements are stored as their integer indices (see FiniteField: element with vector view
+    [c_(n-1), ..., c_0] has index sum(c_i * p^i)) in an np.ndarray of dtype int64.
+    Operators +, -, *, /, ** and unary - work elementwise with broadcasting, @ is matrix product.
+    Multiplication goes through log and antilog tables of the field, addition is XOR of indices
+    for p = 2 and goes through Zech logarithms otherwise.
+
+    Matrix product uses that multiplication by an element is a GF(p)-linear map: every element of
+    the left matrix is replaced by its n×n multiplication matrix (tabulated from the log tables),
+    so the product becomes one float matrix product (BLAS) of coordinates mod p, computed in row tiles
+    of at most about BLOCK_ELEMENTS elements. For fields too big for tabulated multiplication matrices,
+    products of a block of the inner dimension are looked up in log tables and summed with Zech logarithms.
+
+    row_reduce() brings a matrix to reduced row echelon form by blocked Gauss–Jordan elimination
+    whose updates are matrix products, and rank(), inv() and solve() are built on it.
+
+    Tables are shared through the memo cache of the field.
+    """
+    def __init__(self, field: FiniteField, indices):
+        indices = np.array(indices, dtype=np.int64)
+        if indices.size > 0 and (indices.min() < 0 or indices.max() >= field.order):
+            raise ValueError(f"Indices of elements of GF({field.p}^{field.n}) must be in [0, {field.order})")
+        self.__field = field
+        self.__indices = indices
+        self.__tables = None
+
+    @classmethod
+    def zeros(cls, field: FiniteField, shape):
+        return cls(field, np.zeros(shape, dtype=np.int64))
+
+    @classmethod
+    def ones(cls, field: FiniteField, shape):
+        return cls(field, np.ones(shape, dtype=np.int64))
+
+    @classmethod
+    def identity(cls, field: FiniteField, size: int):
+        return cls(field, np.eye(size, dtype=np.int64))
+
+    @classmethod
+    def random(cls, field: FiniteField, shape, seed=None):
+        return cls(field, np.random.default_rng(seed).integers(0, field.order, size=shape, dtype=np.int64))
+
+    @classmethod
+    def from_vectors(cls, field: FiniteField, vectors):
+        """ :param vectors: np.ndarray of shape (..., n) of elements in vector view. """
+        return cls(field, field.encode(vectors))
+
+    @property
+    def field(self) -> FiniteField:
+        return self.__field
+
+    @property
+    def indices(self) -> np.ndarray:
+        return self.__indices
+
+    @property
+    def shape(self):
+        return self.__indices.shape
+
+    @property
+    def ndim(self):
+        return self.__indices.ndim
+
+    @property
+    def T(self):
+        return self.__like(self.__indices.T)
+
+    def vectors(self) -> np.ndarray:
+        """ :return: np.ndarray of shape (*shape, n) of elements in vector view. """
+        return self.__field.decode(self.__indices)
+
+    def copy(self):
+        return self.__like(self.__indices.copy())
+
+    def __len__(self):
+        return len(self.__indices)
+
+    def __getitem__(self, item):
+        result = self.__indices[item]
+        return int(result) if np.ndim(result) == 0 else self.__like(result)
+
+    def __setitem__(self, key, value):
+        value = self.__operand(value)
+        self.__indices[key] = value
+
+    def __eq__(self, other):
+        return self.__indices == self.__operand(other)
+
+    def __ne__(self, other):
+        return self.__indices != self.__operand(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"FieldArray(GF({self.__field.p}^{self.__field.n}), {self.__indices!r})"
+
+    def __add__(self, other):
+        return self.__like(self.__get_tables().add(self.__indices, self.__operand(other)))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self.__like(self.__get_tables().sub(self.__indices, self.__operand(other)))
+
+    def __rsub__(self, other):
+        return self.__like(self.__get_tables().sub(self.__operand(other), self.__indices))
+
+    def __neg__(self):
+        return self.__like(self.__get_tables().sub(np.zeros_like(self.__indices), self.__indices))
+
+    def __mul__(self, other):
+        return self.__like(self.__get_tables().mul(self.__indices, self.__operand(other)))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        return self.__like(self.__field.div(self.__indices, self.__operand(other)))
+
+    def __rtruediv__(self, other):
+        return self.__like(self.__field.div(self.__operand(other), self.__indices))
+
+    def __pow__(self, exponent):
+        return self.__like(self.__field.pow(self.__indices, exponent))
+
+    def __matmul__(self, other):
+        if not isinstance(other, FieldArray):
+            other = self.__like(self.__operand(other))
+        if self.ndim != 2 or other.ndim != 2 or self.shape[1] != other.shape[0]:
+            raise ValueError(f"Cannot multiply matrices of shapes {self.shape} and {other.shape}")
+        with instrumentation.span("field_array.matmul", shape=[*self.shape, other.shape[1]]):
+            return self.__like(self.__matmul(self.__indices, self.__operand(other)))
+
+    def row_reduce(self, ncols: int = None):
+        """
+        Reduced row echelon form by Gauss–Jordan elimination.
+        :param ncols: only the first ncols columns are used as pivot columns (all by default).
+        :return: tuple (reduced FieldArray, list of pivot columns).
+        """
+        if self.ndim != 2:
+            raise ValueError("Row reduction needs a matrix")
+        with instrumentation.span("field_array.row_reduce", shape=list(self.shape)):
+            reduced, pivots = self.__row_reduce(self.__indices.copy(), self.shape[1] if ncols is None else ncols)
+        return self.__like(reduced), pivots
+
+    def rank(self) -> int:
+        return len(self.row_reduce()[1])
+
+    def inv(self):
+        """
+        Inverse of a square matrix (elementwise inverse is 1 / array).
+        :raise np.linalg.LinAlgError: if the matrix is singular.
+        """
+        if self.ndim != 2 or self.shape[0] != self.shape[1]:
+            raise ValueError("Only square matrices have inverses")
+        size = self.shape[0]
+        augmented = np.concatenate((self.__indices, np.eye(size, dtype=np.int64)), axis=1)
+        reduced, pivots = self.__like(augmented).row_reduce(ncols=size)
+        if len(pivots) < size:
+            raise np.linalg.LinAlgError("Singular matrix")
+        return reduced[:, size:]
+
+    def solve(self, b):
+        """
+        Solves self @ x = b for a square nonsingular matrix.
+        :param b: FieldArray or indices of shape (size,) or (size, k).
+        :raise np.linalg.LinAlgError: if the matrix is singular.
+        """
+        if self.ndim != 2 or self.shape[0] != self.shape[1]:
+            raise ValueError("Only square systems can be solved")
+        b = self.__operand(b)
+        columns = b.reshape(len(b), -1)
+        size = self.shape[0]
+        reduced, pivots = self.__like(np.concatenate((self.__indices, columns), axis=1)).row_reduce(ncols=size)
+        if len(pivots) < size:
+            raise np.linalg.LinAlgError("Singular matrix")
+        return self.__like(reduced.indices[:, size:].reshape(b.shape))
+
+    def __matmul(self, a, b):
+        tables = self.__get_tables()
+        if tables.matrices is not None:
+            return tables.matmul(a, b)
+        m, k = a.shape
+        columns = b.shape[1]
+        log_a, log_b = tables.log[a], tables.log[b]
+        rows = max(1, min(m, BLOCK_ELEMENTS // max(1, columns * min(k, 8))))
+        inner = max(1, BLOCK_ELEMENTS // max(1, rows * columns))
+        result = np.zeros((m, columns), dtype=np.int64)
+        for row in range(0, m, rows):
+            if tables.p == 2:
+                tile = np.zeros((min(rows, m - row), columns), dtype=np.int64)
+            else:
+                tile = np.full((min(rows, m - row), columns), tables.zero_log, dtype=log_a.dtype)
+            for start in range(0, k, inner):
+                logs = tables.mul_logs(log_a[row:row + rows, start:start + inner, np.newaxis],
+                                       log_b[np.newaxis, start:start + inner])
+                if tables.p == 2:
+                    tile ^= np.bitwise_xor.reduce(tables.antilog[logs], axis=1)
+                else:
+                    tile = tables.add_logs(tile, tables.sum_logs(logs, axis=1))
+            result[row:row + rows] = tile if tables.p == 2 else tables.antilog[tile]
+        return result
+
+    def __row_reduce(self, matrix, ncols):
+        """
+        Blocked Gauss–Jordan elimination. Pivots of a panel of PANEL_COLUMNS columns are found by
+        eliminating the panel alone. If Q is the panel part of the pivot rows at the pivot columns,
+        the rest of the matrix is updated with two matrix products: pivot rows become Q^-1 · pivot rows,
+        and every other row r becomes r - r[pivot columns] · (new pivot rows).
+        """
+        tables = self.__get_tables()
+        m = len(matrix)
+        pivots = []
+        r = 0
+        for first in range(0, ncols, PANEL_COLUMNS):
+            if r == m:
+                break
+            last = min(ncols, first + PANEL_COLUMNS)
+            _, panel_pivots, order = self.__eliminate(matrix[r:, first:last].copy(), last - first)
+            if not panel_pivots:
+                continue
+            pivot_rows = r + order[:len(panel_pivots)]
+            pivot_columns = first + np.array(panel_pivots)
+            q = matrix[np.ix_(pivot_rows, pivot_columns)]
+            augmented = np.concatenate((q, np.eye(len(q), dtype=np.int64)), axis=1)
+            q_inverse = self.__eliminate(augmented, len(q))[0][:, len(q):]
+            new_pivot_rows = self.__matmul(q_inverse, matrix[pivot_rows, first:])
+
+            others = np.setdiff1d(np.arange(m), pivot_rows)
+            factors = matrix[np.ix_(others, pivot_columns)]
+            updated = others[np.any(factors != 0, axis=1)]
+            factors = factors[np.any(factors != 0, axis=1)]
+            if len(updated):
+                matrix[updated, first:] = tables.sub(matrix[updated, first:], self.__matmul(factors, new_pivot_rows))
+            matrix[pivot_rows, first:] = new_pivot_rows
+            matrix[:] = matrix[np.concatenate((np.arange(r), pivot_rows, others[others >= r]))]
+            pivots.extend(int(column) for column in pivot_columns)
+            r += len(pivot_rows)
+        return matrix, pivots
+
+    def __eliminate(self, matrix, ncols):
+        """
+        Unblocked Gauss–Jordan elimination in place.
+        :return: tuple (matrix, list of pivot columns, row order: original position of every row).
+        """
+        tables = self.__get_tables()
+        m = matrix.shape[0]
+        order = np.arange(m)
+        pivots = []
+        r = 0
+        for col in range(ncols):
+            if r == m:
+                break
+            nonzero = np.flatnonzero(matrix[r:, col])
+            if len(nonzero) == 0:
+                continue
+            pivot = r + nonzero[0]
+            if pivot != r:
+                matrix[[r, pivot]] = matrix[[pivot, r]]
+                order[[r, pivot]] = order[[pivot, r]]
+            row = matrix[r, col:]
+            row[:] = tables.antilog[tables.mul_logs(tables.log[row], (-tables.log[row[0]]) % tables.order)]
+            # Row operations on blocks of rows that have nonzero entries in the pivot column.
+            others = np.flatnonzero(matrix[:, col])
+            others = others[others != r]
+            log_row = tables.log[row]
+            block = max(1, BLOCK_ELEMENTS // max(1, len(row)))
+            for start in range(0, len(others), block):
+                rows = others[start:start + block]
+                products = tables.antilog[tables.mul_logs(tables.log[matrix[rows, col]][:, np.newaxis], log_row)]
+                matrix[rows, col:] = tables.sub(matrix[rows, col:], products.astype(np.int64))
+            pivots.append(col)
+            r += 1
+        return matrix, pivots, order
+
+    def __get_tables(self) -> _Tables:
+        if self.__tables is None:
+            self.__tables = _tables(self.__field)
+        return self.__tables
+
+    def __operand(self, other):
+        if isinstance(other, FieldArray):
+            field = other.field
+            if field is not self.__field and ((field.p, field.n) != (self.__field.p, self.__field.n) or
+                                              not np.array_equal(field.primitive_matrix,
+                                                                 self.__field.primitive_matrix)):
+                raise ValueError("Elements of different fields cannot be mixed")
+            return other.indices
+        indices = np.asarray(other, dtype=np.int64)
+        if indices.size > 0 and (indices.min() < 0 or indices.max() >= self.__field.order):
+            raise ValueError(f"Indices of elements of GF({self.__field.p}^{self.__field.n}) "
+                             f"must be in [0, {self.__field.order})")
+        return indices
+
+    def __like(self, indices):
+        result = FieldArray.__new__(FieldArray)
+        result.__field = self.__field
+        result.__indices = np.asarray(indices, dtype=np.int64)
+        result.__tables = self.__tables
+        return result
@@ -0,0 +1,238 @@
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import zlib
+
+import numpy as np
+
+from utils.logger import logger
+
+
+class FieldCache:
+    """
+    Persistent on-disk cache of built fields, their log tables and found primitive elements.
+
+    Every entry is one file of the following versioned binary format:
+        magic b"FFCACHE\\0", uint32 format version, uint32 header length, uint32 header crc32,
+        JSON header with key, metadata and description of arrays (dtype, shape, offset, crc32),
+        arrays themselves, each aligned to 64 bytes.
+    Arrays are opened with np.memmap in read-only mode, so loading a big table
+    costs only reading the header.
+
+    Integrity checks: magic, version, header crc32, key and file size are always validated,
+    crc32 of arrays is validated when verify_payload is True. Broken entries are deleted.
+
+    Directory size is bounded by max_bytes: after every store least recently used entries are evicted.
+    Last use is tracked with modification time of entry files, which is updated on every load.
+    Entries that are memory mapped can not be removed on Windows, they are skipped by eviction.
+    """
+    VERSION = 1
+    MAGIC = b"FFCACHE\0"
+    SUFFIX = ".ffc"
+    __PREFIX = struct.Struct("<8sIII")
+    __ALIGNMENT = 64
+
+    def __init__(self, directory: str = None, max_bytes: int = 1 << 30, verify_payload: bool = False):
+        self.__directory = directory or default_cache_directory()
+        self.__max_bytes = max_bytes
+        self.__verify_payload = verify_payload
+        os.makedirs(self.__directory, exist_ok=True)
+
+    @property
+    def directory(self):
+        return self.__directory
+
+    def load_field(self, p: int, n: int, primitive_matrix: np.ndarray):
+        """
+        :return: table of powers of the primitive matrix (see FiniteField) or None.
+        """
+        entry = self.load(field_key("field", p, n, primitive_matrix))
+        return None if entry is None else entry[0]["vectors"]
+
+    def store_field(self, p: int, n: int, primitive_matrix: np.ndarray, vectors: np.ndarray):
+        self.store(field_key("field", p, n, primitive_matrix), {"vectors": vectors})
+
+    def load_log_tables(self, p: int, n: int, primitive_matrix: np.ndarray):
+        """
+        :return: tuple (antilog, log, zech) or None.
+        """
+        entry = self.load(field_key("logs", p, n, primitive_matrix))
+        if entry is None:
+            return None
+        arrays, _ = entry
+        return arrays["antilog"], arrays["log"], arrays["zech"]
+
+    def store_log_tables(self, p: int, n: int, primitive_matrix: np.ndarray, antilog, log, zech):
+        self.store(field_key("logs", p, n, primitive_matrix), {"antilog": antilog, "log": log, "zech": zech})
+
+    def load_primitives(self, p: int, n: int):
+        """
+        :return: tuple (primitives of shape (m, n, n), is every primitive found) or None.
+        """
+        entry = self.load(f"primitives_{p}_{n}")
+        if entry is None:
+            return None
+        arrays, meta = entry
+        return arrays["primitives"], bool(meta.get("complete", False))
+
+    def store_primitives(self, p: int, n: int, primitives: np.ndarray, complete: bool):
+        self.store(f"primitives_{p}_{n}", {"primitives": primitives}, meta={"complete": complete})
+
+    def load(self, key: str):
+        """
+        Loads an entry with memory-mapped arrays.
+        :return: tuple (dict of arrays, metadata dict) or None if there is no valid entry.
+        """
+        path = self.__path(key)
+        try:
+            arrays, meta = self.__read(path, key)
+        except FileNotFoundError:
+            return None
+        except (ValueError, OSError, KeyError) as e:
+            logger.warning(f"Cache entry {path} is broken ({e}), removing it.")
+            self.__remove(path)
+            return None
+        os.utime(path)
+        logger.info(f"Loaded {key} from cache.")
+        return arrays, meta
+
+    def store(self, key: str, arrays: dict, meta: dict = None):
+        """
+        Atomically writes an entry and evicts least recently used entries if the cache is too big.
+        """
+        arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+        descriptions = {}
+        offset = end = 0
+        for name, array in arrays.items():
+            descriptions[name] = {
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+                "offset": offset,
+                "crc32": zlib.crc32(memoryview(array).cast("B")) if array.size else 0,
+            }
+            end = offset + array.nbytes
+            offset = self.__align(end)
+        header = json.dumps({"key": key, "meta": meta or {}, "arrays": descriptions}).encode("utf-8")
+        data_start = self.__align(self.__PREFIX.size + len(header))
+
+        fd, temp_path = tempfile.mkstemp(dir=self.__directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(self.__PREFIX.pack(self.MAGIC, self.VERSION, len(header), zlib.crc32(header)))
+                file.write(header)
+                for name, array in arrays.items():
+                    file.seek(data_start + descriptions[name]["offset"])
+                    file.write(memoryview(array).cast("B") if array.size else b"")
+                file.truncate(data_start + end)
+            os.replace(temp_path, self.__path(key))
+        except BaseException:
+            self.__remove(temp_path)
+            raise
+        logger.info(f"Stored {key} in cache.")
+        self.evict(keep=key)
+
+    def evict(self, keep: str = None):
+        """
+        Removes least recently used entries until the directory fits into max_bytes.
+        :param keep: key of an entry that must not be removed.
+        """
+        entries = []
+        for name in os.listdir(self.__directory):
+            if not name.endswith(self.SUFFIX):
+                continue
+            path = os.path.join(self.__directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        keep_path = self.__path(keep) if keep is not None else None
+        for _, size, path in sorted(entries):
+            if total <= self.__max_bytes:
+                break
+            if path == keep_path:
+                continue
+            logger.info(f"Evicting {path} from cache.")
+            if self.__remove(path):
+                total -= size
+
+    def clear(self):
+        for name in os.listdir(self.__directory):
+            if name.endswith(self.SUFFIX):
+                self.__remove(os.path.join(self.__directory, name))
+
+    def __read(self, path, key):
+        with open(path, "rb") as file:
+            prefix = file.read(self.__PREFIX.size)
+            if len(prefix) != self.__PREFIX.size:
+                raise ValueError("truncated header")
+            magic, version, header_length, header_crc = self.__PREFIX.unpack(prefix)
+            if magic != self.MAGIC:
+                raise ValueError("wrong magic")
+            if version != self.VERSION:
+                raise ValueError(f"unsupported version {version}")
+            header = file.read(header_length)
+        if len(header) != header_length or zlib.crc32(header) != header_crc:
+            raise ValueError("header checksum mismatch")
+        header = json.loads(header.decode("utf-8"))
+        if header["key"] != key:
+            raise ValueError(f"entry belongs to {header['key']}")
+
+        data_start = self.__align(self.__PREFIX.size + header_length)
+        file_size = os.path.getsize(path)
+        arrays = {}
+        for name, description in header["arrays"].items():
+            dtype = np.dtype(description["dtype"])
+            shape = tuple(description["shape"])
+            offset = data_start + description["offset"]
+            if offset + dtype.itemsize * int(np.prod(shape, dtype=np.int64)) > file_size:
+                raise ValueError(f"array {name} is truncated")
+            if 0 in shape:
+                array = np.empty(shape, dtype=dtype)
+            else:
+                array = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+            if self.__verify_payload and array.size and \
+                    zlib.crc32(memoryview(np.ascontiguousarray(array)).cast("B")) != description["crc32"]:
+                raise ValueError(f"array {name} checksum mismatch")
+            arrays[name] = array
+        return arrays, header["meta"]
+
+    def __path(self, key):
+        return os.path.join(self.__directory, key + self.SUFFIX)
+
+    @classmethod
+    def __align(cls, offset):
+        return -(-offset // cls.__ALIGNMENT) * cls.__ALIGNMENT
+
+    @staticmethod
+    def __remove(path) -> bool:
+        """
+        Removes an entry file. A file that is memory mapped by a loaded field can not be removed on Windows,
+        such an entry is kept until a later eviction.
+        :return: False if the file is still there.
+        """
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except PermissionError:
+            logger.info(f"{path} is in use and is not removed.")
+            return False
+        return True
+
+
+def field_key(kind: str, p: int, n: int, primitive_matrix: np.ndarray) -> str:
+    """
+    Key of a cache entry for a field given by p, n and primitive matrix.
+    For a companion matrix the matrix is determined by its primitive polynomial.
+    """
+    digest = hashlib.blake2b(np.ascontiguousarray(primitive_matrix, dtype=np.int64).tobytes(),
+                             digest_size=8).hexdigest()
+    return f"{kind}_{p}_{n}_{digest}"
+
+
+def default_cache_directory():
+    return os.path.join(os.path.expanduser("~"), ".cache", "finite_fields")
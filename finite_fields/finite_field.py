@@ -1,7 +1,20 @@
 import numpy as np
 
-from custom_collections.list_set import ListSet
+from custom_collections.array_set import ArraySet
+from finite_fields.discrete_log import TABULATION_LIMIT, pohlig_hellman
+from finite_fields.field_cache import FieldCache
+from finite_fields.lfsr import companion_column, fill_power_vectors, matrices_from_vectors, matrix_power, \
+    step_vectors
+from finite_fields.log_tables import build_log_tables, build_log_tables_from_indices, decode_indices, \
+    encode_vectors
+from finite_fields.packed import CHUNK_ROWS, add_packed, encode_packed, pack, unpack
+from finite_fields.parallel_build import PARALLEL_THRESHOLD, build_power_vectors_parallel
+from finite_fields.polynomials import companion_polynomial, poly_mulmod
+from utils import instrumentation
+from utils.async_pool import AsyncPool, shared_async_pool
+from utils.cancellation import CancellationToken
 from utils.logger import logger
+from utils.memo_cache import MemoCache, array_key, shared_memo_cache
 
 
 class FiniteField:
@@ -11,57 +24,574 @@ class FiniteField:
 
     You can obtain elements of the field using get_elements() method in matrix or vector form.
     After obtaining elements in first time, this then object caches them.
+    as_array() returns the whole table as one read-only array without copying it.
+
+    Field is built by stepping only the coordinate vector A^k·e0 (the first column of A^k)
+    and storing it in one preallocated (p^n - 1, n) table. For companion matrices
+    every A^k is then restored from n consecutive rows of this table.
+
+    With workers > 1 large fields are built in parallel: the exponent range is split
+    into shards, and every shard is filled by its own process starting from a jump-ahead power A^k.
+
+    Arithmetic works with integer indices of elements: element with vector view [c_(n-1), ..., c_0]
+    has index sum(c_i * p^i), so 0 is zero and 1 is one of the field. Methods add(), sub(), neg(),
+    mul(), div(), inv() and pow() take scalars or NumPy arrays of indices and are answered
+    by lookups in antilog, log and Zech logarithm tables built from the field table.
+
+    Fields too large to be materialized can be scanned with iter_elements(), which yields
+    chunks of consecutive powers starting from any exponent.
+
+    build_async() and aiter_elements() are counterparts of build() and iter_elements() for asyncio code,
+    they run in an AsyncPool (see async_pool module).
+
+    rebase() returns the field built on another primitive element A^k: its table and log tables
+    are gathered from the tables of this field instead of being built again.
+
+    discrete_log() and discrete_log_many() find exponents k of elements A^k by lookups in the log table.
+    For fields too big to be tabulated they use Pohlig–Hellman with baby-step giant-step
+    (companion matrices only).
+
+    Elements can also be packed into uint64 words (see packed module): 'packed' view of get_elements()
+    and iter_elements(), pack(), unpack() and add_packed(). With packed=True the built table is kept
+    only in packed form. Matrices, log tables and rebased tables are made from it by chunks of CHUNK_ROWS
+    unpacked rows, only as_array() and get_elements('vector') unpack the whole table into a new array.
+
+    If a FieldCache is given, the field table and log tables are loaded from it (memory-mapped)
+    and stored to it after building.
+
+    Built tables are also kept in a MemoCache keyed by (p, n, primitive matrix), the process-wide
+    shared_memo_cache() by default. Fields with the same primitive matrix share their tables,
+    and threads building the same field concurrently wait for one build instead of repeating it.
+    Every field also keeps references to its own tables, so the budget of the MemoCache does not cap
+    the memory of live fields: tables evicted from the cache are freed only when their fields are.
     """
-    def __init__(self, p, n, primitive_matrix: np.ndarray):
+    def __init__(self, p, n, primitive_matrix: np.ndarray, workers: int = 1, cache: FieldCache = None,
+                 packed: bool = False, memo_cache: MemoCache = None):
         self.__p = p
         self.__n = n
-        self.__built_matrices: ListSet[np.ndarray] = ListSet()
+        self.__workers = workers
+        self.__cache = cache
+        self.__packed = packed
+        self.__memo_cache = memo_cache if memo_cache is not None else shared_memo_cache()
+        self.__built_matrices: ArraySet = None
+        self.__vectors: np.ndarray = None
+        self.__packed_vectors: np.ndarray = None
         self.__primitive_matrix = primitive_matrix
+        self.__antilog: np.ndarray = None
+        self.__log: np.ndarray = None
+        self.__zech: np.ndarray = None
+
+    @property
+    def p(self):
+        return self.__p
+
+    @property
+    def n(self):
+        return self.__n
+
+    @property
+    def primitive_matrix(self) -> np.ndarray:
+        return self.__primitive_matrix
+
+    @property
+    def memo_cache(self) -> MemoCache:
+        return self.__memo_cache
+
+    @property
+    def order(self):
+        """ Size of the field p^n. """
+        return self.__p ** self.__n
+
+    @property
+    def nbytes(self):
+        """ Memory held by built tables of the field. """
+        tables = (self.__vectors, self.__packed_vectors, self.__built_matrices, self.__antilog, self.__log, self.__zech)
+        return sum(table.nbytes for table in tables if table is not None)
+
+    def build(self, progressbar=None, progress=None, cancel_token: CancellationToken = None):
+        """
+        Builds the table of powers of the primitive matrix without creating element views.
+        :param progressbar: Tk progressbar that is moved from 20 to 90 while building.
+        :param progress: optional callable(done, total), called from the building thread.
+        :param cancel_token: building raises OperationCancelled soon after the token is cancelled.
+        :return: self.
+        """
+        self.__build(progressbar, progress, cancel_token)
+        return self
+
+    async def build_async(self, pool: AsyncPool = None):
+        """
+        build() run in an AsyncPool (shared_async_pool() by default). Concurrent builds of fields
+        with the same p, n and primitive matrix share one computation, which is cancelled
+        when every awaiting task is cancelled.
+        :return: self.
+        """
+        token = CancellationToken()
+        key = self.__key("packed_field" if self.__packed else "field")
+        vectors, packed_vectors = await (pool or shared_async_pool()).run(key, self.__built_tables, token, token=token)
+        if self.__vectors is None and self.__packed_vectors is None:
+            self.__vectors, self.__packed_vectors = vectors, packed_vectors
+        return self
+
+    def __built_tables(self, cancel_token: CancellationToken):
+        self.__build(cancel_token=cancel_token)
+        return self.__vectors, self.__packed_vectors
+
+    def __build(self, progressbar=None, progress=None, cancel_token: CancellationToken = None):
+        """ Builds the table if needed, :return: the table, packed for packed fields. """
+        if self.__vectors is not None:
+            return self.__vectors
+        if self.__packed_vectors is not None:
+            return self.__packed_vectors
+        if not self.__packed:
+            self.__vectors = self.__memo_cache.get_or_create(
+                self.__key("field"), lambda: self.__build_vectors(progressbar, progress, cancel_token))
+            return self.__vectors
+        self.__packed_vectors = self.__memo_cache.get_or_create(
+            self.__key("packed_field"), lambda: pack(self.__build_vectors(progressbar, progress, cancel_token),
+                                                     self.__p))
+        return self.__packed_vectors
+
+    def __rows(self, rows) -> np.ndarray:
+        """ Rows of the built table as coordinate vectors, rows of a packed table are unpacked. """
+        if self.__vectors is not None:
+            return self.__vectors[rows]
+        return unpack(self.__packed_vectors[rows], self.__p, self.__n)
+
+    def __build_vectors(self, progressbar=None, progress=None, cancel_token: CancellationToken = None):
+        if self.__cache is not None:
+            vectors = self.__cache.load_field(self.__p, self.__n, self.__primitive_matrix)
+            if vectors is not None:
+                return vectors
 
-    def __build(self, progressbar=None):
         logger.info("Building field...")
-        if len(self.__built_matrices) == self.__p**self.__n - 1:
-            logger.info("Building is cached!")
-            return self.__built_matrices
-        elif len(self.__built_matrices) > 0:
-            logger.info("Not every element was found for some reason.")
-            raise ValueError(f"Invalid state: only {len(self.__built_matrices)} "
-                             f"out of {self.__p**self.__n - 1} was found!")
+        size = self.__p ** self.__n - 1
+
+        def report_progress(done, total):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            if progressbar is not None:
+                progressbar['value'] = 20 + int((done / total) * 70)
+            if progress is not None:
+                progress(done, total)
+
+        if progressbar is None and progress is None and cancel_token is None:
+            report_progress = None
+        with instrumentation.span("field.build", p=self.__p, n=self.__n, workers=self.__workers):
+            if self.__workers > 1 and size >= PARALLEL_THRESHOLD:
+                vectors = build_power_vectors_parallel(size, self.__primitive_matrix[:, 0], self.__primitive_matrix,
+                                                       self.__p, self.__workers, progress=report_progress)
+            else:
+                vectors = np.empty((size, self.__n), dtype=np.int32)
+                fill_power_vectors(vectors, self.__primitive_matrix[:, 0], self.__primitive_matrix, self.__p,
+                                   progress=report_progress)
+        logger.info("Field successfully built.")
+        if self.__cache is not None:
+            self.__cache.store_field(self.__p, self.__n, self.__primitive_matrix, vectors)
+        return vectors
 
+    def __build_matrices(self, progressbar=None):
+        if self.__built_matrices is None:
+            self.__built_matrices = self.__memo_cache.get_or_create(
+                self.__key("matrices"), lambda: self.__create_matrices(progressbar))
+        return self.__built_matrices
+
+    def __create_matrices(self, progressbar=None):
+        if companion_column(self.__primitive_matrix) is None:
+            return self.__build_matrices_by_products(progressbar)
+        table = self.__build(progressbar)
+        with instrumentation.span("field.matrices", p=self.__p, n=self.__n):
+            if table is self.__vectors:
+                return ArraySet(matrices_from_vectors(table), element_shape=(self.__n, self.__n))
+            count, n = len(table), self.__n
+            matrices = np.empty((count, n, n), dtype=np.int32)
+            for start in range(0, count, CHUNK_ROWS):
+                rows = (np.arange(start, min(start + CHUNK_ROWS, count))[:, np.newaxis] + np.arange(n)) % count
+                matrices[start:start + len(rows)] = self.__rows(rows).transpose(0, 2, 1)
+            return ArraySet(matrices, element_shape=(n, n))
+
+    def __build_matrices_by_products(self, progressbar=None):
+        logger.info("Building field with matrix products...")
         current = self.__primitive_matrix.copy()
-        self.__built_matrices.add(current)
+        matrices = np.empty((self.__p**self.__n - 1, self.__n, self.__n), dtype=np.int32)
+        matrices[0] = current
         progress = 20
         for i in range(self.__p**self.__n - 2):
             current = (np.dot(current, self.__primitive_matrix)) % self.__p
-            self.__built_matrices.add(current)
+            matrices[i + 1] = current
             if progressbar is not None and progress != 20 + int((i / (self.__p ** self.__n - 1)) * 70):
                 progress = 20 + int((i / (self.__p ** self.__n - 1)) * 70)
                 progressbar['value'] = progress
 
         logger.info("Field successfully built.")
-        return self.__built_matrices
+        return ArraySet(matrices, element_shape=(self.__n, self.__n))
+
+    def rebase(self, primitive_matrix: np.ndarray = None, exponent: int = None) -> 'FiniteField':
+        """
+        The same field built on another primitive element B = A^k, without stepping powers of B.
+        The table of B is gathered from the table of A (B^i = A^(i·k mod p^n - 1)) and converted
+        to the basis of powers of B (see rebase module). Both matrices must be companion matrices.
+        :param primitive_matrix: companion matrix B of a primitive polynomial of degree n;
+            k is found from a root of its polynomial.
+        :param exponent: k coprime to p^n - 1; B is the companion matrix of the minimal polynomial of A^k.
+        :raise ValueError: if neither or both are given, or B is not a primitive element of this field.
+        :return: new FiniteField with the same settings whose table is already built.
+        """
+        from finite_fields.conjugacy import minimal_polynomials
+        from finite_fields.rebase import basis_conversion, find_root, rebase_binary_indices, rebase_log_tables, \
+            rebase_vectors
+
+        if (primitive_matrix is None) == (exponent is None):
+            raise ValueError("Give either a primitive matrix or an exponent")
+        if companion_column(self.__primitive_matrix) is None:
+            raise ValueError("Rebasing needs a companion primitive matrix")
+        p, n, order = self.__p, self.__n, self.order - 1
+        if primitive_matrix is not None:
+            primitive_matrix = np.asarray(primitive_matrix)
+            if primitive_matrix.shape != (n, n) or companion_column(primitive_matrix) is None:
+                raise ValueError("Rebasing needs a companion primitive matrix")
+        else:
+            exponent %= order
+            if np.gcd(exponent, order) != 1:
+                raise ValueError(f"A^{exponent} is not primitive: {exponent} is not coprime to {order}")
+            polynomial = minimal_polynomials(self, [exponent])[0]
+            primitive_matrix = np.zeros((n, n), dtype=np.int32)
+            primitive_matrix[1:, :-1] = np.eye(n - 1, dtype=np.int32)
+            primitive_matrix[:, -1] = (-polynomial[:-1]) % p
+
+        field = FiniteField(p, n, primitive_matrix, self.__workers, self.__cache, self.__packed, self.__memo_cache)
+
+        def create(packed: bool):
+            k = exponent
+            if k is None:
+                k = self.discrete_log(find_root(self, companion_polynomial(primitive_matrix, p)[::-1]), 'index')
+                if np.gcd(k, order) != 1:
+                    raise ValueError("Matrix is not a primitive element of the field")
+            with instrumentation.span("field.rebase", p=p, n=n):
+                conversion = basis_conversion(self.antilog_table, k, p, n)
+                if p == 2 and n <= 64:
+                    # Indices of elements are their packed words.
+                    words = rebase_binary_indices(self.antilog_table, k, conversion)
+                    antilog = np.roll(words, 1)
+                    table = words[:, np.newaxis] if packed else unpack(words[:, np.newaxis], p, n)
+                elif packed:
+                    table = rebase_vectors(self.__build(), k, conversion, p, n)
+                    antilog = np.roll(encode_packed(table, p, n), 1)
+                else:
+                    table = rebase_vectors(self.__build(), k, conversion, p)
+                    antilog = np.roll(encode_vectors(table, p), 1)
+                # Log tables of the new field are gathered as well.
+                self.__memo_cache.put(field.__key("log_tables"), rebase_log_tables(antilog, self.zech_table, k))
+            return table
+
+        if self.__packed:
+            field.__packed_vectors = self.__memo_cache.get_or_create(
+                field.__key("packed_field"), lambda: create(True))
+        else:
+            field.__vectors = self.__memo_cache.get_or_create(field.__key("field"), lambda: create(False))
+        return field
 
     def get_elements(self, view: str = 'matrix', progressbar=None):
         """
         Method for obtaining elements of the finite field in matrix or vector form.
         :param progressbar:
-        :param view: 'matrix' | 'vector'.
-        :return: list of np.ndarray that represents elements of the finite field.
+        :param view: 'matrix' | 'vector' | 'packed'.
+        :return: ArraySet of matrices for 'matrix' view; read-only np.ndarray of shape (p^n - 1, n)
+            whose rows are vectors for 'vector' view (a view of the table, see as_array());
+            for 'packed' view np.ndarray of shape (p^n - 1, words) and dtype uint64 (see pack()).
+        """
+        if view == 'matrix':
+            return self.__build_matrices(progressbar)
+        if view == 'vector':
+            self.__build(progressbar)
+            return self.as_array('vector')
+        if view == 'packed':
+            table = self.__build(progressbar)
+            return table if table is self.__packed_vectors else pack(table, self.__p)
+
+    def as_array(self, view: str = 'coefficients') -> np.ndarray:
+        """
+        The whole table of elements as one read-only NumPy array, without copying the built table.
+        Arrays support the buffer protocol, so memoryview(field.as_array()) exposes the table
+        to other libraries, and see export module for Arrow and for writing tables to disk.
+        :param view: 'coefficients' - C-contiguous array of shape (p^n - 1, n) and dtype int32,
+            row k holds coefficients c_0, ..., c_(n-1) of A^(k+1) (the layout of the built table);
+            'vector' - the same table with reversed columns, a strided view;
+            'matrix' - C-contiguous array of shape (p^n - 1, n, n);
+            'packed' - C-contiguous array of shape (p^n - 1, words) and dtype uint64.
+            Tables of packed fields are unpacked into a new array for 'coefficients' and 'vector' views,
+            and tables of other fields are packed into a new array for 'packed' view.
         """
         if view == 'matrix':
-            return self.__build(progressbar)
+            return self.__build_matrices().array
+        if view == 'packed':
+            table = self.get_elements('packed')
+        elif view in ('coefficients', 'vector'):
+            table = self.__build()
+            if table is self.__packed_vectors:
+                table = unpack(table, self.__p, self.__n)
+        else:
+            raise ValueError(f"Unknown view {view}")
+        table = table.view(np.ndarray)
+        table.flags.writeable = False
+        return table[:, ::-1] if view == 'vector' else table
+
+    def iter_elements(self, view: str = 'matrix', start: int = 1, stop: int = None, chunk_size: int = 1 << 16):
+        """
+        Streams powers A^start, ..., A^(stop - 1) of the primitive matrix in chunks without building the field.
+        The first power is found by jump-ahead (repeated squaring), so iteration can be resumed
+        from any exponent, and memory usage is bounded by chunk_size.
+        If the field is already built, chunks are copied from its table.
+        :param view: 'matrix' | 'vector' | 'packed'.
+        :param start: first exponent, non-negative.
+        :param stop: exponent after the last one, p^n by default (every nonzero element once).
+        :param chunk_size: maximal number of elements in one chunk.
+        :return: generator of np.ndarray of shape (m, n, n) or (m, n) and dtype int32,
+            or of shape (m, words) and dtype uint64 for 'packed' view.
+        """
+        if view not in ('matrix', 'vector', 'packed'):
+            raise ValueError(f"Unknown view {view}")
+        stop = self.order if stop is None else stop
+        if start < 0 or stop < start:
+            raise ValueError(f"Invalid range of exponents [{start}, {stop})")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+
+        n = self.__n
+        column = companion_column(self.__primitive_matrix)
+        # For companion matrices A^k is assembled from n consecutive first columns,
+        # otherwise each column of A^k is stepped as its own sequence.
+        lookahead = n - 1 if view == 'matrix' and column is not None else 0
+        firsts = matrix_power(self.__primitive_matrix, start, self.__p)
+        firsts = firsts[:, :1].T if view != 'matrix' or column is not None else firsts.T
+        for chunk_start in range(start, stop, chunk_size):
+            count = min(chunk_size, stop - chunk_start)
+            sequences = np.empty((len(firsts), count + lookahead, n), dtype=np.int32)
+            if (self.__vectors is not None or self.__packed_vectors is not None) and len(firsts) == 1:
+                rows = (np.arange(chunk_start, chunk_start + count + lookahead) - 1) % (self.order - 1)
+                sequences[0] = self.__rows(rows)
+            else:
+                for sequence, first in zip(sequences, firsts):
+                    fill_power_vectors(sequence, first, self.__primitive_matrix, self.__p)
+            firsts = step_vectors(sequences[:, count - 1].astype(np.int64), self.__primitive_matrix, self.__p, column)
+
+            if view == 'vector':
+                yield np.ascontiguousarray(sequences[0, :, ::-1])
+            elif view == 'packed':
+                yield pack(sequences[0], self.__p)
+            elif column is not None:
+                rows = np.arange(count)[:, np.newaxis] + np.arange(n)
+                yield np.ascontiguousarray(sequences[0][rows].transpose(0, 2, 1))
+            else:
+                yield np.ascontiguousarray(sequences.transpose(1, 2, 0))
+
+    async def aiter_elements(self, view: str = 'matrix', start: int = 1, stop: int = None,
+                             chunk_size: int = 1 << 16, pool: AsyncPool = None):
+        """
+        Async counterpart of iter_elements(): every chunk is computed in an AsyncPool
+        (shared_async_pool() by default) and yielded as soon as it is ready.
+        Cancelling the consuming task stops the stream after the chunk being computed.
+        """
+        async for chunk in (pool or shared_async_pool()).iterate(self.iter_elements(view, start, stop, chunk_size)):
+            yield chunk
+
+    def encode(self, elements):
+        """
+        Converts elements in vector form to their integer indices.
+        :param elements: np.ndarray of shape (..., n) in vector view.
+        :return: int or np.ndarray of indices.
+        """
+        return self.__result(encode_vectors(np.asarray(elements)[..., ::-1], self.__p))
+
+    def decode(self, indices):
+        """
+        Converts integer indices to elements in vector form.
+        :param indices: int or np.ndarray of indices.
+        :return: np.ndarray of shape (..., n) in vector view.
+        """
+        return decode_indices(indices, self.__p, self.__n)[..., ::-1]
+
+    def pack(self, elements) -> np.ndarray:
+        """
+        Packs elements in vector form into uint64 words (see packed.pack).
+        For p = 2 and n <= 64 the only word is the index of the element.
+        :param elements: np.ndarray of shape (..., n) in vector view.
+        :return: np.ndarray of shape (..., words) and dtype uint64.
+        """
+        return pack(np.asarray(elements)[..., ::-1], self.__p)
+
+    def unpack(self, packed) -> np.ndarray:
+        """
+        Inverse of pack().
+        :return: np.ndarray of shape (..., n) in vector view.
+        """
+        return unpack(packed, self.__p, self.__n)[..., ::-1]
+
+    def add_packed(self, a, b) -> np.ndarray:
+        """ Adds packed elements, for p = 2 it is XOR of words. """
+        return add_packed(a, b, self.__p, self.__n)
+
+    @property
+    def antilog_table(self) -> np.ndarray:
+        """ antilog_table[k] is the index of A^k, k = 0, ..., p^n - 2. """
+        self.__build_log_tables()
+        return self.__antilog
+
+    @property
+    def log_table(self) -> np.ndarray:
+        """ log_table[index] is k such that A^k has given index, -1 for zero. """
+        self.__build_log_tables()
+        return self.__log
+
+    @property
+    def zech_table(self) -> np.ndarray:
+        """ zech_table[k] is the logarithm of 1 + A^k, -1 when 1 + A^k is zero. """
+        self.__build_log_tables()
+        return self.__zech
+
+    def add(self, a, b):
+        self.__build_log_tables()
+        a, b = np.broadcast_arrays(np.asarray(a, dtype=np.int64), np.asarray(b, dtype=np.int64))
+        log_a, log_b = self.__log[a], self.__log[b]
+        zech = self.__zech[(log_b - log_a) % (self.order - 1)]
+        result = np.where(zech < 0, 0, self.__antilog[(log_a + zech) % (self.order - 1)])
+        result = np.where(a == 0, b, np.where(b == 0, a, result))
+        return self.__result(result)
+
+    def neg(self, a):
+        self.__build_log_tables()
+        a = np.asarray(a, dtype=np.int64)
+        minus_one = 0 if self.__p == 2 else (self.order - 1) // 2
+        result = self.__antilog[(self.__log[a] + minus_one) % (self.order - 1)]
+        return self.__result(np.where(a == 0, 0, result))
+
+    def sub(self, a, b):
+        return self.add(a, self.neg(b))
+
+    def mul(self, a, b):
+        self.__build_log_tables()
+        a, b = np.broadcast_arrays(np.asarray(a, dtype=np.int64), np.asarray(b, dtype=np.int64))
+        result = self.__antilog[(self.__log[a] + self.__log[b]) % (self.order - 1)]
+        return self.__result(np.where((a == 0) | (b == 0), 0, result))
+
+    def inv(self, a):
+        self.__build_log_tables()
+        a = np.asarray(a, dtype=np.int64)
+        if np.any(a == 0):
+            raise ZeroDivisionError("Zero has no inverse in a field")
+        return self.__result(self.__antilog[(-self.__log[a]) % (self.order - 1)])
+
+    def div(self, a, b):
+        return self.mul(a, self.inv(b))
+
+    def pow(self, a, exponent):
+        self.__build_log_tables()
+        a, exponent = np.broadcast_arrays(np.asarray(a, dtype=np.int64), np.asarray(exponent, dtype=np.int64))
+        if np.any((a == 0) & (exponent < 0)):
+            raise ZeroDivisionError("Zero has no inverse in a field")
+        result = self.__antilog[(self.__log[a] * (exponent % (self.order - 1))) % (self.order - 1)]
+        result = np.where(a == 0, np.where(exponent == 0, 1, 0), result)
+        return self.__result(result)
+
+    def discrete_log(self, element, view: str = 'vector') -> int:
+        """
+        Finds the exponent k in [0, p^n - 2] such that A^k is the given element.
+        :param element: element in vector view, matrix view or its integer index.
+        :param view: 'vector' | 'matrix' | 'index'.
+        :raise ValueError: if the element is zero.
+        """
+        k = int(self.discrete_log_many(np.asarray(element)[np.newaxis], view)[0])
+        if k < 0:
+            raise ValueError("Zero has no discrete logarithm")
+        return k
+
+    def discrete_log_many(self, elements, view: str = 'vector', method: str = 'auto') -> np.ndarray:
+        """
+        Vectorized discrete logarithm.
+        :param elements: np.ndarray of shape (m, n) for vector view, (m, n, n) for matrix view
+            or (m,) for integer indices.
+        :param view: 'vector' | 'matrix' | 'index'.
+        :param method: 'table' looks exponents up in the log table (built if needed),
+            'pohlig-hellman' computes them one by one without tables,
+            'auto' uses tables if they exist or the field has at most TABULATION_LIMIT nonzero elements.
+        :raise ValueError: if an integer index is not an index of a nonzero element, 0 < index < p^n.
+        :return: np.ndarray of exponents of dtype int64 (object for fields of 2^63 or more elements),
+            -1 for zero elements in vector and matrix views.
+        """
         if view == 'vector':
-            elements = self.__build(progressbar)
-            vectors = []
-            for element in elements:
-                vectors.append(self.__reverse_first_column(element))
-            return vectors
+            coefficients = np.asarray(elements)[..., ::-1]
+        elif view == 'matrix':
+            coefficients = np.asarray(elements)[..., :, 0]
+        elif view == 'index':
+            coefficients = None
+            # Negative and too large indices would wrap around in the log table.
+            if np.any(np.asarray(elements) <= 0) or np.any(np.asarray(elements) >= self.order):
+                raise ValueError(f"Indices of nonzero elements must be in [1, {self.order - 1}]")
+        else:
+            raise ValueError(f"Unknown view {view}")
+        if method == 'auto':
+            tabulated = self.__log is not None or self.__vectors is not None or \
+                self.__packed_vectors is not None or self.order - 1 <= TABULATION_LIMIT
+            method = 'table' if tabulated else 'pohlig-hellman'
+
+        if method == 'table':
+            self.__build_log_tables()
+            indices = np.asarray(elements, dtype=np.int64) if coefficients is None \
+                else encode_vectors(coefficients, self.__p)
+            return self.__log[indices]
+        if method != 'pohlig-hellman':
+            raise ValueError(f"Unknown discrete logarithm method {method}")
+
+        if coefficients is None:
+            coefficients = decode_indices(elements, self.__p, self.__n)
+        coefficients = np.asarray(coefficients, dtype=np.int64) % self.__p
+        # Exponents of fields of 2^63 or more elements do not fit into int64.
+        result = np.empty(coefficients.shape[:-1], dtype=np.int64 if self.order <= 1 << 63 else object)
+        for i, element in zip(np.ndindex(result.shape), coefficients.reshape(-1, self.__n)):
+            result[i] = self.__pohlig_hellman(element)
+        return result
+
+    def __pohlig_hellman(self, element):
+        if not np.any(element):
+            return -1
+        if companion_column(self.__primitive_matrix) is None:
+            raise ValueError("Discrete logarithm without tables needs a companion primitive matrix")
+        p, n = self.__p, self.__n
+        f = companion_polynomial(self.__primitive_matrix, p)[::-1]
+
+        # Elements are polynomials of A, given by coefficient tuples (the first column of the matrix).
+        def mul(a, b):
+            return tuple(int(c) for c in poly_mulmod(np.array(a, dtype=np.int64), np.array(b, dtype=np.int64), f, p))
+
+        identity = (1,) + (0,) * (n - 1)
+        generator = tuple(int(c) for c in self.__primitive_matrix[:, 0] % p)
+        return pohlig_hellman(tuple(int(c) for c in element), generator, self.order - 1, mul, identity)
+
+    def __build_log_tables(self):
+        if self.__log is None:
+            self.__antilog, self.__log, self.__zech = self.__memo_cache.get_or_create(
+                self.__key("log_tables"), self.__create_log_tables)
+
+    def __create_log_tables(self):
+        if self.__cache is not None:
+            tables = self.__cache.load_log_tables(self.__p, self.__n, self.__primitive_matrix)
+            if tables is not None:
+                return tables
+        logger.info("Building log tables...")
+        table = self.__build()
+        with instrumentation.span("field.log_tables", p=self.__p, n=self.__n):
+            if table is self.__vectors:
+                tables = build_log_tables(table, self.__p)
+            else:
+                tables = build_log_tables_from_indices(encode_packed(table, self.__p, self.__n), self.__p)
+        logger.info("Log tables built.")
+        if self.__cache is not None:
+            self.__cache.store_log_tables(self.__p, self.__n, self.__primitive_matrix, *tables)
+        return tables
+
+    def __key(self, kind: str):
+        return array_key(kind, self.__p, self.__n, self.__primitive_matrix)
 
     @staticmethod
-    def __reverse_first_column(matrix):
-        if not isinstance(matrix, np.ndarray):
-            raise ValueError("Input must be a numpy array.")
-        if matrix.ndim != 2:
-            print(matrix)
-            raise ValueError("Input must be a 2D matrix.")
-        return matrix[:, 0][::-1]
\ No newline at end of file
+    def __result(array):
+        return int(array) if np.ndim(array) == 0 else array
@@ -0,0 +1,119 @@
+import math
+
+import numpy as np
+
+from wrappers.traced import traced
+
+
+def companion_column(matrix: np.ndarray):
+    """
+    Returns the last column of the matrix if it is a companion matrix
+    (ones on the subdiagonal, zeros elsewhere except the last column), otherwise None.
+    :param matrix: square np.ndarray.
+    :return: last column as np.ndarray of dtype int64 or None.
+    """
+    n = matrix.shape[0]
+    if matrix.shape != (n, n):
+        return None
+    body = matrix[:, :-1]
+    expected = np.zeros((n, n - 1), dtype=body.dtype)
+    expected[1:, :] = np.eye(n - 1, dtype=body.dtype)
+    if not np.array_equal(body, expected):
+        return None
+    return matrix[:, -1].astype(np.int64)
+
+
+def step_vectors(vectors: np.ndarray, matrix: np.ndarray, p: int, column: np.ndarray = None) -> np.ndarray:
+    """
+    Multiplies every row vector v of the stack by the matrix: v -> A·v mod p.
+    For a companion matrix it is a shift of the vector plus one scaled add of the last column.
+    :param vectors: np.ndarray of shape (m, n) and dtype int64.
+    :param matrix: n×n matrix A.
+    :param p: characteristic of the field.
+    :param column: last column of A if it is a companion matrix (see companion_column).
+    :return: new np.ndarray of shape (m, n).
+    """
+    if column is None:
+        return vectors.dot(matrix.T.astype(np.int64)) % p
+    stepped = np.empty_like(vectors)
+    stepped[:, 0] = 0
+    stepped[:, 1:] = vectors[:, :-1]
+    stepped += vectors[:, -1:] * column
+    stepped %= p
+    return stepped
+
+
+@traced("lfsr.fill_power_vectors")
+def fill_power_vectors(out: np.ndarray, first: np.ndarray, matrix: np.ndarray, p: int,
+                       progress=None, lanes: int = None):
+    """
+    Fills rows of out with consecutive coordinate vectors v, A·v, A^2·v, ... mod p,
+    where first row is v = first.
+
+    The table is split into lanes of equal stride, and all lanes are stepped
+    together with step_vectors, so the Python loop runs only about 2·sqrt(len(out)) times.
+    :param out: preallocated np.ndarray of shape (count, n) that is filled in place.
+    :param first: first vector of the sequence.
+    :param matrix: n×n matrix A.
+    :param p: characteristic of the field.
+    :param progress: optional callable(done, total), called while the table is filled.
+    :param lanes: number of lanes, about sqrt(count) by default.
+    :return: out.
+    """
+    count, n = out.shape
+    if count == 0:
+        return out
+    column = companion_column(matrix)
+    lanes = max(1, min(count, lanes or math.isqrt(count)))
+    stride = -(-count // lanes)
+    lanes = -(-count // stride)
+
+    jump = np.eye(n, dtype=np.int64)
+    for _ in range(stride):
+        jump = step_vectors(jump, matrix, p, column)
+    state = np.empty((lanes, n), dtype=np.int64)
+    state[0] = np.asarray(first, dtype=np.int64) % p
+    for j in range(1, lanes):
+        state[j] = state[j - 1].dot(jump) % p
+
+    report_every = max(1, stride // 100)
+    for i in range(stride):
+        rows = out[i::stride]
+        rows[:] = state[:len(rows)]
+        state = step_vectors(state, matrix, p, column)
+        if progress is not None and (i + 1) % report_every == 0:
+            progress(min((i + 1) * lanes, count), count)
+    if progress is not None:
+        progress(count, count)
+    return out
+
+
+def matrices_from_vectors(vectors: np.ndarray) -> np.ndarray:
+    """
+    Restores every A^k of a companion matrix A from the table of its first columns.
+    Column j of A^k is A^(k+j)·e0, so every matrix is assembled from n cyclically consecutive rows.
+    :param vectors: table of shape (p^n - 1, n) whose row i is the first column of A^(i+1).
+    :return: np.ndarray of shape (p^n - 1, n, n) and dtype int32, whose element i is A^(i+1).
+    """
+    count, n = vectors.shape
+    rows = (np.arange(count)[:, np.newaxis] + np.arange(n)) % count
+    return np.ascontiguousarray(vectors[rows].transpose(0, 2, 1), dtype=np.int32)
+
+
+@traced("lfsr.matrix_power")
+def matrix_power(matrix: np.ndarray, exponent: int, p: int) -> np.ndarray:
+    """
+    Computes A^exponent mod p by repeated squaring.
+    :param matrix: n×n matrix A.
+    :param exponent: non-negative integer.
+    :param p: characteristic of the field.
+    :return: np.ndarray of dtype int64.
+    """
+    result = np.eye(matrix.shape[0], dtype=np.int64)
+    base = matrix.astype(np.int64) % p
+    while exponent > 0:
+        if exponent & 1:
+            result = result.dot(base) % p
+        base = base.dot(base) % p
+        exponent >>= 1
+    return result
@@ -0,0 +1,61 @@
+import numpy as np
+
+
+def radix_weights(p: int, n: int) -> np.ndarray:
+    """
+    Weights p^0, ..., p^(n-1) of the radix-p encoding of coordinate vectors.
+    :return: np.ndarray of dtype int64.
+    """
+    return p ** np.arange(n, dtype=np.int64)
+
+
+def encode_vectors(vectors: np.ndarray, p: int) -> np.ndarray:
+    """
+    Encodes coordinate vectors (row i is the coefficient of A^i) as integers sum(row[i] * p^i).
+    :param vectors: np.ndarray of shape (..., n).
+    :param p: characteristic of the field.
+    :return: np.ndarray of shape (...) and dtype int64.
+    """
+    vectors = np.asarray(vectors, dtype=np.int64)
+    return vectors.dot(radix_weights(p, vectors.shape[-1]))
+
+
+def decode_indices(indices: np.ndarray, p: int, n: int) -> np.ndarray:
+    """
+    Inverse of encode_vectors.
+    :param indices: np.ndarray of integers in range [0, p^n).
+    :return: np.ndarray of shape (..., n) and dtype int32.
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    return ((indices[..., np.newaxis] // radix_weights(p, n)) % p).astype(np.int32)
+
+
+def build_log_tables(vectors: np.ndarray, p: int):
+    """
+    Builds antilog, log and Zech logarithm tables from the table of powers of a primitive element α.
+    Row k of vectors is the coordinate vector of α^(k+1).
+
+    antilog[k] is the index of α^k, log[index] is k (log[0] = -1 for zero),
+    zech[k] is log(1 + α^k) (-1 when 1 + α^k = 0).
+    :param vectors: np.ndarray of shape (p^n - 1, n).
+    :param p: characteristic of the field.
+    :return: tuple (antilog, log, zech) of np.ndarray of dtype int64.
+    """
+    return build_log_tables_from_indices(encode_vectors(vectors, p), p)
+
+
+def build_log_tables_from_indices(indices: np.ndarray, p: int):
+    """
+    The same as build_log_tables, but from indices of powers: indices[k] is the index of α^(k+1).
+    """
+    order = len(indices)
+    antilog = np.empty(order, dtype=np.int64)
+    antilog[1:] = indices[:-1]
+    antilog[0] = indices[-1]
+
+    log = np.full(order + 1, -1, dtype=np.int64)
+    log[antilog] = np.arange(order, dtype=np.int64)
+
+    constant = antilog % p
+    zech = log[antilog - constant + (constant + 1) % p]
+    return antilog, log, zech
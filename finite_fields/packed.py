@@ -0,0 +1,133 @@
+import numpy as np
+
+from finite_fields.log_tables import encode_vectors
+
+# Number of elements unpacked at once by functions that work on whole packed tables.
+CHUNK_ROWS = 1 << 16
+
+
+def digit_bits(p: int) -> int:
+    """ Width of the bit field of one coordinate, enough for digits 0, ..., p - 1. """
+    return (p - 1).bit_length()
+
+
+def digits_per_word(p: int) -> int:
+    """
+    Number of coordinates in one uint64 word, 64 for p = 2.
+    For odd p two high bits of every word are left free, add_packed() needs them for carries.
+    """
+    if p == 2:
+        return 64
+    return 62 // digit_bits(p)
+
+
+def words_per_element(p: int, n: int) -> int:
+    return -(-n // digits_per_word(p))
+
+
+def pack(vectors: np.ndarray, p: int) -> np.ndarray:
+    """
+    Packs coordinate vectors (row i is the coefficient of A^i) into uint64 words.
+    Word j holds coordinates j·k, ..., j·k + k - 1 in bit fields of digit_bits(p) bits, lowest first,
+    where k = digits_per_word(p). For p = 2 it is plain bit packing (bit i of word j is coordinate 64·j + i),
+    and for n <= 64 the only word is the index of the element (see log_tables.encode_vectors).
+    :param vectors: np.ndarray of shape (..., n).
+    :return: np.ndarray of shape (..., words_per_element(p, n)) and dtype uint64.
+    """
+    vectors = np.asarray(vectors)
+    shape, n = vectors.shape[:-1], vectors.shape[-1]
+    words = words_per_element(p, n)
+    vectors = vectors.reshape(-1, n)
+    if p == 2:
+        packed = np.zeros((len(vectors), words * 8), dtype=np.uint8)
+        packed[:, :-(-n // 8)] = np.packbits(vectors.astype(np.uint8, copy=False), axis=1, bitorder='little')
+        return packed.view('<u8').astype(np.uint64, copy=False).reshape(shape + (words,))
+    k = digits_per_word(p)
+    digits = np.zeros((len(vectors), words * k), dtype=np.uint64)
+    digits[:, :n] = vectors
+    shifts = np.uint64(digit_bits(p)) * np.arange(k, dtype=np.uint64)
+    packed = np.bitwise_or.reduce(digits.reshape(len(vectors), words, k) << shifts, axis=2)
+    return packed.reshape(shape + (words,))
+
+
+def unpack(packed: np.ndarray, p: int, n: int) -> np.ndarray:
+    """
+    Inverse of pack.
+    :param packed: np.ndarray of shape (..., words_per_element(p, n)) and dtype uint64.
+    :return: np.ndarray of shape (..., n) and dtype int32.
+    """
+    packed = np.asarray(packed, dtype=np.uint64)
+    shape, words = packed.shape[:-1], packed.shape[-1]
+    packed = np.ascontiguousarray(packed.reshape(-1, words))
+    if p == 2:
+        bits = np.unpackbits(packed.astype('<u8', copy=False).view(np.uint8), axis=1, bitorder='little')
+        return bits[:, :n].astype(np.int32).reshape(shape + (n,))
+    k, bits = digits_per_word(p), digit_bits(p)
+    shifts = np.uint64(bits) * np.arange(k, dtype=np.uint64)
+    digits = (packed[:, :, np.newaxis] >> shifts) & np.uint64((1 << bits) - 1)
+    return digits.reshape(len(packed), words * k)[:, :n].astype(np.int32).reshape(shape + (n,))
+
+
+def encode_packed(packed: np.ndarray, p: int, n: int) -> np.ndarray:
+    """
+    Indices of packed elements (see log_tables.encode_vectors).
+    For p = 2 and n < 64 they are the words themselves, otherwise elements are unpacked by chunks of CHUNK_ROWS.
+    :param packed: np.ndarray of shape (m, words) and dtype uint64.
+    :return: np.ndarray of shape (m,) and dtype int64.
+    """
+    if p == 2 and n < 64:
+        return packed[:, 0].astype(np.int64)
+    indices = np.empty(len(packed), dtype=np.int64)
+    for start in range(0, len(packed), CHUNK_ROWS):
+        indices[start:start + CHUNK_ROWS] = encode_vectors(unpack(packed[start:start + CHUNK_ROWS], p, n), p)
+    return indices
+
+
+def _field_masks(p: int):
+    """
+    Masks of words of odd p, b = digit_bits(p): for even and for odd bit fields the low b bits of every field,
+    bit b + 1 of every field and 2^(b+1) - p placed into every field.
+    """
+    bits, k = digit_bits(p), digits_per_word(p)
+    masks = []
+    for parity in (0, 1):
+        starts = range(bits * parity, bits * k, 2 * bits)
+        masks.append(tuple(np.uint64(sum(value << start for start in starts))
+                           for value in ((1 << bits) - 1, 1 << (bits + 1), (1 << (bits + 1)) - p)))
+    return masks
+
+
+def _add_fields(a: np.ndarray, b: np.ndarray, p: int) -> np.ndarray:
+    """
+    Adds the bit fields of words mod p, the fields of a and b are at most 2p - 2 in total.
+    Even and odd fields are added separately, so a field can use the bits of its neighbour:
+    the sum takes b + 1 bits, and adding 2^(b+1) - p carries into bit b + 1 exactly when the sum is at least p.
+    The two free high bits of a word (see digits_per_word()) serve the last field in the same way.
+    """
+    shift = np.uint64(digit_bits(p) + 1)
+    result = np.zeros(np.broadcast(a, b).shape, dtype=np.uint64)
+    for low, carry, complement in _field_masks(p):
+        sums = (a & low) + (b & low)
+        at_least_p = ((sums + complement) & carry) >> shift
+        result |= sums - at_least_p * np.uint64(p)
+    return result
+
+
+def add_packed(a: np.ndarray, b: np.ndarray, p: int, n: int) -> np.ndarray:
+    """
+    Adds packed elements word by word: in characteristic 2 it is XOR of words,
+    otherwise coordinates are added mod p in their bit fields (see _add_fields()).
+    """
+    if p == 2:
+        return np.bitwise_xor(a, b)
+    return _add_fields(np.asarray(a, dtype=np.uint64), np.asarray(b, dtype=np.uint64), p)
+
+
+def neg_packed(a: np.ndarray, p: int, n: int) -> np.ndarray:
+    """ Negates packed elements word by word: every coordinate c becomes p - c, reduced mod p. """
+    if p == 2:
+        return np.asarray(a, dtype=np.uint64).copy()
+    bits = digit_bits(p)
+    # p - c is in [1, p] and takes no borrow from the next field.
+    p_in_every_field = np.uint64(sum(p << (bits * i) for i in range(digits_per_word(p))))
+    return _add_fields(p_in_every_field - np.asarray(a, dtype=np.uint64), np.uint64(0), p)
@@ -0,0 +1,94 @@
+import math
+
+import numpy as np
+
+from finite_fields.lfsr import fill_power_vectors, matrix_power
+from utils.logger import logger
+
+# Fields with fewer elements are built serially, a process pool costs more than it saves.
+PARALLEL_THRESHOLD = 1 << 16
+
+
+def build_power_vectors_parallel(count: int, first: np.ndarray, matrix: np.ndarray, p: int, workers: int,
+                                 progress=None, shards_per_worker: int = 4, dtype=np.int32) -> np.ndarray:
+    """
+    Builds the same table as fill_power_vectors, but splits the exponent range into shards.
+    Shard k starts from A^(k·chunk)·first, where the jump matrix A^(k·chunk) is found
+    by repeated squaring, and is filled by a worker process.
+    Workers write straight into the returned table: it is allocated in shared memory,
+    which is handed to them when they start, so the table is never copied.
+    :param count: number of vectors A^i·first, i = 0, ..., count - 1.
+    :param first: first vector of the sequence.
+    :param matrix: n×n matrix A.
+    :param p: characteristic of the field.
+    :param workers: number of worker processes.
+    :param progress: optional callable(done, total), called after every finished shard.
+    :param shards_per_worker: number of shards given to every worker.
+    :param dtype: dtype of the table.
+    :return: np.ndarray of shape (count, n) backed by shared memory.
+    """
+    # Process pools are imported only when they are used, they are slow to import.
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    shards = max(1, min(count, workers * shards_per_worker))
+    chunk = math.ceil(count / shards)
+    first = np.asarray(first, dtype=np.int64) % p
+    shared = allocate_shared((count, len(matrix)), dtype)
+    logger.info(f"Building {count} elements in {math.ceil(count / chunk)} shards on {workers} workers...")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_attach_table,
+                             initargs=(shared,)) as executor:
+        futures = []
+        for start in range(0, count, chunk):
+            start_vector = matrix_power(matrix, start, p).dot(first) % p
+            futures.append(executor.submit(_fill_shard, start, min(start + chunk, count), start_vector, matrix, p))
+        done = 0
+        try:
+            for future in as_completed(futures):
+                done += future.result()
+                if progress is not None:
+                    progress(done, count)
+        except BaseException:
+            # For example, cancellation raised by progress: shards that have not started are dropped.
+            for future in futures:
+                future.cancel()
+            raise
+    return shared_view(shared)
+
+
+def allocate_shared(shape: tuple, dtype) -> tuple:
+    """
+    Allocates a zeroed array in shared memory.
+    :return: handle that is passed to worker processes as an argument of their pool initializer
+        (it can not be sent with tasks), see shared_view().
+    """
+    # Imported only when it is used, like process pools.
+    from multiprocessing.sharedctypes import RawArray
+
+    dtype = np.dtype(dtype)
+    return RawArray('b', max(1, math.prod(shape) * dtype.itemsize)), tuple(shape), dtype.str
+
+
+def share_array(array: np.ndarray) -> tuple:
+    """ Copies an array into shared memory, :return: its handle (see allocate_shared()). """
+    handle = allocate_shared(array.shape, array.dtype)
+    shared_view(handle)[...] = array
+    return handle
+
+
+def shared_view(handle: tuple) -> np.ndarray:
+    """ The array of a handle, in the process that allocated it or in a worker, without copying. """
+    shared, shape, dtype = handle
+    return np.frombuffer(shared, dtype=np.dtype(dtype), count=math.prod(shape)).reshape(shape)
+
+
+_worker_table = None
+
+
+def _attach_table(shared):
+    global _worker_table
+    _worker_table = shared_view(shared)
+
+
+def _fill_shard(start, stop, start_vector, matrix, p):
+    fill_power_vectors(_worker_table[start:stop], start_vector, matrix, p)
+    return stop - start
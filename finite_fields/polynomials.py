@@ -0,0 +1,57 @@
+"""
+Polynomials over GF(p) as np.ndarray of int64 coefficients mod p, lowest degree first unless stated otherwise.
+They are shared by field arithmetic and primitive polynomial search.
+"""
+import numpy as np
+
+
+def poly_trim(a: np.ndarray) -> np.ndarray:
+    nonzero = np.flatnonzero(a)
+    return a[:nonzero[-1] + 1] if len(nonzero) else a[:0]
+
+
+def poly_mod(a: np.ndarray, f: np.ndarray, p: int) -> np.ndarray:
+    """
+    Remainder of a divided by monic f.
+    Polynomials are packed into np.ndarray of int64 coefficients mod p, lowest degree first.
+    """
+    n = len(f) - 1
+    a = np.array(a, dtype=np.int64) % p
+    for i in range(len(a) - 1, n - 1, -1):
+        if a[i]:
+            a[i - n:i + 1] = (a[i - n:i + 1] - a[i] * f) % p
+    return a[:n]
+
+
+def poly_mulmod(a: np.ndarray, b: np.ndarray, f: np.ndarray, p: int) -> np.ndarray:
+    return poly_mod(np.convolve(a, b) % p, f, p)
+
+
+def poly_powmod(a: np.ndarray, exponent: int, f: np.ndarray, p: int) -> np.ndarray:
+    """ a^exponent mod f by repeated squaring. """
+    result = np.zeros(len(f) - 1, dtype=np.int64)
+    result[0] = 1
+    base = poly_mod(a, f, p)
+    while exponent > 0:
+        if exponent & 1:
+            result = poly_mulmod(result, base, f, p)
+        base = poly_mulmod(base, base, f, p)
+        exponent >>= 1
+    return result
+
+
+def poly_gcd(a: np.ndarray, b: np.ndarray, p: int) -> np.ndarray:
+    """ Monic greatest common divisor. """
+    a, b = poly_trim(np.asarray(a, dtype=np.int64) % p), poly_trim(np.asarray(b, dtype=np.int64) % p)
+    while len(b):
+        b_monic = b * pow(int(b[-1]), -1, p) % p
+        a, b = b, poly_trim(poly_mod(a, b_monic, p))
+    return a * pow(int(a[-1]), -1, p) % p if len(a) else a
+
+
+def companion_polynomial(matrix: np.ndarray, p: int) -> np.ndarray:
+    """
+    Polynomial of a companion matrix built by FastPrimitiveFinder.
+    :return: np.ndarray of coefficients, highest degree first.
+    """
+    return np.concatenate(([1], (-np.asarray(matrix[::-1, -1], dtype=np.int64)) % p))
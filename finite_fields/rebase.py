@@ -0,0 +1,234 @@
+"""
+Rebasing a built field on another primitive element.
+
+If β = α^k is another primitive element, the table of powers of β is a strided gather of the table of α:
+β^i = α^(i·k mod p^n - 1). Rows of the table are coordinates in the basis 1, α, ..., α^(n-1),
+and they are converted to the basis 1, β, ..., β^(n-1) by one n×n matrix mod p.
+
+When β is given by its minimal polynomial g (a companion matrix), k is found from a root of g in the field:
+roots are split off by gcd with y^q - y and random equal-degree splitting (Cantor–Zassenhaus),
+with polynomial arithmetic over GF(p^n) done by log and Zech tables of the field.
+"""
+import random
+
+import numpy as np
+
+from finite_fields.log_tables import decode_indices, encode_vectors
+from finite_fields.packed import pack, unpack
+
+# Rows of the new table are converted in chunks of this many rows.
+CHUNK_ROWS = 1 << 16
+
+
+def _trim(a):
+    nonzero = np.flatnonzero(a)
+    return a[:nonzero[-1] + 1] if len(nonzero) else a[:0]
+
+
+def _pad(a, length):
+    result = np.zeros(length, dtype=np.int64)
+    result[:len(a)] = a
+    return result
+
+
+def _sum(field, terms, axis=0):
+    """ Sum of field elements along an axis: their coordinate vectors are added mod p. """
+    return encode_vectors(decode_indices(terms, field.p, field.n).sum(axis=axis) % field.p, field.p)
+
+
+def _monic(field, a):
+    return field.mul(a, field.inv(int(a[-1])))
+
+
+def _mod(field, a, g):
+    """ Remainder of a divided by monic g, coefficients are indices of field elements, lowest degree first. """
+    d = len(g) - 1
+    a = _pad(a, max(len(a), d))
+    for i in range(len(a) - 1, d - 1, -1):
+        if a[i]:
+            a[i - d:i + 1] = field.sub(a[i - d:i + 1], field.mul(int(a[i]), g))
+    return a[:d]
+
+
+def _gcd(field, a, b):
+    a, b = _trim(np.asarray(a, dtype=np.int64)), _trim(np.asarray(b, dtype=np.int64))
+    while len(b):
+        a, b = b, _trim(_mod(field, a, _monic(field, b)))
+    return _monic(field, a) if len(a) else a
+
+
+class _Residues:
+    """
+    Polynomials over the field modulo a monic polynomial g of degree d, as arrays of d coefficients.
+    Products are reduced with precomputed remainders of y^d, ..., y^(2d-2), so multiplication
+    takes a fixed number of vectorized operations.
+    """
+    def __init__(self, field, g):
+        self.field = field
+        self.degree = d = len(g) - 1
+        self.reductions = np.zeros((max(d - 1, 0), d), dtype=np.int64)
+        if d > 1:
+            self.reductions[0] = field.neg(g[:d])
+        for i in range(1, d - 1):
+            previous = self.reductions[i - 1]
+            self.reductions[i] = _sum(field, np.stack((np.concatenate(([0], previous[:-1])),
+                                                       field.mul(int(previous[-1]), self.reductions[0]))))
+
+    def reduce(self, a):
+        d = self.degree
+        low, high = _pad(a[:d], d), np.asarray(a[d:], dtype=np.int64)
+        if not np.any(high):
+            return low
+        return _sum(self.field, np.concatenate(([low], self.field.mul(high[:, np.newaxis],
+                                                                      self.reductions[:len(high)]))))
+
+    def mul(self, a, b):
+        d = self.degree
+        products = self.field.mul(a[:, np.newaxis], b[np.newaxis, :])
+        shifted = np.zeros((d, 2 * d - 1), dtype=np.int64)
+        rows = np.arange(d)[:, np.newaxis]
+        shifted[rows, rows + np.arange(d)] = products
+        return self.reduce(_sum(self.field, shifted))
+
+    def pow(self, a, exponent: int):
+        result = _pad([1], self.degree)
+        while exponent > 0:
+            if exponent & 1:
+                result = self.mul(result, a)
+            a = self.mul(a, a)
+            exponent >>= 1
+        return result
+
+
+def find_root(field, polynomial, seed=0) -> int:
+    """
+    Finds a root of a polynomial over GF(p) in the field.
+    :param polynomial: coefficients, lowest degree first, the leading one nonzero.
+    :return: index of a root.
+    :raise ValueError: if the polynomial has no roots in the field.
+    """
+    p, q = field.p, field.order
+    g = _monic(field, _trim(np.asarray(polynomial, dtype=np.int64) % p))
+    if len(g) < 2:
+        raise ValueError("Constant polynomial has no roots")
+    if g[0] == 0:
+        return 0
+    # Product of distinct linear factors: gcd(g, y^q - y).
+    residues = _Residues(field, g)
+    y = _mod(field, [0, 1], g)
+    g = _gcd(field, g, field.sub(residues.pow(y, q), y))
+    if len(g) < 2:
+        raise ValueError("Polynomial has no roots in the field")
+
+    rng = random.Random(seed)
+    while len(g) > 2:
+        residues = _Residues(field, g)
+        if p == 2:
+            # Trace of c·y: its values are 0 on about half of the roots.
+            splitter = term = _mod(field, [0, rng.randrange(1, q)], g)
+            for _ in range(field.n - 1):
+                term = residues.mul(term, term)
+                splitter = field.add(splitter, term)
+        else:
+            # (y + c)^((q - 1) / 2) is 1 on about half of the roots.
+            splitter = residues.pow(_mod(field, [rng.randrange(q), 1], g), (q - 1) // 2)
+            splitter[0] = field.sub(int(splitter[0]), 1)
+        factor = _gcd(field, g, splitter)
+        if 1 < len(factor) < len(g):
+            g = factor
+    return int(field.neg(int(g[0])))
+
+
+def inverse_mod_p(matrix: np.ndarray, p: int) -> np.ndarray:
+    """
+    Inverse of a square matrix over GF(p) by Gauss–Jordan elimination.
+    :raise ValueError: if the matrix is singular.
+    """
+    n = len(matrix)
+    augmented = np.concatenate((np.asarray(matrix, dtype=np.int64) % p, np.eye(n, dtype=np.int64)), axis=1)
+    for col in range(n):
+        nonzero = np.flatnonzero(augmented[col:, col])
+        if len(nonzero) == 0:
+            raise ValueError("Matrix is singular")
+        pivot = col + nonzero[0]
+        augmented[[col, pivot]] = augmented[[pivot, col]]
+        augmented[col] = augmented[col] * pow(int(augmented[col, col]), -1, p) % p
+        augmented = (augmented - np.outer(augmented[:, col], augmented[col]) * (np.arange(n) != col)[:, np.newaxis]) % p
+    return augmented[:, n:]
+
+
+def basis_conversion(antilog: np.ndarray, exponent: int, p: int, n: int) -> np.ndarray:
+    """
+    Matrix converting coordinates in the basis 1, α, ..., α^(n-1) to the basis 1, β, ..., β^(n-1), β = α^exponent.
+    :param antilog: antilog table of the field of α (see FiniteField.antilog_table).
+    :return: np.ndarray of shape (n, n) and dtype int64.
+    """
+    # Column j holds coordinates of β^j.
+    basis = decode_indices(antilog[np.arange(n, dtype=np.int64) * exponent % len(antilog)], p, n).T
+    return inverse_mod_p(basis, p)
+
+
+def rebase_vectors(vectors: np.ndarray, exponent: int, conversion: np.ndarray, p: int, n: int = None) -> np.ndarray:
+    """
+    Table of powers of β = α^exponent from the table of powers of α.
+    :param vectors: table of shape (p^n - 1, n) whose row i is the coordinate vector of α^(i+1)
+        in the basis 1, α, ..., α^(n-1) (see FiniteField).
+    :param conversion: matrix returned by basis_conversion().
+    :param n: degree of the field, if vectors is a packed table (see packed.pack).
+        Its rows are then unpacked, and rows of the result are packed, by chunks.
+    :return: np.ndarray of shape (p^n - 1, n) and dtype int32 whose row i is the coordinate vector of β^(i+1)
+        in the basis 1, β, ..., β^(n-1), or the packed table of these vectors if n is given.
+    """
+    order = len(vectors)
+    packed = n is not None
+    n = n if packed else vectors.shape[1]
+    dtype = np.float32 if n * (p - 1) ** 2 < 1 << 24 else np.float64
+    conversion = conversion.T.astype(dtype)
+    result = np.empty((order, vectors.shape[1]), dtype=np.uint64 if packed else np.int32)
+    for start in range(0, order, CHUNK_ROWS):
+        powers = np.arange(start + 1, min(order, start + CHUNK_ROWS) + 1, dtype=np.int64)
+        rows = np.take(vectors, (powers * exponent - 1) % order, axis=0)
+        rows = (unpack(rows, p, n) if packed else rows).astype(dtype)
+        rows = (rows @ conversion).astype(np.int32) % np.int32(p)
+        result[start:start + len(rows)] = pack(rows, p) if packed else rows
+    return result
+
+
+def rebase_binary_indices(antilog: np.ndarray, exponent: int, conversion: np.ndarray) -> np.ndarray:
+    """
+    Indices of β^1, ..., β^(2^n - 1) in the field built on β = α^exponent, for p = 2 and n <= 64.
+    They are also the packed words of the table (see packed.pack). The conversion is linear over GF(2),
+    so it is applied to every byte of an index by a lookup table of 256 entries, and the results are XORed.
+    :param antilog: antilog table of the field of α.
+    :param conversion: matrix returned by basis_conversion().
+    :return: np.ndarray of shape (2^n - 1,) and dtype uint64.
+    """
+    order, n = len(antilog), len(conversion)
+    exponents = np.arange(1, order + 1, dtype=np.int64) * exponent % order
+    indices = np.ascontiguousarray(antilog[exponents], dtype='<u8').view(np.uint8).reshape(order, 8)
+    weights = np.uint64(1) << np.arange(n, dtype=np.uint64)
+    byte_bits = (np.arange(256)[:, np.newaxis] >> np.arange(8)) & 1
+    result = np.zeros(order, dtype=np.uint64)
+    for byte in range(-(-n // 8)):
+        columns = conversion[:, 8 * byte:8 * byte + 8]
+        table = ((byte_bits[:, :columns.shape[1]] @ columns.T) % 2).astype(np.uint64) @ weights
+        result ^= table[indices[:, byte]]
+    return result
+
+
+def rebase_log_tables(antilog: np.ndarray, zech: np.ndarray, exponent: int):
+    """
+    Log tables of the field built on β = α^exponent (see log_tables.build_log_tables).
+    1 + β^m = 1 + α^(m·exponent), so Zech logarithms of β are gathered from those of α
+    and divided by the exponent mod p^n - 1.
+    :param antilog: antilog table of β.
+    :param zech: Zech table of α.
+    :return: tuple (antilog, log, zech) of np.ndarray of dtype int64.
+    """
+    order = len(antilog)
+    antilog = np.asarray(antilog, dtype=np.int64)
+    log = np.full(order + 1, -1, dtype=np.int64)
+    log[antilog] = np.arange(order, dtype=np.int64)
+    rebased = zech[np.arange(order, dtype=np.int64) * exponent % order]
+    rebased = np.where(rebased < 0, -1, rebased * pow(exponent, -1, order) % order)
+    return antilog, log, rebased
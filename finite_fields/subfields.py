@@ -0,0 +1,105 @@
+"""
+Subfields, minimal polynomials and multiplicative orders of all elements of a field at once.
+
+Every computation works with exponents: a nonzero element with index i is α^k for k = log_table[i].
+Its multiplicative order is (p^n - 1) / gcd(k, p^n - 1), its conjugates are α^(k·p^j),
+so elements with the same minimal polynomial form a cyclotomic coset {k, k·p, k·p^2, ...} mod p^n - 1,
+and GF(p^d) for d | n consists of zero and the powers of α^((p^n - 1) / (p^d - 1)).
+
+Results are index arrays cached in the memo cache of the field.
+"""
+import numpy as np
+
+from finite_fields.conjugacy import frobenius_orbit_sizes, minimal_polynomials
+from finite_fields.finite_field import FiniteField
+from utils.memo_cache import array_key
+
+
+def _index_dtype(largest: int):
+    return np.int32 if largest < 1 << 31 else np.int64
+
+
+def cyclotomic_cosets(p: int, n: int):
+    """
+    Cyclotomic cosets of p modulo p^n - 1, the exponents of Frobenius orbits.
+    :return: tuple (representatives, sizes, coset_of): sorted smallest exponent of every coset,
+        number of exponents in every coset (it divides n), and coset_of[k] is the number of the coset
+        of exponent k for k in [0, p^n - 1).
+    """
+    order = p ** n - 1
+    exponents = np.arange(order, dtype=np.int64)
+    smallest = exponents.copy()
+    conjugate = exponents
+    for _ in range(n - 1):
+        conjugate = conjugate * p % order
+        np.minimum(smallest, conjugate, out=smallest)
+    representatives = np.flatnonzero(smallest == exponents)
+    coset_of = np.searchsorted(representatives, smallest).astype(_index_dtype(len(representatives)))
+    return representatives, frobenius_orbit_sizes(representatives, p, n), coset_of
+
+
+def element_orders(field: FiniteField) -> np.ndarray:
+    """ :return: np.ndarray whose element i is the multiplicative order of the element with index i, 0 for zero. """
+    def compute():
+        order = field.order - 1
+        logs = field.log_table
+        orders = np.zeros(field.order, dtype=_index_dtype(order))
+        orders[1:] = order // np.gcd(logs[1:], order)
+        return orders
+
+    return field.memo_cache.get_or_create(_key("element_orders", field), compute)
+
+
+def subfield(field: FiniteField, d: int) -> np.ndarray:
+    """
+    Elements of the subfield GF(p^d).
+    :raise ValueError: if d does not divide n.
+    :return: sorted np.ndarray of p^d indices, zero included.
+    """
+    if d < 1 or field.n % d:
+        raise ValueError(f"GF({field.p}^{field.n}) has no subfield of size {field.p}^{d}")
+
+    def compute():
+        step = (field.order - 1) // (field.p ** d - 1)
+        powers = field.antilog_table[np.arange(0, field.order - 1, step)]
+        return np.sort(np.concatenate(([0], powers))).astype(_index_dtype(field.order))
+
+    return field.memo_cache.get_or_create(_key(f"subfield_{d}", field), compute)
+
+
+def subfields(field: FiniteField) -> dict:
+    """ :return: dict d -> subfield(field, d) for every divisor d of n. """
+    return {d: subfield(field, d) for d in range(1, field.n + 1) if field.n % d == 0}
+
+
+def minimal_polynomial_table(field: FiniteField):
+    """
+    Minimal polynomials of all elements, one per conjugacy class.
+    :return: tuple (polynomials, degrees, class_of): np.ndarray of shape (classes, n + 1) of coefficients
+        (lowest degree first, zeros after the leading one), np.ndarray of their degrees, and class_of[i] is
+        the row of the minimal polynomial of the element with index i. Row 0 is x, the polynomial of zero,
+        row j > 0 belongs to the j-th cyclotomic coset of exponents.
+    """
+    def compute():
+        representatives, sizes, coset_of = cyclotomic_cosets(field.p, field.n)
+        dtype = np.int8 if field.p < 128 else np.int64
+        polynomials = np.zeros((len(representatives) + 1, field.n + 1), dtype=dtype)
+        polynomials[0, 1] = 1
+        polynomials[1:] = minimal_polynomials(field, representatives)
+        degrees = np.concatenate(([1], sizes)).astype(np.int16)
+        class_of = np.zeros(field.order, dtype=coset_of.dtype)
+        class_of[1:] = coset_of[field.log_table[1:]] + 1
+        return polynomials, degrees, class_of
+
+    return field.memo_cache.get_or_create(_key("minimal_polynomials", field), compute)
+
+
+def minimal_polynomial(field: FiniteField, index: int) -> np.ndarray:
+    """ :return: coefficients of the minimal polynomial of the element with given index, lowest degree first. """
+    polynomials, degrees, class_of = minimal_polynomial_table(field)
+    row = class_of[index]
+    return polynomials[row, :degrees[row] + 1].astype(np.int64)
+
+
+def _key(kind: str, field: FiniteField):
+    return array_key(kind, field.p, field.n, field.primitive_matrix)
@@ -1,107 +1,128 @@
-import math
-import threading
 import tkinter as tk
 import numpy as np
-# noinspection PyPackageRequirements
-from formation import AppBuilder
 from tkinter import messagebox
 
+from finite_fields.field_cache import FieldCache
 from finite_fields.finite_field import FiniteField
 from primitive_element_finders.fast_primitive_finder import FastPrimitiveFinder
-from utils.is_prime import is_prime_power
+from gui.job_scheduler import JobScheduler
+from gui.tiled_matrix_view import TiledMatrixView
+from gui.virtual_element_list import VirtualElementList
+from utils.field_size import NotPrimePowerError, parse_field_size
+from wrappers.traced import traced
 
 
 class FiniteFieldsApp:
     def __init__(self):
         self._current_canvas = None
         self.primitive = None
+        # formation is imported here, so that importing the module stays cheap.
+        # noinspection PyPackageRequirements
+        from formation import AppBuilder
+
         self.app = AppBuilder(path='resources/finite_fields_app_formation.xml')
-        self.__primitive_finder = None
+        self.__cache = FieldCache()
+        self.__scheduler = JobScheduler(self.app._root)
+        # Finders are used only by jobs, so they are touched only by the worker thread.
+        self.__primitive_finders = {}
         self.__finite_field = None
-        self.__elements = None
+        self.__element_list = None
         self.__p = None
         self.__n = None
         self.init_app()
 
     def run(self):
         self.app.mainloop()
+        self.__scheduler.shutdown()
 
     def init_app(self):
         self.__change_lang_to_russian()
         scrollbar = tk.Scrollbar(self.app._root)
         scrollbar.pack(side=tk.RIGHT, fill=tk.BOTH)
-        self.app.listbox_field_elements.config(yscrollcommand=scrollbar.set)
-        scrollbar.config(command=self.app.listbox_field_elements.yview)
+        self.__element_list = VirtualElementList(self.app.listbox_field_elements, scrollbar)
         self.app.progressbar['value'] = 0
         self.app.button_find_field['command'] = self.press_find_button
         self.app.button_use_another_primitive['command'] = self.pres_find_with_another_primitive_button
 
     def press_find_button(self):
-        self.app.progressbar['value'] = 0
-        threading.Thread(target=self.find_primitive_and_build_field, daemon=True).start()
-
-    def pres_find_with_another_primitive_button(self):
-        self.app.progressbar['value'] = 0
-        threading.Thread(target=self.find_with_another_primitve, daemon=True).start()
-
-    def find_primitive_and_build_field(self):
-        text: str = self.app.entry_field_size.get()
-        if not len(text.split('^')) == 2 and not text.isdecimal():
+        try:
+            p, n = parse_field_size(self.app.entry_field_size.get())
+        except NotPrimePowerError as e:
+            messagebox.showerror("Ошибка", f"{e.num} - это не степень простого числа")
+            return
+        except ValueError:
             messagebox.showerror("Ошибка", "Введите в поле степень простого числа")
             return
-        if '^' in text:
-            try:
-                num = int(text.split('^')[0]) ** int(text.split('^')[1])
-            except ValueError:
-                messagebox.showerror("Ошибка", "Введите в поле степень простого числа")
-                return
-        else:
-            num = int(text)
+        self.__start_job(p, n, next_primitive=False)
 
-        self.__p = is_prime_power(num)
-        if self.__p == -1:
-            messagebox.showerror("Ошибка", f"{num} - это не степень простого числа")
+    def pres_find_with_another_primitive_button(self):
+        if self.__p is None:
             return
-        self.app.button_find_field['state'] = 'disabled'
+        self.app.entry_field_size.delete(0, tk.END)
+        self.app.entry_field_size.insert(0, f"{self.__p}^{self.__n}")
+        self.__start_job(self.__p, self.__n, next_primitive=True)
+
+    def __start_job(self, p, n, next_primitive):
+        """ Starts finding a primitive element and building the field, abandoning the previous job. """
         self.app.progressbar['value'] = 0
-        self.__p, self.__n = round(self.__p), round(math.log(num, self.__p))
-        self.__primitive_finder = FastPrimitiveFinder(self.__p, self.__n)
-        self.app.label_status['text'] = "Поиск примитивного элемента..."
-        primitive = self.__primitive_finder.find_first()
-        self.app.progressbar['value'] = 20
-        self.__finite_field = FiniteField(self.__p, self.__n, primitive)
-        self.app.label_status['text'] = "Построение конечного поля..."
-        self.__elements = self.__finite_field.get_elements(view='vector', progressbar=self.app.progressbar)
-        self.app.progressbar['value'] = 90
-        self.app.label_status['text'] = "Заполнение списка..."
-        self.app._root.after(0, self.fill_listbox)
+        self.app.button_use_another_primitive['state'] = 'disabled'
+        # Another primitive of the shown field is rebased on its table instead of building a new one.
+        base = self.__finite_field if next_primitive else None
+        self.__scheduler.submit(f"{p}^{n}", self.__find_primitive_and_build_field_job(p, n, next_primitive, base),
+                                on_done=self.__show_field, on_progress=self.__show_progress,
+                                on_error=self.__show_error)
+
+    def __find_primitive_and_build_field_job(self, p, n, next_primitive, base: FiniteField = None):
+        def job(token, progress):
+            progress(0, "Поиск примитивного элемента...")
+            finder = self.__primitive_finders.get((p, n))
+            if finder is None:
+                finder = self.__primitive_finders[(p, n)] = FastPrimitiveFinder(p, n, cache=self.__cache)
+            if next_primitive:
+                primitive = finder.find_next(cancel_token=token)
+            else:
+                primitive = finder.find_first(cancel_token=token)
+            token.raise_if_cancelled()
+
+            key = (p, n, primitive.tobytes())
+            field = self.__scheduler.results.get(key)
+            if field is None:
+                progress(20, "Построение конечного поля...")
+                if base is not None and (base.p, base.n) == (p, n):
+                    field = base.rebase(primitive)
+                else:
+                    field = FiniteField(p, n, primitive, cache=self.__cache)
+                    field.build(progress=lambda done, total: progress(20 + int((done / total) * 70)),
+                                cancel_token=token)
+                self.__scheduler.results.put(key, field)
+            progress(90, "Заполнение списка...")
+            return p, n, primitive, field
+        return job
+
+    def __show_progress(self, value, status):
+        self.app.progressbar['value'] = value
+        if status is not None:
+            self.app.label_status['text'] = status
+
+    def __show_error(self, error):
+        self.app.label_status['text'] = ""
+        messagebox.showerror("Ошибка", str(error))
+
+    @traced("gui.show_field")
+    def __show_field(self, result):
+        self.__p, self.__n, primitive, self.__finite_field = result
+        self.fill_listbox()
         self.draw_matrix(primitive)
-        self.app.button_find_field['state'] = 'normal'
         self.app.button_use_another_primitive['state'] = 'normal'
 
-    def find_with_another_primitve(self):
-        if self.__primitive_finder is not None:
-            self.app.entry_field_size.delete(0, tk.END)
-            self.app.entry_field_size.insert(0, f"{self.__p}^{self.__n}")
-
-            self.app.button_find_field['state'] = 'disabled'
-            self.app.button_use_another_primitive['state'] = 'disabled'
-            self.app.label_status['text'] = "Поиск примитивного элемента..."
-            primitive = self.__primitive_finder.find_next()
-            self.app.progressbar['value'] = 20
-            self.__finite_field = FiniteField(self.__p, self.__n, primitive)
-            self.app.label_status['text'] = "Построение конечного поля..."
-            self.__elements = self.__finite_field.get_elements(view='vector', progressbar=self.app.progressbar)
-            self.app.progressbar['value'] = 90
-            self.app.label_status['text'] = "Заполнение списка..."
-            self.app._root.after(0, self.fill_listbox)
-            self.draw_matrix(primitive)
-            self.app.button_find_field['state'] = 'normal'
-            self.app.button_use_another_primitive['state'] = 'normal'
-
     def fill_listbox(self):
-        self.app.listbox_field_elements.delete(0, tk.END)
-        self.app.listbox_field_elements.insert("end", *[f"A^{i+1} = {self.__elements[i]}" for i in range(0, min(1000, len(self.__elements)))])
+        field = self.__finite_field
+
+        def load_rows(start, stop):
+            chunk = next(field.iter_elements('vector', start + 1, stop + 1, chunk_size=stop - start))
+            return [f"A^{start + i + 1} = {vector}" for i, vector in enumerate(chunk)]
+
+        self.__element_list.set_source(field.order - 1, load_rows)
         self.app.progressbar['value'] = 100
         self.app.label_status['text'] = "Поле построено!"
 
@@ -130,8 +151,9 @@ class FiniteFieldsApp:
         )
         self._current_canvas.grid(row=0, column=0, sticky="nsew")
 
-        self._h_scrollbar.config(command=self._current_canvas.xview)
-        self._v_scrollbar.config(command=self._current_canvas.yview)
+        matrix_view = TiledMatrixView(self._current_canvas, array, title, cell_size)
+        self._h_scrollbar.config(command=matrix_view.xview)
+        self._v_scrollbar.config(command=matrix_view.yview)
 
         if cols * cell_size + 40 > 290:
             self._h_scrollbar.grid(row=1, column=0, sticky="ew")
@@ -147,30 +169,7 @@ class FiniteFieldsApp:
             self._v_scrollbar.grid_forget()
             self._current_canvas.configure(yscrollcommand="")
 
-        self._current_canvas.create_text(20, 20, text=title, font=("Arial", 12, "bold"), anchor="nw")
-
-        top_offset = 40
-        for i in range(rows):
-            y_top = i * cell_size + top_offset + 5
-            y_bottom = (i + 1) * cell_size + top_offset - 5
-
-            self._current_canvas.create_line(10, y_top, 10, y_bottom, width=2)
-            if i == 0:
-                self._current_canvas.create_line(10, y_top, 20, y_top, width=2)
-            if i == rows - 1:
-                self._current_canvas.create_line(10, y_bottom, 20, y_bottom, width=2)
-            x_right = cols * cell_size + 30
-            self._current_canvas.create_line(x_right, y_top, x_right, y_bottom, width=2)
-            if i == 0:
-                self._current_canvas.create_line(x_right - 10, y_top, x_right, y_top, width=2)
-            if i == rows - 1:
-                self._current_canvas.create_line(x_right - 10, y_bottom, x_right, y_bottom, width=2)
-
-        for i in range(rows):
-            for j in range(cols):
-                x = j * cell_size + 30
-                y = i * cell_size + top_offset + cell_size // 2
-                self._current_canvas.create_text(x, y, text=str(array[i, j]), font=("Arial", 10), fill="black")
+        matrix_view.render()
 
     def __change_lang_to_russian(self):
         self.app.label_field_size['text'] = 'Размер поля'
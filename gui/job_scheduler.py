@@ -0,0 +1,144 @@
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.cancellation import CancellationToken, OperationCancelled
+from utils.logger import logger
+
+
+class Job:
+    """ Handle of a job submitted to JobScheduler. """
+    def __init__(self, name: str):
+        self.name = name
+        self.token = CancellationToken()
+        self.future = None
+
+    def cancel(self):
+        self.token.cancel()
+
+    @property
+    def cancelled(self):
+        return self.token.cancelled
+
+
+class ResultCache:
+    """
+    Thread-safe LRU dictionary of results of finished jobs.
+    It keeps the last built fields alive, so switching back to one of them neither rebuilds nor
+    waits for tables evicted from the memo cache.
+    """
+    def __init__(self, max_items: int = 8):
+        self.__max_items = max_items
+        self.__items = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key):
+        with self.__lock:
+            if key not in self.__items:
+                return None
+            self.__items.move_to_end(key)
+            return self.__items[key]
+
+    def put(self, key, value):
+        with self.__lock:
+            self.__items[key] = value
+            self.__items.move_to_end(key)
+            while len(self.__items) > self.__max_items:
+                self.__items.popitem(last=False)
+
+    def __contains__(self, key):
+        with self.__lock:
+            return key in self.__items
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__items)
+
+
+class JobScheduler:
+    """
+    Runs GUI jobs one at a time on a single background worker.
+
+    A job is a callable job(token, progress) that polls token (CancellationToken) and reports
+    progress with progress(value, status=None). Submitting a new job cancels the current one,
+    so a stale build is abandoned at its next cancellation check.
+
+    Worker threads never touch Tk widgets: progress and completion callbacks are put into a queue
+    which is drained on the Tk thread by a callback rescheduled with root.after().
+    Callbacks of cancelled jobs are dropped.
+    """
+    POLL_INTERVAL_MS = 30
+
+    def __init__(self, root, result_cache_size: int = 8):
+        self.__root = root
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gui-job")
+        self.__callbacks = queue.SimpleQueue()
+        self.__current: Job = None
+        self.__closed = False
+        self.results = ResultCache(result_cache_size)
+        self.__root.after(self.POLL_INTERVAL_MS, self.__poll)
+
+    @property
+    def current(self) -> Job:
+        return self.__current
+
+    def submit(self, name: str, job, on_done, on_progress=None, on_error=None) -> Job:
+        """
+        Cancels the current job and schedules a new one. Must be called on the Tk thread.
+        :param job: callable(token, progress) that runs on the worker thread.
+        :param on_done: callable(result), called on the Tk thread.
+        :param on_progress: callable(value, status), called on the Tk thread.
+        :param on_error: callable(exception), called on the Tk thread.
+        :return: Job.
+        """
+        self.cancel()
+        handle = Job(name)
+        self.__current = handle
+
+        def progress(value, status=None):
+            handle.token.raise_if_cancelled()
+            if on_progress is not None:
+                self.__post(handle, on_progress, value, status)
+
+        def run():
+            if handle.cancelled:
+                return
+            try:
+                result = job(handle.token, progress)
+            except OperationCancelled:
+                logger.info(f"Job {handle.name} is cancelled.")
+                return
+            except Exception as e:
+                logger.exception(f"Job {handle.name} failed.")
+                if on_error is not None:
+                    self.__post(handle, on_error, e)
+                return
+            self.__post(handle, on_done, result)
+
+        handle.future = self.__executor.submit(run)
+        return handle
+
+    def cancel(self):
+        if self.__current is not None:
+            self.__current.cancel()
+            self.__current = None
+
+    def shutdown(self):
+        self.__closed = True
+        self.cancel()
+        self.__executor.shutdown(wait=False)
+
+    def __post(self, handle, callback, *args):
+        self.__callbacks.put((handle, callback, args))
+
+    def __poll(self):
+        while True:
+            try:
+                handle, callback, args = self.__callbacks.get_nowait()
+            except queue.Empty:
+                break
+            if not handle.cancelled:
+                callback(*args)
+        if not self.__closed:
+            self.__root.after(self.POLL_INTERVAL_MS, self.__poll)
@@ -0,0 +1,90 @@
+import numpy as np
+
+from wrappers.traced import traced
+
+
+class TiledMatrixView:
+    """
+    Draws a matrix on a tk.Canvas in square tiles of cells.
+
+    Only tiles that intersect the visible part of the canvas have canvas items,
+    tiles are created when they are scrolled into view and deleted when they leave it,
+    so the number of canvas items does not depend on the size of the matrix.
+    Use xview() and yview() as commands of the canvas scrollbars.
+    """
+    TOP_OFFSET = 40
+    LEFT_OFFSET = 30
+
+    def __init__(self, canvas, array: np.ndarray, title: str = "A^1 =", cell_size: int = 25, tile_size: int = 16):
+        self.__canvas = canvas
+        self.__array = array
+        self.__cell_size = cell_size
+        self.__tile_size = tile_size
+        self.__tiles = set()
+        self.__draw_frame(title)
+        self.__canvas.bind("<Configure>", lambda event: self.render())
+
+    def xview(self, *args):
+        self.__canvas.xview(*args)
+        self.render()
+
+    def yview(self, *args):
+        self.__canvas.yview(*args)
+        self.render()
+
+    def visible_tiles(self, left, top, right, bottom) -> set:
+        """
+        Tiles that intersect given rectangle of canvas coordinates.
+        :return: set of (tile row, tile column).
+        """
+        rows, cols = self.__array.shape
+        span = self.__tile_size * self.__cell_size
+        tile_rows = -(-rows // self.__tile_size)
+        tile_cols = -(-cols // self.__tile_size)
+        first_row = max(0, int(top - self.TOP_OFFSET) // span)
+        last_row = min(tile_rows - 1, int(bottom - self.TOP_OFFSET) // span)
+        first_col = max(0, int(left - self.LEFT_OFFSET + self.__cell_size // 2) // span)
+        last_col = min(tile_cols - 1, int(right - self.LEFT_OFFSET + self.__cell_size // 2) // span)
+        return {(r, c) for r in range(first_row, last_row + 1) for c in range(first_col, last_col + 1)}
+
+    @traced("gui.matrix_view.render")
+    def render(self):
+        left = self.__canvas.canvasx(0)
+        top = self.__canvas.canvasy(0)
+        visible = self.visible_tiles(left, top, left + self.__canvas.winfo_width(),
+                                     top + self.__canvas.winfo_height())
+        for tile in self.__tiles - visible:
+            self.__canvas.delete(self.__tag(tile))
+        for tile in visible - self.__tiles:
+            self.__draw_tile(tile)
+        self.__tiles = visible
+
+    def __draw_tile(self, tile):
+        tile_row, tile_col = tile
+        rows = range(tile_row * self.__tile_size, min((tile_row + 1) * self.__tile_size, self.__array.shape[0]))
+        cols = range(tile_col * self.__tile_size, min((tile_col + 1) * self.__tile_size, self.__array.shape[1]))
+        tag = self.__tag(tile)
+        for i in rows:
+            y = i * self.__cell_size + self.TOP_OFFSET + self.__cell_size // 2
+            for j in cols:
+                x = j * self.__cell_size + self.LEFT_OFFSET
+                self.__canvas.create_text(x, y, text=str(self.__array[i, j]), font=("Arial", 10), fill="black",
+                                          tags=tag)
+
+    def __draw_frame(self, title):
+        rows, cols = self.__array.shape
+        canvas = self.__canvas
+        canvas.create_text(20, 20, text=title, font=("Arial", 12, "bold"), anchor="nw")
+        y_top = self.TOP_OFFSET + 5
+        y_bottom = rows * self.__cell_size + self.TOP_OFFSET - 5
+        x_right = cols * self.__cell_size + 30
+        canvas.create_line(10, y_top, 10, y_bottom, width=2)
+        canvas.create_line(10, y_top, 20, y_top, width=2)
+        canvas.create_line(10, y_bottom, 20, y_bottom, width=2)
+        canvas.create_line(x_right, y_top, x_right, y_bottom, width=2)
+        canvas.create_line(x_right - 10, y_top, x_right, y_top, width=2)
+        canvas.create_line(x_right - 10, y_bottom, x_right, y_bottom, width=2)
+
+    @staticmethod
+    def __tag(tile):
+        return f"tile_{tile[0]}_{tile[1]}"
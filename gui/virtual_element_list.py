@@ -0,0 +1,106 @@
+import tkinter as tk
+import tkinter.font
+from collections import OrderedDict
+
+from wrappers.traced import traced
+
+
+class VirtualElementList:
+    """
+    Virtualized view of a long list of rows in an existing tk.Listbox.
+
+    The listbox holds only the rows that are visible, and the scrollbar is driven
+    by the position in the whole list. Rows are produced on demand by load_rows(start, stop),
+    which must return a list of strings. Loaded rows are kept in a few pages in LRU order,
+    so memory does not depend on the length of the list.
+    """
+    PAGE_SIZE = 256
+    MAX_PAGES = 8
+
+    def __init__(self, listbox, scrollbar, visible_rows: int = None):
+        self.__listbox = listbox
+        self.__scrollbar = scrollbar
+        self.__visible_rows = visible_rows
+        self.__count = 0
+        self.__top = 0
+        self.__load_rows = None
+        self.__pages = OrderedDict()
+        self.__listbox.config(yscrollcommand="")
+        self.__scrollbar.config(command=self.yview)
+        self.__listbox.bind("<MouseWheel>", self.__on_mouse_wheel)
+        self.__listbox.bind("<Button-4>", lambda event: self.yview("scroll", -3, "units"))
+        self.__listbox.bind("<Button-5>", lambda event: self.yview("scroll", 3, "units"))
+        self.__listbox.bind("<Configure>", lambda event: self.refresh())
+
+    @property
+    def count(self):
+        return self.__count
+
+    @property
+    def top(self):
+        """ Index of the first visible row. """
+        return self.__top
+
+    def set_source(self, count: int, load_rows):
+        """
+        Replaces the list.
+        :param count: number of rows.
+        :param load_rows: callable(start, stop) returning list of strings for rows start, ..., stop - 1.
+        """
+        self.__count = count
+        self.__load_rows = load_rows
+        self.__pages.clear()
+        self.__top = 0
+        self.refresh()
+
+    def clear(self):
+        self.set_source(0, None)
+
+    def row(self, index: int) -> str:
+        page, offset = divmod(index, self.PAGE_SIZE)
+        if page in self.__pages:
+            self.__pages.move_to_end(page)
+        else:
+            start = page * self.PAGE_SIZE
+            self.__pages[page] = self.__load_rows(start, min(start + self.PAGE_SIZE, self.__count))
+            if len(self.__pages) > self.MAX_PAGES:
+                self.__pages.popitem(last=False)
+        return self.__pages[page][offset]
+
+    def yview(self, *args):
+        """ Scrollbar command: ('moveto', fraction) or ('scroll', number, 'units' | 'pages'). """
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self.__count))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= max(1, self.__rows_in_view() - 1)
+            self.scroll_to(self.__top + step)
+
+    def scroll_to(self, index: int):
+        self.__top = index
+        self.refresh()
+
+    @traced("gui.element_list.refresh")
+    def refresh(self):
+        rows = self.__rows_in_view()
+        self.__top = max(0, min(self.__top, self.__count - rows))
+        stop = min(self.__count, self.__top + rows)
+        self.__listbox.delete(0, tk.END)
+        if stop > self.__top:
+            self.__listbox.insert(tk.END, *[self.row(i) for i in range(self.__top, stop)])
+        if self.__count == 0:
+            self.__scrollbar.set(0, 1)
+        else:
+            self.__scrollbar.set(self.__top / self.__count, stop / self.__count)
+
+    def __rows_in_view(self):
+        if self.__visible_rows is not None:
+            return self.__visible_rows
+        font = tkinter.font.Font(root=self.__listbox, font=self.__listbox.cget("font"))
+        return max(1, self.__listbox.winfo_height() // (font.metrics("linespace") + 1))
+
+    def __on_mouse_wheel(self, event):
+        self.yview("scroll", -3 if event.delta > 0 else 3, "units")
@@ -1,5 +1,12 @@
-from gui.finite_fields_app import FiniteFieldsApp
+import os
 
+from gui.finite_fields_app import FiniteFieldsApp
+from utils.instrumentation import tracing
 
 app = FiniteFieldsApp()
-app.run()
+# FINITE_FIELDS_TRACE=trace.json records spans of the session into a Chrome trace file.
+if os.environ.get("FINITE_FIELDS_TRACE"):
+    with tracing(os.environ["FINITE_FIELDS_TRACE"]):
+        app.run()
+else:
+    app.run()
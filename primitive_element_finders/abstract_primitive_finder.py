@@ -1,11 +1,38 @@
 from abc import abstractmethod
 
+from utils.async_pool import AsyncPool, shared_async_pool
+from utils.cancellation import CancellationToken
+
 
 class AbstractPrimitiveFinder:
     @abstractmethod
-    def find_first(self):
+    def find_first(self, cancel_token: CancellationToken = None):
         pass
 
     @abstractmethod
-    def find_all(self):
-        pass
\ No newline at end of file
+    def find_all(self, cancel_token: CancellationToken = None):
+        pass
+
+    async def find_first_async(self, pool: AsyncPool = None):
+        """
+        find_first() run in an AsyncPool (shared_async_pool() by default).
+        Concurrent calls with the same coalescing key share one search, also calls of different finders.
+        When every call waiting for a search is cancelled, the search is stopped through its CancellationToken.
+        """
+        return await self.__run(pool, "find_first", self.find_first)
+
+    async def find_all_async(self, pool: AsyncPool = None):
+        """ find_all() run in an AsyncPool, see find_first_async(). """
+        return await self.__run(pool, "find_all", self.find_all)
+
+    async def __run(self, pool: AsyncPool, method: str, function):
+        token = CancellationToken()
+        return await (pool or shared_async_pool()).run(self._coalescing_key(method), function, token, token=token)
+
+    def _coalescing_key(self, method: str):
+        """ Key of AsyncPool.run() for the method: finders of one class with the same search key find the same. """
+        return (type(self).__name__, method) + self._search_key()
+
+    def _search_key(self) -> tuple:
+        """ Parameters that determine found elements, such as p, n and search mode; by default the finder itself. """
+        return id(self),
@@ -4,8 +4,12 @@ import numpy as np
 
 from custom_collections.list_set import ListSet
 from primitive_element_finders.abstract_primitive_finder import AbstractPrimitiveFinder
-from primitive_element_finders.dumb_primitive_pow_functions import DumbPrimitivePowFunctions
+from primitive_element_finders.dumb_primitive_pow_functions import DumbPrimitivePowFunctions, check_compiled_size
+from utils.cancellation import CancellationToken
 from utils.logger import logger
+from utils.memo_cache import MemoCache
+from utils.number_theory import prime_factors
+from wrappers.traced import traced
 
 
 class DumbPrimitiveElementFinder(AbstractPrimitiveFinder):
@@ -19,6 +23,20 @@ class DumbPrimitiveElementFinder(AbstractPrimitiveFinder):
 
     This implementation is very slow!
 
+    With batch_size given, candidates are generated as NumPy blocks of batch_size coefficient tuples,
+    and all candidate matrices of a block are raised to (p^n - 1) / r for every prime r | p^n - 1
+    and to p^n - 1 at once with batched modular matmul. A candidate is primitive
+    when only the last power is the identity matrix. This mode is usable for p^n up to about 10^5.
+
+    With compiled=True blocks of candidates are instead tested with the power functions
+    compiled to coefficient tensors (see DumbPrimitivePowFunctions.get_compiled()),
+    which are shared between finders of the same field through memo_cache.
+    The tensors grow as p^(2n), so compiled mode raises ValueError for fields above
+    COMPILED_MAX_BYTES of dumb_primitive_pow_functions, which is about GF(2^10).
+
+    Every mode checks cancel_token of find_first() and find_all() between candidates (between blocks
+    in batched and compiled modes), and find_first_async() calls of finders of the same field share one search.
+
     Methods:
     -------
     find_any_primitive():
@@ -27,20 +45,34 @@ class DumbPrimitiveElementFinder(AbstractPrimitiveFinder):
         Finds and returns all primitive elements.
     """
 
-    def __init__(self, p: int, n: int,):
+    def __init__(self, p: int, n: int, batch_size: int = None, compiled: bool = False,
+                 memo_cache: MemoCache = None):
+        if compiled:
+            check_compiled_size(p, n)
         self.__p = p
         self.__n = n
-        self.__functions = DumbPrimitivePowFunctions(p, n)
+        self.__batch_size = batch_size if batch_size is not None or not compiled else 256
+        self.__compiled = compiled
+        self.__functions = DumbPrimitivePowFunctions(p, n, memo_cache)
         self.__cached_primitive: np.ndarray = None
         self.__cached_primitives: list = None
         self.__primitive_pow_zero = self.__get_primitive_pow_zero()
         self.__is_found_all_primitives = False
 
-    def find_first(self):
+    @traced("dumb_finder.find_first")
+    def find_first(self, cancel_token: CancellationToken = None):
         if self.__cached_primitive is not None:
             return self.__cached_primitive
         logger.info("Finding single primitive element...")
+        if self.__batch_size is not None:
+            for primitives in self.__find_batched(cancel_token):
+                if len(primitives) > 0:
+                    self.__cached_primitive = np.asarray(primitives[0], dtype=np.int64)
+                    return self.__cached_primitive
+            return None
         for args_list in product(range(self.__p), repeat=self.__n):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
             if self.__functions.get()[-1](*args_list) == self.__primitive_pow_zero:
                 flag = True
                 for function in self.__functions.get()[:-1]:
@@ -52,12 +84,22 @@ class DumbPrimitiveElementFinder(AbstractPrimitiveFinder):
                     self.__cached_primitive = np.asarray(primitive)
                     return self.__cached_primitive
 
-    def find_all(self):
+    @traced("dumb_finder.find_all")
+    def find_all(self, cancel_token: CancellationToken = None):
         if self.__is_found_all_primitives:
             return self.__cached_primitives
         self.__cached_primitives = []
         logger.info("Finding all primitive elements...")
+        if self.__batch_size is not None:
+            for primitives in self.__find_batched(cancel_token):
+                self.__cached_primitives.extend(primitives.astype(np.int32))
+            if self.__cached_primitive is None and self.__cached_primitives:
+                self.__cached_primitive = np.asarray(self.__cached_primitives[0], dtype=np.int32)
+            self.__is_found_all_primitives = True
+            return self.__cached_primitives
         for args_list in product(range(self.__p), repeat=self.__n):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
             if self.__functions.get()[-1](*args_list) == self.__primitive_pow_zero:
                 flag = True
                 for function in self.__functions.get()[:-1]:
@@ -72,6 +114,62 @@ class DumbPrimitiveElementFinder(AbstractPrimitiveFinder):
         self.__is_found_all_primitives = True
         return self.__cached_primitives
 
+    def __find_batched(self, cancel_token: CancellationToken = None):
+        """
+        Generates arrays of primitive elements found in consecutive blocks of candidates,
+        in the same order as itertools.product(range(p), repeat=n).
+        :param cancel_token: checked before every block.
+        """
+        p, n = self.__p, self.__n
+        order = p ** n - 1
+        exponents = [order // r for r in prime_factors(order)] if order > 1 else []
+        weights = p ** np.arange(n - 1, -1, -1, dtype=np.int64)
+        identity = np.eye(n)
+        for start in range(0, p ** n, self.__batch_size):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            candidates = np.arange(start, min(start + self.__batch_size, p ** n), dtype=np.int64)
+            values = (candidates[:, np.newaxis] // weights) % p
+            values = values[values[:, -1] != 0]
+            if self.__compiled:
+                yield self.__create_shifted_matrices(values[self.__is_primitive_compiled(values)]).astype(np.int64)
+                continue
+            matrices = self.__create_shifted_matrices(values)
+            matrices = matrices[np.all(self.__batched_power(matrices, order) == identity, axis=(1, 2))]
+            for exponent in exponents:
+                matrices = matrices[~np.all(self.__batched_power(matrices, exponent) == identity, axis=(1, 2))]
+            yield matrices.astype(np.int64)
+
+    def __is_primitive_compiled(self, values):
+        powers = self.__functions.evaluate_many(values)
+        is_one = np.all(powers == self.__primitive_pow_zero, axis=2)
+        return is_one[:, -1] & ~np.any(is_one[:, :-1], axis=1)
+
+    def _search_key(self) -> tuple:
+        return self.__p, self.__n
+
+    def __batched_power(self, matrices, exponent):
+        """
+        Raises every matrix of the stack to the power mod p by repeated squaring.
+        Matrices are float64, which is exact while n·p^2 < 2^53 and much faster for np.matmul.
+        """
+        result = np.broadcast_to(np.eye(self.__n), matrices.shape).copy()
+        base = matrices
+        while exponent > 0:
+            if exponent & 1:
+                result = np.matmul(result, base) % self.__p
+            base = np.matmul(base, base) % self.__p
+            exponent >>= 1
+        return result
+
+    def __create_shifted_matrices(self, values):
+        """ Vectorized __create_shifted_matrix for a block of value tuples. """
+        n = self.__n
+        matrices = np.zeros((len(values), n, n))
+        matrices[:, np.arange(1, n), np.arange(n - 1)] = 1
+        matrices[:, :, -1] = values[:, ::-1]
+        return matrices
+
     def __get_primitive_pow_zero(self):
         a = [0] * self.__n
         a[-1] = 1
@@ -1,27 +1,138 @@
-from sympy import symbols, sympify, expand, lambdify, isprime
+import numpy as np
 
 from primitive_element_finders.primitive_pow_functions import AbstractPrimitivePowFunctions
 from utils.logger import logger
+from utils.memo_cache import MemoCache, array_key, shared_memo_cache
+from utils.number_theory import is_prime
+
+# Largest compiled tensor, in bytes. Its size grows as p^(2n), so compiled mode is refused
+# for bigger fields: GF(2^10) needs 84 MB, GF(2^16) would need about 550 GB.
+COMPILED_MAX_BYTES = 1 << 28
+
+
+def compiled_nbytes(p: int, n: int) -> int:
+    """ Size in bytes of the compiled tensor of shape (p^n - 1, n, p^n) for GF(p^n). """
+    return (p ** n - 1) * n * p ** n * np.dtype(np.int64).itemsize
+
+
+def check_compiled_size(p: int, n: int):
+    """ :raise ValueError: if the compiled tensor for GF(p^n) is bigger than COMPILED_MAX_BYTES. """
+    nbytes = compiled_nbytes(p, n)
+    if nbytes > COMPILED_MAX_BYTES:
+        raise ValueError(f"Compiled functions for GF({p}^{n}) need {nbytes} bytes, "
+                         f"more than the limit of {COMPILED_MAX_BYTES} bytes; use batched mode instead")
 
 
 class DumbPrimitivePowFunctions(AbstractPrimitivePowFunctions):
+    """
+    Functions of coefficients a1, ..., an of a companion matrix A (A^n = a1·A^(n-1) + ... + an)
+    that give the coefficients of powers of A.
 
-    def __init__(self, p, n):
-        if not isprime(p):
+    get() returns symbolic functions built with sympy, which is imported only by this method.
+    get_compiled() returns the same powers compiled to a dense integer coefficient tensor
+    of shape (p^n - 1, n, p^n): element [k, j, m] is the coefficient of monomial m of a1, ..., an
+    in the coefficient of A^(n-1-j) of the k-th power. Because x^p = x for x in GF(p), every variable
+    has degree below p, so monomial m is given by its base-p digits (exponent of a1 is the highest digit).
+    The tensor is computed numerically without sympy, and evaluate() / evaluate_many() evaluate
+    every power for given coefficients with one matrix product mod p.
+    The tensor is shared through a MemoCache keyed by (p, n), shared_memo_cache() by default.
+    Its size grows as p^(2n), so get_compiled() raises ValueError when it would be bigger
+    than COMPILED_MAX_BYTES (see check_compiled_size()).
+    """
+
+    def __init__(self, p, n, memo_cache: MemoCache = None):
+        if not is_prime(p):
             raise ValueError("n must be a prime number")
         self.__p = p
         self.__n = n
-        self.__symbols = self.__generate_symbols()
-        self.__base_function = self.__generate_base_function()
+        self.__memo_cache = memo_cache if memo_cache is not None else shared_memo_cache()
+        self.__symbols = None
+        self.__base_function = None
         self.__functions = None
+        self.__compiled = None
 
     def get(self):
         if self.__functions is None:
+            self.__symbols = self.__generate_symbols()
+            self.__base_function = self.__generate_base_function()
             self.__functions = []
             self.__generate_functions()
         return self.__functions
 
+    def get_compiled(self):
+        if self.__compiled is None:
+            check_compiled_size(self.__p, self.__n)
+            self.__compiled = self.__memo_cache.get_or_create(array_key("pow_functions", self.__p, self.__n),
+                                                              self.__compile_functions)
+        return self.__compiled
+
+    def evaluate(self, *args):
+        """
+        Evaluates every power for given coefficients a1, ..., an.
+        :return: np.ndarray of shape (p^n - 1, n), row k is [c_(n-1), ..., c_0] of the k-th power,
+        powers are in the same order as in get().
+        """
+        return self.evaluate_many(np.array([args]))[0]
+
+    def evaluate_many(self, args):
+        """
+        Evaluates every power for a block of coefficient tuples.
+        :param args: np.ndarray of shape (m, n).
+        :return: np.ndarray of shape (m, p^n - 1, n).
+        """
+        compiled = self.get_compiled()
+        monomials = self.__monomials(np.asarray(args, dtype=np.int64))
+        values = compiled.reshape(-1, compiled.shape[-1]).dot(monomials.T) % self.__p
+        return values.T.reshape(len(monomials), compiled.shape[0], self.__n)
+
+    def __compile_functions(self):
+        logger.info("Compiling functions for finding coefficients in primitive element...")
+        p, n = self.__p, self.__n
+        count = p ** n - 1
+        variables = (p,) * n
+
+        # current[j] is the coefficient of A^j as a dense polynomial of a1, ..., an, current = A^n.
+        base = np.zeros((n,) + variables, dtype=np.int64)
+        for i in range(1, n + 1):
+            base[(n - i,) + tuple(1 if k == i - 1 else 0 for k in range(n))] = 1
+        current = base
+        compiled = np.empty((count, n, p ** n), dtype=np.int64)
+        for k in range(count):
+            top = current[n - 1]
+            stepped = np.zeros_like(current)
+            stepped[1:] = current[:-1]
+            for i in range(1, n + 1):
+                stepped[n - i] += self.__multiply_by_variable(top, i - 1)
+            current = stepped % p
+            compiled[k] = current[::-1].reshape(n, -1)
+        compiled = np.concatenate((compiled[-n:], compiled[:-n]))
+        logger.info("Functions compiled.")
+        return compiled
+
+    def __multiply_by_variable(self, polynomial, axis):
+        """ Multiplies a dense polynomial by a variable, x^(p-1)·x = x^p is reduced to x. """
+        result = np.zeros_like(polynomial)
+        source = [slice(None)] * polynomial.ndim
+        target = [slice(None)] * polynomial.ndim
+        source[axis], target[axis] = slice(0, self.__p - 1), slice(1, self.__p)
+        result[tuple(target)] += polynomial[tuple(source)]
+        source[axis], target[axis] = self.__p - 1, 1
+        result[tuple(target)] += polynomial[tuple(source)]
+        return result
+
+    def __monomials(self, args):
+        """ Values of every monomial of degree below p in each variable, shape (m, p^n). """
+        powers = np.ones(args.shape + (self.__p,), dtype=np.int64)
+        for e in range(1, self.__p):
+            powers[:, :, e] = powers[:, :, e - 1] * args % self.__p
+        monomials = np.ones((len(args), 1), dtype=np.int64)
+        for i in range(self.__n):
+            monomials = (monomials[:, :, np.newaxis] * powers[:, i, np.newaxis, :]).reshape(len(args), -1) % self.__p
+        return monomials
+
     def __generate_functions(self):
+        from sympy import lambdify
+
         logger.info("Generating functions for finding coefficients in primitive element...")
         i = self.__p ** self.__n
         func = self.__base_function
@@ -42,6 +153,8 @@ class DumbPrimitivePowFunctions(AbstractPrimitivePowFunctions):
         logger.info("Functions generated.")
 
     def __pow_function(self, func):
+        from sympy import expand
+
         func *= self.__symbols["A"]
         func = expand(func)
         func = func.subs(self.__symbols["A"] ** self.__n, self.__base_function)
@@ -49,10 +162,14 @@ class DumbPrimitivePowFunctions(AbstractPrimitivePowFunctions):
         return func
 
     def __generate_base_function(self):
+        from sympy import sympify
+
         func = sympify("".join(f"a{i}*A**{self.__n - i}+" for i in range(1, self.__n + 1))[0:-1])
         return func
 
     def __generate_symbols(self):
+        from sympy import symbols
+
         syms: tuple = symbols("A " + " ".join(f"a{i} " for i in range(1, self.__n + 1)))
         symbols_dict = {}
         for sym in syms:
@@ -1,19 +1,40 @@
-import galois
+import threading
+from itertools import chain, islice
+
 import numpy as np
 
-from custom_collections.list_set import ListSet
+from custom_collections.array_set import ArraySet
+from finite_fields.discrete_log import TABULATION_LIMIT
+from finite_fields.field_cache import FieldCache
 from primitive_element_finders.abstract_primitive_finder import AbstractPrimitiveFinder
+from primitive_element_finders.primitive_polynomials import primitive_polys, random_primitive_polys
+from utils.async_pool import AsyncPool, shared_async_pool
+from utils.cancellation import CancellationToken
 from utils.logger import logger
+from utils.memo_cache import MemoCache, array_key, shared_memo_cache
+from wrappers.traced import traced
 
 
 class FastPrimitiveFinder(AbstractPrimitiveFinder):
     """
     A class for finding primitive elements in finite fields.
 
-    Primitive elements are determined using galois library.
+    Primitive elements are determined by testing polynomials for primitivity
+    (see primitive_polynomials module). With search='lexicographic' polynomials are walked
+    in lexicographic order, with search='random' random primitive polynomials are returned.
     Primitive elements have form of a companion matrix of a corresponding primitive polynomial.
     After finding primitive elements, they are cached.
 
+    find_all() does not test polynomials: it takes the first primitive element A, builds the field
+    and takes minimal polynomials of A^k for k coprime to p^n - 1, one k per Frobenius conjugacy class
+    (see finite_fields.conjugacy). With workers > 1 the classes are processed by a process pool.
+    Fields with more than TABULATION_LIMIT elements are walked polynomial by polynomial instead.
+    Results of the conjugacy search are shared between finders through a MemoCache keyed by (p, n),
+    shared_memo_cache() by default, and methods of one finder can be called from several threads.
+
+    If a FieldCache is given, found primitive elements are also stored on disk
+    and are not searched again by next finders of the same field.
+
     Methods:
     -------
     find_first():
@@ -22,62 +43,167 @@ class FastPrimitiveFinder(AbstractPrimitiveFinder):
         Finds and returns next primitive element
     find_all():
         Finds and returns all primitive elements.
+    find_first_async(), find_next_async(), find_all_async():
+        The same methods for asyncio code, run in an AsyncPool. Concurrent find_first_async() or find_all_async()
+        calls of finders with the same p, n, search mode and seed share one search.
     """
-    def __init__(self, p, n):
+    def __init__(self, p, n, cache: FieldCache = None, search: str = 'lexicographic', seed=None,
+                 workers: int = 1, memo_cache: MemoCache = None):
+        if search not in ('lexicographic', 'random'):
+            raise ValueError(f"Unknown search mode {search}")
         self.__p = p
         self.__n = n
-        self.__primitive_iterator = galois.primitive_polys(p, n)
-        self.__not_primitives: ListSet[np.ndarray] = ListSet()
-        self.__cached_primitives: ListSet[np.ndarray] = ListSet()
+        # Random search returns primitives in a different order every time, so it is not stored on disk.
+        self.__cache = cache if search == 'lexicographic' else None
+        self.__search = search
+        self.__seed = seed
+        self.__workers = workers
+        self.__memo_cache = memo_cache if memo_cache is not None else shared_memo_cache()
+        self.__lock = threading.RLock()
+        self.__stored = 0
+        self.__complete = False
+        self.__stored_complete = False
+        self.__primitive_iterator = self.__create_primitive_iterator()
+        self.__cached_primitives = ArraySet(element_shape=(n, n))
         self.__primitive_counter = 0
 
-    def find_first(self):
+    @traced("fast_finder.find_first")
+    def find_first(self, cancel_token: CancellationToken = None):
         """
         Finds and returns first primitive element. After finding,
         it is cached and can be obtained by calling this method again.
+        :param cancel_token: the search raises OperationCancelled if the token is cancelled before it starts.
         :return: primitive element of type np.ndarray
         """
+        with self.__lock:
+            return self.__find_first(cancel_token)
+
+    def __find_first(self, cancel_token: CancellationToken = None):
         if len(self.__cached_primitives) > 0:
-            logger.info("First primitive element is cached!")
+            logger.debug("First primitive element is cached!")
             return self.__cached_primitives[0]
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
         logger.info("Finding primitive element...")
-        poly = next(self.__primitive_iterator)
-        A = self.__get_companion_matrix(poly.coefficients())
+        A = next(self.__primitive_iterator)
         self.__cached_primitives.add(A)
+        self.__store()
         logger.info("Found primitive element.")
-        logger.info(f"Found {len(self.__cached_primitives)} primitives.")
         return A
 
-    def find_next(self):
-        logger.info("Finding next primitive element...")
+    @traced("fast_finder.find_next")
+    def find_next(self, cancel_token: CancellationToken = None):
+        """
+        Finds and returns next primitive element, after all of them are found it cycles through found ones.
+        :param cancel_token: the search raises OperationCancelled if the token is cancelled before it starts.
+        :return: primitive element of type np.ndarray
+        """
+        with self.__lock:
+            return self.__find_next(cancel_token)
+
+    async def find_next_async(self, pool: AsyncPool = None):
+        """ find_next() run in an AsyncPool (shared_async_pool() by default), every call returns its own element. """
+        token = CancellationToken()
+        return await (pool or shared_async_pool()).run(None, self.find_next, token, token=token)
+
+    def __find_next(self, cancel_token: CancellationToken = None):
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
         try:
-            poly = next(self.__primitive_iterator)
-            self.__cached_primitives.add(self.__get_companion_matrix(poly.coefficients()))
-            logger.info("Found next primitive element...")
-            logger.info(f"Found {len(self.__cached_primitives)} primitives.")
+            self.__cached_primitives.add(next(self.__primitive_iterator))
+            self.__store()
+            logger.debug(f"Found {len(self.__cached_primitives)} primitives.")
             return self.__cached_primitives[-1]
         except StopIteration:
+            self.__complete = True
+            self.__store()
             self.__primitive_counter = self.__primitive_counter % len(self.__cached_primitives)
-            logger.info(f"Already found all primitives, returning {self.__primitive_counter}th element")
+            logger.debug(f"Already found all primitives, returning {self.__primitive_counter}th element")
             primitive = self.__cached_primitives[self.__primitive_counter]
             self.__primitive_counter += 1
             return primitive
 
-    def find_all(self):
+    @traced("fast_finder.find_all")
+    def find_all(self, cancel_token: CancellationToken = None):
         """
-        Finds and returns a list of every primitive element. After finding,
+        Finds and returns every primitive element. After finding,
         they are cached and can be obtained by calling this method again.
-        :return: list of primitive elements of type np.ndarray
+        :param cancel_token: the search raises OperationCancelled soon after the token is cancelled:
+            the walk over polynomials checks it after every found element, which stays cached,
+            and the conjugacy search checks it while the field is built.
+        :return: np.ndarray of shape (m, n, n) of primitive elements,
+            in lexicographic order of their polynomials for lexicographic search.
         """
+        with self.__lock:
+            return self.__find_all(cancel_token)
+
+    def __find_all(self, cancel_token: CancellationToken = None):
+        if self.__complete:
+            logger.debug("Primitive elements are cached!")
+            return self.__cached_primitives.array
         logger.info("Finding primitive elements...")
-        for poly in self.__primitive_iterator:
-            try:
-                self.__cached_primitives.add(self.__get_companion_matrix(poly.coefficients()))
-            except StopIteration:
-                logger.info("Primitive elements are cached!")
-                return self.__cached_primitives
+        if self.__p ** self.__n - 1 <= TABULATION_LIMIT:
+            self.__cached_primitives.add_many(self.__memo_cache.get_or_create(
+                array_key("primitive_elements", self.__p, self.__n),
+                lambda: self.__find_all_by_conjugacy(cancel_token)))
+        else:
+            for A in self.__primitive_iterator:
+                self.__cached_primitives.add(A)
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+        # Every primitive element is cached, so find_next() cycles through them.
+        self.__primitive_iterator = iter(())
+        self.__complete = True
+        self.__store()
         logger.info(f"Found all {len(self.__cached_primitives)} primitive elements.")
-        return self.__cached_primitives
+        return self.__cached_primitives.array
+
+    def __find_all_by_conjugacy(self, cancel_token: CancellationToken = None):
+        from finite_fields.conjugacy import all_primitive_polynomials
+        from finite_fields.finite_field import FiniteField
+
+        primitive = self.__find_first(cancel_token)
+        field = FiniteField(self.__p, self.__n, primitive, cache=self.__cache, memo_cache=self.__memo_cache)
+        field.build(cancel_token=cancel_token)
+        polynomials = all_primitive_polynomials(field, primitive, self.__workers)
+        matrices = np.zeros((len(polynomials), self.__n, self.__n), dtype=np.int32)
+        matrices[:, 1:, :-1] = np.eye(self.__n - 1, dtype=np.int32)
+        matrices[:, :, -1] = (-polynomials[:, :-1]) % self.__p
+        return matrices
+
+    def _search_key(self) -> tuple:
+        # Random search without a seed finds different elements in every finder.
+        if self.__search == 'random' and self.__seed is None:
+            return self.__p, self.__n, self.__search, id(self)
+        return self.__p, self.__n, self.__search, self.__seed
+
+    def __create_primitive_iterator(self):
+        """
+        Iterator of companion matrices of primitive polynomials. Primitive elements found
+        by previous finders are taken from the cache, and only the rest is searched.
+        """
+        loaded = self.__cache.load_primitives(self.__p, self.__n) if self.__cache is not None else None
+        if loaded is None:
+            loaded, self.__complete = np.empty((0, self.__n, self.__n), dtype=np.int32), False
+        else:
+            loaded, self.__complete = loaded
+        self.__stored = len(loaded)
+        self.__stored_complete = self.__complete
+        if self.__complete:
+            return iter(loaded)
+        if self.__search == 'random':
+            polys = random_primitive_polys(self.__p, self.__n, seed=self.__seed)
+        else:
+            polys = islice(primitive_polys(self.__p, self.__n), len(loaded), None)
+        return chain(loaded, (self.__get_companion_matrix(poly) for poly in polys))
+
+    def __store(self):
+        if self.__cache is None:
+            return
+        if len(self.__cached_primitives) > self.__stored or (self.__complete and not self.__stored_complete):
+            self.__cache.store_primitives(self.__p, self.__n, self.__cached_primitives.array, self.__complete)
+            self.__stored = len(self.__cached_primitives)
+            self.__stored_complete = self.__complete
 
     def __get_companion_matrix(self, coefficients):
         n = len(coefficients) - 1
@@ -0,0 +1,130 @@
+import random
+
+import numpy as np
+
+from finite_fields.polynomials import poly_gcd, poly_powmod
+from utils import instrumentation
+from utils.number_theory import euler_phi, prime_factors
+
+
+def count_primitive_polys(p: int, n: int) -> int:
+    """ Number of primitive polynomials of degree n over GF(p), which is φ(p^n - 1) / n. """
+    return euler_phi(p ** n - 1) // n
+
+
+def is_irreducible(f: np.ndarray, p: int, method: str = 'rabin') -> bool:
+    """
+    Irreducibility test of a monic polynomial.
+
+    'rabin': f of degree n is irreducible iff x^(p^n) = x mod f and gcd(x^(p^(n/q)) - x, f) = 1
+    for every prime q | n.
+    'ben-or': f is irreducible iff gcd(x^(p^i) - x, f) = 1 for i = 1, ..., n/2.
+    It stops at the first found factor, so it is faster for random polynomials.
+    :param f: monic polynomial, lowest degree first.
+    """
+    n = len(f) - 1
+    if n <= 1:
+        return n == 1
+    x = np.zeros(n, dtype=np.int64)
+    x[1] = 1
+
+    def frobenius_minus_x(power):
+        h = power.copy()
+        h[1] = (h[1] - 1) % p
+        return h
+
+    if method == 'ben-or':
+        power = x
+        for _ in range(n // 2):
+            power = poly_powmod(power, p, f, p)
+            if len(poly_gcd(frobenius_minus_x(power), f, p)) > 1:
+                return False
+        return True
+    if method != 'rabin':
+        raise ValueError(f"Unknown irreducibility test {method}")
+
+    powers = [x]
+    for _ in range(n):
+        powers.append(poly_powmod(powers[-1], p, f, p))
+    if np.any(frobenius_minus_x(powers[n])):
+        return False
+    return all(len(poly_gcd(frobenius_minus_x(powers[n // q]), f, p)) == 1 for q in prime_factors(n))
+
+
+def is_primitive(f: np.ndarray, p: int, method: str = 'rabin') -> bool:
+    """
+    Primitivity test of a monic polynomial: f is irreducible, f(0) != 0 and
+    x^((p^n - 1) / r) != 1 mod f for every prime r | p^n - 1.
+    :param f: monic polynomial, lowest degree first.
+    """
+    n = len(f) - 1
+    if n < 1 or f[0] % p == 0 or not is_irreducible(f, p, method):
+        return False
+    order = p ** n - 1
+    x = np.zeros(n, dtype=np.int64)
+    if n == 1:
+        x[0] = -f[0] % p
+    else:
+        x[1] = 1
+    one = np.zeros(n, dtype=np.int64)
+    one[0] = 1
+    return all(not np.array_equal(poly_powmod(x, order // r, f, p), one) for r in prime_factors(order))
+
+
+def primitive_polys(p: int, n: int, method: str = 'ben-or'):
+    """
+    Generates all primitive polynomials of degree n over GF(p) in lexicographic order
+    of their coefficients (ascending integer representation).
+    :param method: irreducibility test, see is_irreducible.
+    :return: generator of np.ndarray of coefficients, highest degree first.
+    """
+    f = np.zeros(n + 1, dtype=np.int64)
+    f[n] = 1
+    f[0] = 1
+    while True:
+        instrumentation.count("polynomials.tested")
+        if is_primitive(f, p, method):
+            instrumentation.count("polynomials.primitive")
+            yield f[::-1].copy()
+        i = 0
+        while i < n and f[i] == p - 1:
+            f[i] = 0
+            i += 1
+        if i == n:
+            return
+        f[i] += 1
+
+
+def random_primitive_poly(p: int, n: int, rng: random.Random = None) -> np.ndarray:
+    """
+    Finds a random primitive polynomial. Random monic polynomials with nonzero constant term
+    are tested with Ben-Or test, and about n·p^n / φ(p^n - 1) candidates are needed on average.
+    :return: np.ndarray of coefficients, highest degree first.
+    """
+    rng = rng or random.Random()
+    f = np.zeros(n + 1, dtype=np.int64)
+    f[n] = 1
+    while True:
+        f[0] = rng.randrange(1, p)
+        f[1:n] = [rng.randrange(p) for _ in range(n - 1)]
+        instrumentation.count("polynomials.tested")
+        if is_primitive(f, p, method='ben-or'):
+            instrumentation.count("polynomials.primitive")
+            return f[::-1].copy()
+
+
+def random_primitive_polys(p: int, n: int, seed=None, exclude=()):
+    """
+    Generates distinct random primitive polynomials until all of them are generated.
+    :param exclude: iterable of polynomials (highest degree first) that must not be generated.
+    :return: generator of np.ndarray of coefficients, highest degree first.
+    """
+    rng = random.Random(seed)
+    seen = {tuple(int(c) for c in poly) for poly in exclude}
+    total = count_primitive_polys(p, n)
+    while len(seen) < total:
+        poly = random_primitive_poly(p, n, rng)
+        key = tuple(int(c) for c in poly)
+        if key not in seen:
+            seen.add(key)
+            yield poly
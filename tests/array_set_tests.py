@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+
+from custom_collections.array_set import ArraySet
+
+
+class TestArraySet(unittest.TestCase):
+
+    def test_add_keeps_insertion_order_and_skips_duplicates(self):
+        s = ArraySet()
+        for item in [[1, 2], [3, 4], [1, 2], [5, 6], [3, 4]]:
+            s.add(np.array(item))
+
+        self.assertEqual(3, len(s))
+        self.assertEqual([[1, 2], [3, 4], [5, 6]], s.array.tolist())
+        self.assertEqual((2,), s.element_shape)
+
+    def test_add_many_matches_one_by_one_insertion(self):
+        rng = np.random.default_rng(0)
+        items = rng.integers(0, 3, size=(2000, 2, 2))
+        expected = []
+        for item in items.tolist():
+            if item not in expected:
+                expected.append(item)
+
+        s = ArraySet()
+        positions = s.add_many(items)
+
+        self.assertEqual(expected, s.array.tolist())
+        self.assertTrue(np.array_equal(s.array[positions], items))
+
+    def test_contains_many(self):
+        s = ArraySet(np.arange(1000).reshape(500, 2))
+        queries = np.array([[0, 1], [2, 3], [1, 2], [998, 999], [1000, 1001]])
+
+        self.assertEqual([True, True, False, True, False], s.contains_many(queries).tolist())
+        self.assertIn(np.array([4, 5]), s)
+        self.assertNotIn(np.array([5, 4]), s)
+        self.assertNotIn(np.array([4, 5, 6]), s)
+
+    def test_getitem_returns_views_with_stored_shape(self):
+        matrices = np.arange(36, dtype=np.int32).reshape(4, 3, 3)
+        s = ArraySet(matrices)
+
+        self.assertTrue(np.array_equal(matrices[1], s[1]))
+        self.assertTrue(np.array_equal(matrices[-1], s[-1]))
+        self.assertEqual((3, 3), s[0].shape)
+        self.assertTrue(np.shares_memory(s[0], s.array))
+        self.assertTrue(np.array_equal(matrices[1:3], s[1:3]))
+        with self.assertRaises(IndexError):
+            _ = s[4]
+
+    def test_remove_moves_last_element(self):
+        s = ArraySet(np.arange(10).reshape(5, 2))
+
+        s.remove(np.array([2, 3]))
+
+        self.assertEqual([[0, 1], [8, 9], [4, 5], [6, 7]], s.array.tolist())
+        self.assertNotIn(np.array([2, 3]), s)
+        self.assertEqual(1, s.index(np.array([8, 9])))
+        with self.assertRaises(KeyError):
+            s.remove(np.array([2, 3]))
+        s.add(np.array([2, 3]))
+        self.assertEqual(4, s.index(np.array([2, 3])))
+
+    def test_growth_keeps_every_element(self):
+        s = ArraySet()
+        for i in range(300):
+            s.add(np.array([i, -i]))
+
+        self.assertEqual(300, len(s))
+        self.assertTrue(s.contains_many(np.stack([np.arange(300), -np.arange(300)], axis=1)).all())
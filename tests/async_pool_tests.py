@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from finite_fields.finite_field import FiniteField
+from primitive_element_finders.dumb_primitive_element_finder import DumbPrimitiveElementFinder
+from primitive_element_finders.fast_primitive_finder import FastPrimitiveFinder
+from utils.async_pool import AsyncPool
+from utils.cancellation import CancellationToken
+from utils.memo_cache import MemoCache
+from wrappers.disable_logging import disable_logging
+
+
+class TestAsyncPool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = AsyncPool(max_workers=4)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_concurrent_calls_with_same_key_are_coalesced(self):
+        calls = []
+        release = threading.Event()
+
+        def compute(value):
+            calls.append(value)
+            release.wait(5)
+            return value * 2
+
+        async def main():
+            tasks = [asyncio.create_task(self.pool.run("key", compute, i)) for i in range(3)]
+            other = asyncio.create_task(self.pool.run(None, compute, 10))
+            await asyncio.sleep(0.05)
+            release.set()
+            return await asyncio.gather(*tasks, other)
+
+        self.assertEqual([0, 0, 0, 20], asyncio.run(main()))
+        self.assertEqual([0, 10], sorted(calls))
+
+    def test_cancelling_every_waiter_cancels_computation(self):
+        token = CancellationToken()
+        started = threading.Event()
+
+        def compute():
+            started.set()
+            while not token.cancelled:
+                threading.Event().wait(0.01)
+            return "stopped"
+
+        async def main():
+            first = asyncio.create_task(self.pool.run("key", compute, token=token))
+            second = asyncio.create_task(self.pool.run("key", compute, token=token))
+            while not started.is_set():
+                await asyncio.sleep(0.01)
+            first.cancel()
+            await asyncio.sleep(0.05)
+            self.assertFalse(token.cancelled)
+            second.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await second
+            self.assertTrue(token.cancelled)
+            # A cancelled computation is not shared with next calls.
+            return await self.pool.run("key", lambda: "new")
+
+        self.assertEqual("new", asyncio.run(main()))
+
+    def test_errors_are_raised_in_every_waiter(self):
+        def fail():
+            raise ValueError("failed")
+
+        async def main():
+            return await asyncio.gather(self.pool.run("key", fail), self.pool.run("key", fail),
+                                        return_exceptions=True)
+
+        self.assertTrue(all(isinstance(result, ValueError) for result in asyncio.run(main())))
+
+    @disable_logging
+    def test_finder_and_field_async_api(self):
+        cache = MemoCache()
+        finder = FastPrimitiveFinder(2, 6, memo_cache=cache)
+
+        async def main():
+            first, again = await asyncio.gather(finder.find_first_async(self.pool),
+                                                finder.find_first_async(self.pool))
+            second = await finder.find_next_async(self.pool)
+            fields = [FiniteField(2, 6, first, memo_cache=cache) for _ in range(2)]
+            await asyncio.gather(*(field.build_async(self.pool) for field in fields))
+            chunks = [chunk async for chunk in fields[0].aiter_elements('vector', 3, 50, 10, pool=self.pool)]
+            return first, again, second, fields, chunks
+
+        first, again, second, fields, chunks = asyncio.run(main())
+        self.assertTrue(np.array_equal(finder.find_first(), first))
+        self.assertTrue(np.array_equal(first, again))
+        self.assertFalse(np.array_equal(first, second))
+        # The field that waited for the coalesced build got the built table too.
+        self.assertEqual(63 * 6 * 4, fields[1].nbytes)
+        expected = np.concatenate(list(FiniteField(2, 6, first, memo_cache=MemoCache()).iter_elements('vector', 3, 50)))
+        self.assertEqual(5, len(chunks))
+        self.assertTrue(np.array_equal(expected, np.concatenate(chunks)))
+
+
+    @disable_logging
+    def test_finders_of_one_field_share_a_search_that_stops_when_cancelled(self):
+        self.assertEqual(FastPrimitiveFinder(2, 6)._coalescing_key("find_all"),
+                         FastPrimitiveFinder(2, 6, memo_cache=MemoCache())._coalescing_key("find_all"))
+        self.assertNotEqual(FastPrimitiveFinder(2, 6)._coalescing_key("find_all"),
+                            FastPrimitiveFinder(2, 6, search='random', seed=1)._coalescing_key("find_all"))
+        self.assertNotEqual(FastPrimitiveFinder(2, 6, search='random')._coalescing_key("find_all"),
+                            FastPrimitiveFinder(2, 6, search='random')._coalescing_key("find_all"))
+        finders = [DumbPrimitiveElementFinder(2, 14, batch_size=4) for _ in range(2)]
+
+        async def main():
+            tasks = [asyncio.create_task(finder.find_all_async(self.pool)) for finder in finders]
+            await asyncio.sleep(0.1)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run(main())
+        # The whole search takes seconds, the cancelled one stops at the next block of candidates.
+        start = time.perf_counter()
+        self.pool.shutdown()
+        self.assertLess(time.perf_counter() - start, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from benchmarks.benchmark_suite import compare, run_suite
+
+
+def report(*results):
+    return {"results": [{"name": name, "p": 2, "n": 4, "seconds": seconds, "peak_bytes": peak}
+                        for name, seconds, peak in results]}
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    def test_run_suite_skips_benchmarks_for_too_large_fields(self):
+        result = run_suite(sizes=[(2, 3), (2, 11)], names=["dumb_primitive_element_finder.find_all",
+                                                          "finite_field.get_elements.vector"], repeat=1)
+
+        measured = [(r["name"], r["p"], r["n"]) for r in result["results"]]
+        self.assertEqual([("dumb_primitive_element_finder.find_all", 2, 3),
+                          ("finite_field.get_elements.vector", 2, 3),
+                          ("finite_field.get_elements.vector", 2, 11)], measured)
+        for r in result["results"]:
+            self.assertGreaterEqual(r["seconds"], 0)
+            self.assertGreaterEqual(r["peak_bytes"], 0)
+
+    def test_run_suite_rejects_unknown_benchmark(self):
+        with self.assertRaises(ValueError):
+            run_suite(names=["no_such_benchmark"])
+
+    def test_compare_flags_only_regressions_above_tolerance(self):
+        baseline = report(("a", 1.0, 1000), ("b", 1.0, 1000), ("c", 1e-5, 1000))
+        current = report(("a", 1.2, 1000), ("b", 1.5, 2000), ("c", 1e-4, 1000), ("d", 5.0, 5000))
+
+        regressions = compare(current, baseline, time_tolerance=0.25, memory_tolerance=0.25)
+
+        self.assertEqual([("b", "seconds"), ("b", "peak_bytes")], [(r["name"], r["metric"]) for r in regressions])
+        self.assertAlmostEqual(2.0, regressions[1]["ratio"])
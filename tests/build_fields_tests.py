@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from cli.build_fields import build_field_files, build_fields, main
+from finite_fields.field_cache import FieldCache, field_key
+from finite_fields.finite_field import FiniteField
+from wrappers.disable_logging import disable_logging
+
+
+class TestBuildFields(unittest.TestCase):
+
+    @disable_logging
+    def test_written_tables_match_field_elements(self):
+        with tempfile.TemporaryDirectory() as directory:
+            result = build_field_files(3, 3, directory, view='matrix', all_primitives=True, chunk_size=5)
+
+            primitive = np.load(os.path.join(result["directory"], "primitive.npy"))
+            elements = np.load(os.path.join(result["directory"], "elements.npy"))
+            primitives = np.load(os.path.join(result["directory"], "primitives.npy"))
+            expected = FiniteField(3, 3, primitive).get_elements(view='matrix').array
+            self.assertTrue(np.array_equal(expected, elements))
+            self.assertEqual((4, 3, 3), primitives.shape)
+            self.assertEqual({"find_first", "build_field", "find_all"}, set(result["timings"]))
+
+    @disable_logging
+    def test_cache_dir_keeps_primitives_and_field_tables(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache_dir = os.path.join(directory, "cache")
+            first = build_field_files(3, 3, os.path.join(directory, "first"), cache_dir=cache_dir)
+
+            primitive = np.load(os.path.join(first["directory"], "primitive.npy"))
+            entries = {"primitives_3_3", field_key("field", 3, 3, primitive)}
+            self.assertEqual({key + FieldCache.SUFFIX for key in entries}, set(os.listdir(cache_dir)))
+            second = build_field_files(3, 3, os.path.join(directory, "second"), cache_dir=cache_dir)
+            self.assertTrue(np.array_equal(np.load(os.path.join(first["directory"], "elements.npy")),
+                                           np.load(os.path.join(second["directory"], "elements.npy"))))
+
+    @disable_logging
+    def test_main_builds_fields_in_process_pool(self):
+        with tempfile.TemporaryDirectory() as directory:
+            code = main(["2^4", "25", "--output-dir", directory, "--processes", "2"])
+
+            self.assertEqual(0, code)
+            with open(os.path.join(directory, "summary.json")) as file:
+                summary = json.load(file)
+            self.assertEqual([(2, 4), (5, 2)], [(field["p"], field["n"]) for field in summary["fields"]])
+            elements = np.load(os.path.join(directory, "5^2", "elements.npy"))
+            self.assertEqual((24, 2), elements.shape)
+            self.assertEqual(24, len({tuple(row) for row in elements.tolist()}))
+
+    @disable_logging
+    def test_failed_field_is_reported(self):
+        with tempfile.TemporaryDirectory() as directory:
+            results = build_fields([(2, 3), (4, 2)], directory, processes=1)
+
+            self.assertIn("timings", results[0])
+            self.assertIn("error", results[1])
@@ -0,0 +1,45 @@
+import unittest
+
+import numpy as np
+
+from primitive_element_finders.dumb_primitive_element_finder import DumbPrimitiveElementFinder
+from primitive_element_finders.dumb_primitive_pow_functions import DumbPrimitivePowFunctions
+from primitive_element_finders.fast_primitive_finder import FastPrimitiveFinder
+from wrappers.disable_logging import disable_logging
+
+
+class TestDumbPrimitiveElementFinder(unittest.TestCase):
+
+    @disable_logging
+    def test_batched_mode_matches_symbolic_mode(self):
+        for p, n in [(3, 2), (5, 2)]:
+            symbolic = DumbPrimitiveElementFinder(p, n)
+            batched = DumbPrimitiveElementFinder(p, n, batch_size=5)
+
+            self.assertTrue(np.array_equal(symbolic.find_first(), batched.find_first()))
+            self.assertEqual([x.tolist() for x in symbolic.find_all()], [x.tolist() for x in batched.find_all()])
+
+    @disable_logging
+    def test_batched_mode_finds_every_primitive(self):
+        for p, n in [(2, 3), (2, 6), (3, 3), (7, 1), (7, 2)]:
+            expected = {bytes(matrix.astype(np.int32)) for matrix in FastPrimitiveFinder(p, n).find_all()}
+
+            found = DumbPrimitiveElementFinder(p, n, batch_size=64).find_all()
+
+            self.assertEqual(expected, {bytes(matrix) for matrix in found})
+            self.assertEqual(len(expected), len(found))
+
+    @disable_logging
+    def test_compiled_mode_matches_batched_mode(self):
+        for p, n in [(2, 4), (3, 2), (3, 3), (5, 2), (2, 7)]:
+            batched = DumbPrimitiveElementFinder(p, n, batch_size=64)
+            compiled = DumbPrimitiveElementFinder(p, n, batch_size=16, compiled=True)
+
+            self.assertTrue(np.array_equal(batched.find_first(), compiled.find_first()))
+            self.assertEqual([x.tolist() for x in batched.find_all()], [x.tolist() for x in compiled.find_all()])
+
+    def test_compiled_mode_is_refused_for_big_fields(self):
+        with self.assertRaises(ValueError):
+            DumbPrimitiveElementFinder(2, 16, compiled=True)
+        with self.assertRaises(ValueError):
+            DumbPrimitivePowFunctions(2, 16).get_compiled()
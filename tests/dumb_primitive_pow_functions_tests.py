@@ -1,4 +1,7 @@
 import unittest
+from itertools import product
+
+import numpy as np
 
 from primitive_element_finders.dumb_primitive_pow_functions import DumbPrimitivePowFunctions
 from wrappers.disable_logging import disable_logging
@@ -42,3 +45,23 @@ class TestDumbPrimitivePowFunctions(unittest.TestCase):
 
         for function, coefficient in zip(functions, coefficients):
             self.assertEqual(coefficient, function(a1, a2, a3))
+
+    @disable_logging
+    def test_compiled_functions_match_powers_of_companion_matrix(self):
+        for p, n in [(2, 3), (3, 2), (3, 3), (5, 2)]:
+            functions = DumbPrimitivePowFunctions(p, n)
+            exponents = list(range(p ** n, p ** n + n)) + list(range(n + 1, p ** n))
+
+            for args in product(range(p), repeat=n):
+                matrix = np.zeros((n, n), dtype=np.int64)
+                matrix[np.arange(1, n), np.arange(n - 1)] = 1
+                matrix[:, -1] = args[::-1]
+                values = functions.evaluate(*args)
+
+                power = np.eye(n, dtype=np.int64)
+                powers = {}
+                for exponent in range(1, p ** n + n):
+                    power = power.dot(matrix) % p
+                    powers[exponent] = power[:, 0][::-1]
+                for row, exponent in zip(values, exponents):
+                    self.assertEqual(powers[exponent].tolist(), row.tolist())
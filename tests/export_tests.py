@@ -0,0 +1,76 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from finite_fields.export import to_arrow, write_table
+from tests.fixtures import field_of
+from wrappers.disable_logging import disable_logging
+
+VIEWS = ('coefficients', 'vector', 'matrix', 'packed')
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+class TestExport(unittest.TestCase):
+
+    @disable_logging
+    def test_as_array_is_a_read_only_view_of_the_table(self):
+        field = field_of(3, 3)
+        coefficients = field.as_array()
+        vectors = field.get_elements('vector')
+
+        self.assertTrue(coefficients.flags.c_contiguous)
+        self.assertFalse(coefficients.flags.writeable)
+        self.assertTrue(np.shares_memory(coefficients, vectors))
+        self.assertTrue(np.array_equal(coefficients[:, ::-1], vectors))
+        self.assertTrue(np.array_equal(np.concatenate(list(field.iter_elements('vector'))), vectors))
+        self.assertEqual(coefficients.nbytes, memoryview(coefficients).nbytes)
+        self.assertTrue(np.shares_memory(field.as_array('matrix'), field.get_elements('matrix').array))
+        self.assertTrue(np.array_equal(field.pack(vectors), field.as_array('packed')))
+        with self.assertRaises(ValueError):
+            field.as_array('list')
+
+    @disable_logging
+    def test_npy_tables_are_written_by_chunks(self):
+        for packed in (False, True):
+            field = field_of(2, 6, packed)
+            with tempfile.TemporaryDirectory() as directory:
+                for view in VIEWS:
+                    path = os.path.join(directory, f"{view}.npy")
+                    self.assertEqual(63, write_table(field, path, view, chunk_size=10))
+                    self.assertTrue(np.array_equal(field.as_array(view), np.load(path)), (view, packed))
+                with self.assertRaises(ValueError):
+                    write_table(field, os.path.join(directory, "table.csv"))
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    @disable_logging
+    def test_arrow_and_parquet_tables(self):
+        import pyarrow
+        import pyarrow.parquet
+
+        field = field_of(3, 3)
+        for view in VIEWS:
+            expected = field.as_array(view).reshape(26, -1)
+            array = to_arrow(field, view)
+            self.assertTrue(np.array_equal(expected, np.asarray(array.flatten()).reshape(26, -1)), view)
+            if view in ('coefficients', 'matrix'):
+                self.assertTrue(np.shares_memory(field.as_array(view), np.asarray(array.values)), view)
+
+            with tempfile.TemporaryDirectory() as directory:
+                for extension in ('arrow', 'parquet'):
+                    path = os.path.join(directory, f"table.{extension}")
+                    self.assertEqual(26, write_table(field, path, view, chunk_size=7))
+                    if extension == 'arrow':
+                        with pyarrow.memory_map(path) as source:
+                            table = pyarrow.ipc.open_file(source).read_all()
+                    else:
+                        table = pyarrow.parquet.read_table(path)
+                    column = table.column("element").combine_chunks()
+                    self.assertTrue(np.array_equal(expected, np.asarray(column.flatten()).reshape(26, -1)))
+                    self.assertEqual(b"3", table.schema.metadata[b"p"])
+
+
+if __name__ == '__main__':
+    unittest.main()
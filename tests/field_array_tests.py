@@ -0,0 +1,111 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from finite_fields import field_array
+from finite_fields.field_array import FieldArray
+from finite_fields.finite_field import FiniteField
+from tests.fixtures import companion_matrix, field_of
+from utils.memo_cache import MemoCache
+from wrappers.disable_logging import disable_logging
+
+FIELD_SIZES = ((2, 1), (2, 4), (3, 2), (3, 3), (5, 2), (7, 1))
+
+
+def naive_matmul(field, a, b):
+    result = np.zeros((a.shape[0], b.shape[1]), dtype=np.int64)
+    for i in range(a.shape[0]):
+        for j in range(b.shape[1]):
+            for t in range(a.shape[1]):
+                result[i, j] = field.add(int(result[i, j]), field.mul(int(a[i, t]), int(b[t, j])))
+    return result
+
+
+class TestFieldArray(unittest.TestCase):
+
+    @disable_logging
+    def test_elementwise_operations_match_field(self):
+        for p, n in FIELD_SIZES:
+            field = field_of(p, n)
+            a = FieldArray.random(field, (5, 6), seed=1)
+            b = FieldArray.random(field, (6,), seed=2)
+
+            self.assertTrue(np.array_equal(field.add(a.indices, b.indices), (a + b).indices), (p, n))
+            self.assertTrue(np.array_equal(field.sub(a.indices, b.indices), (a - b).indices), (p, n))
+            self.assertTrue(np.array_equal(field.neg(a.indices), (-a).indices), (p, n))
+            self.assertTrue(np.array_equal(field.mul(a.indices, b.indices), (a * b).indices), (p, n))
+            self.assertTrue(np.all((a - a) == 0))
+            nonzero = FieldArray(field, np.arange(1, field.order))
+            self.assertTrue(np.all(nonzero * (1 / nonzero) == 1), (p, n))
+
+    @disable_logging
+    def test_matmul_matches_naive_product(self):
+        for limit in (field_array.MULTIPLICATION_MATRICES_LIMIT, 0):
+            with mock.patch.object(field_array, "MULTIPLICATION_MATRICES_LIMIT", limit), \
+                    mock.patch.object(field_array, "BLOCK_ELEMENTS", 64):
+                for p, n in FIELD_SIZES:
+                    field = field_of(p, n)
+                    a = FieldArray.random(field, (7, 9), seed=3)
+                    b = FieldArray.random(field, (9, 5), seed=4)
+                    self.assertTrue(np.array_equal(naive_matmul(field, a.indices, b.indices), (a @ b).indices),
+                                    (p, n, limit))
+
+    @disable_logging
+    def test_row_reduce_inverse_and_solve(self):
+        with mock.patch.object(field_array, "PANEL_COLUMNS", 3):
+            for p, n in FIELD_SIZES:
+                field = field_of(p, n)
+                a = FieldArray.random(field, (8, 8), seed=5)
+                if a.rank() < 8:
+                    a = a + FieldArray.identity(field, 8) * FieldArray.random(field, (8, 8), seed=6)
+                if a.rank() < 8:
+                    continue
+                identity = FieldArray.identity(field, 8)
+                self.assertTrue(np.all(a @ a.inv() == identity), (p, n))
+                x = FieldArray.random(field, (8,), seed=7)
+                b = FieldArray(field, (a @ x.indices[:, np.newaxis]).indices[:, 0])
+                self.assertTrue(np.all(a.solve(b) == x), (p, n))
+
+    @disable_logging
+    def test_non_companion_primitive_matrix(self):
+        # B·C·B^-1 is primitive but not a companion matrix, so α^c is not the basis vector e_c.
+        b, b_inverse = np.array([[1, 1], [0, 1]]), np.array([[1, 2], [0, 1]])
+        primitive = b @ companion_matrix(3, [1, 1, 2]) @ b_inverse % 3
+        field = FiniteField(3, 2, primitive, memo_cache=MemoCache())
+        for limit in (field_array.MULTIPLICATION_MATRICES_LIMIT, 0):
+            with mock.patch.object(field_array, "MULTIPLICATION_MATRICES_LIMIT", limit):
+                a = FieldArray.random(field, (6, 6), seed=9)
+                c = FieldArray.random(field, (6, 4), seed=10)
+                self.assertTrue(np.array_equal(naive_matmul(field, a.indices, c.indices), (a @ c).indices), limit)
+                if a.rank() == 6:
+                    self.assertTrue(np.all(a @ a.inv() == FieldArray.identity(field, 6)), limit)
+                stacked = FieldArray(field, np.concatenate((a.indices[:3], (a[:3] * 4).indices)))
+                self.assertEqual(a[:3].rank(), stacked.rank(), limit)
+
+    @disable_logging
+    def test_rank_of_dependent_rows(self):
+        field = field_of(3, 2)
+        a = FieldArray.random(field, (4, 7), seed=8)
+        stacked = FieldArray(field, np.concatenate((a.indices, (a[:2] * 5 + a[2:] * 7).indices)))
+        reduced, pivots = stacked.row_reduce()
+
+        self.assertEqual(a.rank(), len(pivots))
+        self.assertTrue(np.all(reduced[len(pivots):] == 0))
+        self.assertTrue(np.all(reduced.indices[np.arange(len(pivots)), pivots] == 1))
+        with self.assertRaises(np.linalg.LinAlgError):
+            FieldArray.zeros(field, (3, 3)).inv()
+
+    @disable_logging
+    def test_invalid_operands(self):
+        field = field_of(2, 4)
+        with self.assertRaises(ValueError):
+            FieldArray(field, [16])
+        with self.assertRaises(ValueError):
+            FieldArray.ones(field, (2,)) + FieldArray.ones(field_of(3, 2), (2,))
+        with self.assertRaises(ValueError):
+            FieldArray.ones(field, (2, 3)) @ FieldArray.ones(field, (2, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from finite_fields.field_cache import FieldCache
+from finite_fields.finite_field import FiniteField
+from tests.fixtures import companion_matrix
+from utils.memo_cache import MemoCache
+from wrappers.disable_logging import disable_logging
+
+
+class TestFieldCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @disable_logging
+    def test_store_and_load_memory_mapped_arrays(self):
+        cache = FieldCache(self.directory.name)
+        vectors = np.arange(60, dtype=np.int32).reshape(20, 3)
+        empty = np.empty((0, 2, 2), dtype=np.int32)
+
+        cache.store("entry", {"vectors": vectors, "empty": empty}, meta={"complete": True})
+        arrays, meta = cache.load("entry")
+
+        self.assertIsInstance(arrays["vectors"], np.memmap)
+        self.assertTrue(np.array_equal(vectors, arrays["vectors"]))
+        self.assertEqual((0, 2, 2), arrays["empty"].shape)
+        self.assertEqual({"complete": True}, meta)
+        self.assertIsNone(cache.load("missing"))
+
+    @disable_logging
+    def test_broken_entries_are_removed(self):
+        cache = FieldCache(self.directory.name, verify_payload=True)
+        cache.store("entry", {"vectors": np.arange(100, dtype=np.int64)})
+        path = os.path.join(self.directory.name, "entry" + FieldCache.SUFFIX)
+        with open(path, "r+b") as file:
+            file.seek(-8, os.SEEK_END)
+            file.write(b"\xff" * 8)
+
+        self.assertIsNone(cache.load("entry"))
+        self.assertFalse(os.path.exists(path))
+
+        cache.store("entry", {"vectors": np.arange(100, dtype=np.int64)})
+        with open(path, "r+b") as file:
+            file.truncate(200)
+        self.assertIsNone(FieldCache(self.directory.name).load("entry"))
+
+    @disable_logging
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = FieldCache(self.directory.name, max_bytes=4000)
+        array = np.zeros(128, dtype=np.int64)
+        for i, key in enumerate(["a", "b", "c"]):
+            cache.store(key, {"array": array})
+            os.utime(os.path.join(self.directory.name, key + FieldCache.SUFFIX), (i, i))
+        cache.load("a")
+
+        cache.store("d", {"array": array})
+
+        self.assertIsNotNone(cache.load("a"))
+        self.assertIsNone(cache.load("b"))
+        self.assertIsNotNone(cache.load("d"))
+
+    @disable_logging
+    def test_entries_in_use_are_skipped_by_eviction(self):
+        cache = FieldCache(self.directory.name)
+        array = np.zeros(128, dtype=np.int64)
+        for i, key in enumerate(["a", "b", "c"]):
+            cache.store(key, {"array": array})
+            os.utime(os.path.join(self.directory.name, key + FieldCache.SUFFIX), (i, i))
+        in_use = os.path.join(self.directory.name, "a" + FieldCache.SUFFIX)
+        remove = os.remove
+
+        def remove_unless_mapped(path):
+            if path == in_use:
+                raise PermissionError(path)
+            remove(path)
+
+        cache = FieldCache(self.directory.name, max_bytes=3000)
+        with mock.patch("os.remove", remove_unless_mapped):
+            cache.store("d", {"array": array})
+
+        self.assertIsNotNone(cache.load("a"))
+        self.assertIsNone(cache.load("b"))
+        self.assertIsNone(cache.load("c"))
+        self.assertIsNotNone(cache.load("d"))
+
+    @disable_logging
+    def test_finite_field_uses_cache(self):
+        cache = FieldCache(self.directory.name)
+        primitive = companion_matrix(3, [1, 0, 2, 1])
+        field = FiniteField(3, 3, primitive, cache=cache, memo_cache=MemoCache())
+        vectors = field.get_elements(view='vector')
+        products = field.mul(np.arange(27), 5)
+
+        # Separate memo cache, so tables come from disk and not from memory of the first field.
+        cached_field = FiniteField(3, 3, primitive, cache=cache, memo_cache=MemoCache())
+
+        self.assertTrue(np.array_equal(np.array(vectors), np.array(cached_field.get_elements(view='vector'))))
+        self.assertTrue(np.array_equal(products, cached_field.mul(np.arange(27), 5)))
+        self.assertIsInstance(cached_field.log_table, np.memmap)
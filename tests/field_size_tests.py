@@ -0,0 +1,26 @@
+import unittest
+
+from utils.field_size import NotPrimePowerError, parse_field_size
+
+
+class TestParseFieldSize(unittest.TestCase):
+
+    def test_power_and_decimal_forms(self):
+        self.assertEqual((2, 16), parse_field_size("2^16"))
+        self.assertEqual((7, 5), parse_field_size(" 7^5 "))
+        self.assertEqual((3, 4), parse_field_size("81"))
+        self.assertEqual((13, 1), parse_field_size("13"))
+
+    def test_invalid_sizes(self):
+        for text in ["", "2^", "^3", "2^3^4", "a^2", "6^2", "12", "1", "0", "-8"]:
+            with self.assertRaises(ValueError, msg=text):
+                parse_field_size(text)
+
+    def test_not_prime_power_error_keeps_the_number(self):
+        for text, num in [("6^2", 36), ("12", 12), ("1", 1)]:
+            with self.assertRaises(NotPrimePowerError, msg=text) as context:
+                parse_field_size(text)
+            self.assertEqual(num, context.exception.num)
+        with self.assertRaises(ValueError) as context:
+            parse_field_size("a^2")
+        self.assertNotIsInstance(context.exception, NotPrimePowerError)
@@ -0,0 +1,308 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from finite_fields.conjugacy import minimal_polynomials
+from finite_fields.finite_field import FiniteField
+from finite_fields.lfsr import fill_power_vectors
+from finite_fields.packed import encode_packed
+from finite_fields.parallel_build import build_power_vectors_parallel
+from finite_fields.rebase import find_root
+from tests.fixtures import companion_matrix
+from utils.memo_cache import MemoCache
+from wrappers.disable_logging import disable_logging
+
+
+PRIMITIVE_POLYNOMIALS = {
+    (2, 1): [1, 1],
+    (2, 3): [1, 0, 1, 1],
+    (2, 5): [1, 0, 0, 1, 0, 1],
+    (3, 2): [1, 1, 2],
+    (3, 3): [1, 0, 2, 1],
+    (5, 2): [1, 1, 2],
+    (7, 2): [1, 1, 3],
+}
+
+
+def build_by_matrix_products(p, n, primitive):
+    current = primitive.copy()
+    matrices = [current]
+    for _ in range(p ** n - 2):
+        current = np.dot(current, primitive) % p
+        matrices.append(current)
+    return matrices
+
+
+class TestFiniteField(unittest.TestCase):
+    @disable_logging
+    def test_matrix_view_matches_matrix_products(self):
+        for (p, n), coefficients in PRIMITIVE_POLYNOMIALS.items():
+            primitive = companion_matrix(p, coefficients)
+            expected = build_by_matrix_products(p, n, primitive)
+
+            matrices = list(FiniteField(p, n, primitive).get_elements(view='matrix'))
+
+            self.assertEqual(len(expected), len(matrices))
+            for expected_matrix, matrix in zip(expected, matrices):
+                self.assertEqual(expected_matrix.tobytes(), matrix.tobytes())
+
+    @disable_logging
+    def test_vector_view_matches_matrix_products(self):
+        for (p, n), coefficients in PRIMITIVE_POLYNOMIALS.items():
+            primitive = companion_matrix(p, coefficients)
+            expected = build_by_matrix_products(p, n, primitive)
+
+            vectors = FiniteField(p, n, primitive).get_elements(view='vector')
+
+            self.assertEqual(len(expected), len(vectors))
+            for expected_matrix, vector in zip(expected, vectors):
+                self.assertTrue(np.array_equal(expected_matrix[:, 0][::-1], vector))
+
+    @disable_logging
+    def test_non_companion_primitive_matrix(self):
+        primitive = companion_matrix(3, PRIMITIVE_POLYNOMIALS[(3, 2)])
+        basis = np.array([[1, 1], [0, 1]], dtype=np.int32)
+        basis_inverse = np.array([[1, 2], [0, 1]], dtype=np.int32)
+        conjugated = (basis @ primitive @ basis_inverse % 3).astype(np.int32)
+        expected = build_by_matrix_products(3, 2, conjugated)
+
+        field = FiniteField(3, 2, conjugated)
+
+        for expected_matrix, matrix, vector in zip(expected, field.get_elements(view='matrix'),
+                                                   field.get_elements(view='vector')):
+            self.assertTrue(np.array_equal(expected_matrix, matrix))
+            self.assertTrue(np.array_equal(expected_matrix[:, 0][::-1], vector))
+
+    @disable_logging
+    def test_parallel_build_matches_serial_build(self):
+        primitive = companion_matrix(2, [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 1, 0, 1])
+
+        serial = FiniteField(2, 16, primitive).get_elements(view='vector')
+        parallel = FiniteField(2, 16, primitive, workers=3).get_elements(view='vector')
+
+        self.assertTrue(np.array_equal(np.array(serial), np.array(parallel)))
+
+    @disable_logging
+    def test_parallel_shards_match_serial_table(self):
+        for (p, n), coefficients in PRIMITIVE_POLYNOMIALS.items():
+            primitive = companion_matrix(p, coefficients)
+            serial = np.empty((p ** n - 1, n), dtype=np.int32)
+
+            fill_power_vectors(serial, primitive[:, 0], primitive, p)
+            parallel = build_power_vectors_parallel(p ** n - 1, primitive[:, 0], primitive, p, workers=2)
+
+            self.assertEqual(serial.tobytes(), parallel.tobytes())
+
+    @disable_logging
+    def test_encode_decode(self):
+        field = FiniteField(3, 3, companion_matrix(3, PRIMITIVE_POLYNOMIALS[(3, 3)]))
+        vectors = np.array(field.get_elements(view='vector'))
+
+        indices = field.encode(vectors)
+
+        self.assertEqual(list(range(1, 27)), sorted(indices.tolist()))
+        self.assertTrue(np.array_equal(vectors, field.decode(indices)))
+        self.assertEqual(1, field.encode(vectors[-1]))
+        self.assertEqual(field.antilog_table[1], indices[0])
+
+    @disable_logging
+    def test_arithmetic_matches_matrix_arithmetic(self):
+        for (p, n), coefficients in PRIMITIVE_POLYNOMIALS.items():
+            primitive = companion_matrix(p, coefficients)
+            field = FiniteField(p, n, primitive)
+            powers = [np.linalg.matrix_power(primitive, j) % p for j in range(n)]
+
+            def as_matrix(index):
+                coordinates = field.decode(index)[::-1]
+                return sum(int(c) * power for c, power in zip(coordinates, powers)) % p
+
+            a, b = np.meshgrid(np.arange(p ** n), np.arange(p ** n))
+            a, b = a.ravel(), b.ravel()
+            sums = field.add(a, b)
+            products = field.mul(a, b)
+
+            self.assertTrue(np.array_equal(field.decode(sums), (field.decode(a) + field.decode(b)) % p))
+            self.assertTrue(np.array_equal(field.add(sums, field.neg(b)), a))
+            self.assertTrue(np.array_equal(field.sub(sums, b), a))
+            for x, y, product in zip(a.tolist(), b.tolist(), products.tolist()):
+                expected = (as_matrix(x) @ as_matrix(y) % p)[:, 0][::-1]
+                self.assertTrue(np.array_equal(expected, field.decode(product)))
+
+    @disable_logging
+    def test_inv_div_pow(self):
+        field = FiniteField(5, 2, companion_matrix(5, PRIMITIVE_POLYNOMIALS[(5, 2)]))
+        nonzero = np.arange(1, 25)
+
+        self.assertTrue(np.all(field.mul(nonzero, field.inv(nonzero)) == 1))
+        self.assertTrue(np.array_equal(field.div(field.mul(nonzero, 7), 7), nonzero))
+        self.assertTrue(np.all(field.pow(nonzero, 24) == 1))
+        self.assertTrue(np.array_equal(field.pow(nonzero, -1), field.inv(nonzero)))
+        self.assertEqual(field.mul(field.mul(3, 3), 3), field.pow(3, 3))
+        self.assertEqual(1, field.pow(0, 0))
+        self.assertEqual(0, field.pow(0, 5))
+        self.assertIsInstance(field.mul(2, 3), int)
+        with self.assertRaises(ZeroDivisionError):
+            field.inv(0)
+        with self.assertRaises(ZeroDivisionError):
+            field.div(1, np.array([1, 0]))
+
+    @disable_logging
+    def test_iter_elements_matches_matrix_products(self):
+        primitive = companion_matrix(3, PRIMITIVE_POLYNOMIALS[(3, 2)])
+        basis = np.array([[1, 1], [0, 1]], dtype=np.int32)
+        basis_inverse = np.array([[1, 2], [0, 1]], dtype=np.int32)
+        conjugated = (basis @ primitive @ basis_inverse % 3).astype(np.int32)
+        for p, n, matrix in [(2, 5, companion_matrix(2, PRIMITIVE_POLYNOMIALS[(2, 5)])),
+                             (7, 2, companion_matrix(7, PRIMITIVE_POLYNOMIALS[(7, 2)])),
+                             (2, 1, companion_matrix(2, PRIMITIVE_POLYNOMIALS[(2, 1)])),
+                             (3, 2, conjugated)]:
+            powers = np.array(build_by_matrix_products(p, n, matrix))
+            expected = powers[(np.arange(3 * p ** n) - 1) % len(powers)]
+            field = FiniteField(p, n, matrix)
+
+            for start, stop, chunk_size in [(1, None, 7), (0, 5, 2), (p ** n // 2, 2 * p ** n, 1000), (3, 3, 4)]:
+                stop_exponent = p ** n if stop is None else stop
+                matrices = list(field.iter_elements('matrix', start, stop, chunk_size))
+                vectors = list(field.iter_elements('vector', start, stop, chunk_size))
+                self.assertTrue(all(len(chunk) <= chunk_size for chunk in matrices))
+                matrices = np.concatenate(matrices) if matrices else np.empty((0, n, n))
+                vectors = np.concatenate(vectors) if vectors else np.empty((0, n))
+                self.assertTrue(np.array_equal(expected[start:stop_exponent], matrices))
+                self.assertTrue(np.array_equal(expected[start:stop_exponent, :, 0][:, ::-1], vectors))
+
+            field.get_elements(view='vector')
+            chunks = np.concatenate(list(field.iter_elements('matrix', 2, 2 * p ** n, 5)))
+            self.assertTrue(np.array_equal(expected[2:2 * p ** n], chunks))
+
+        with self.assertRaises(ValueError):
+            next(field.iter_elements('matrix', -1))
+
+    @disable_logging
+    def test_discrete_log_by_table_and_pohlig_hellman(self):
+        for p, n in [(2, 1), (2, 5), (3, 3), (7, 2)]:
+            primitive = companion_matrix(p, PRIMITIVE_POLYNOMIALS[(p, n)])
+            field = FiniteField(p, n, primitive)
+            matrices = np.concatenate(list(field.iter_elements('matrix', 0, p ** n - 1)))
+            vectors = matrices[:, :, 0][:, ::-1]
+            expected = np.arange(p ** n - 1)
+
+            for method in ['pohlig-hellman', 'table']:
+                self.assertTrue(np.array_equal(expected, field.discrete_log_many(vectors, method=method)))
+                self.assertTrue(np.array_equal(expected, field.discrete_log_many(matrices, 'matrix', method)))
+            indices = field.encode(vectors)
+            self.assertTrue(np.array_equal(expected, field.discrete_log_many(indices, 'index')))
+            self.assertEqual(-1, field.discrete_log_many(np.zeros((1, n), dtype=np.int32))[0])
+            self.assertEqual(p ** n - 2, field.discrete_log(vectors[-1]))
+            with self.assertRaises(ValueError):
+                field.discrete_log(np.zeros(n, dtype=np.int32))
+            for method in ['pohlig-hellman', 'table']:
+                for bad in ([0], [-1], [p ** n], [1, p ** n + 1]):
+                    with self.assertRaises(ValueError, msg=(p, n, method, bad)):
+                        field.discrete_log_many(np.array(bad), 'index', method)
+
+    @disable_logging
+    def test_discrete_log_of_untabulated_field(self):
+        # x^48 + x^28 + x^27 + x + 1 is primitive over GF(2), 2^48 - 1 = 3^2·5·7·13·17·97·241·257·673.
+        coefficients = [0] * 49
+        for degree in [48, 28, 27, 1, 0]:
+            coefficients[48 - degree] = 1
+        field = FiniteField(2, 48, companion_matrix(2, coefficients))
+        exponents = [0, 1, 47, 48, 2 ** 47 + 12345, 2 ** 48 - 2]
+        vectors = np.array([next(field.iter_elements('vector', k, k + 1))[0] for k in exponents])
+
+        self.assertEqual(exponents, field.discrete_log_many(vectors).tolist())
+
+    @disable_logging
+    def test_packed_view_and_storage(self):
+        for p, n in [(2, 5), (3, 3), (7, 2)]:
+            primitive = companion_matrix(p, PRIMITIVE_POLYNOMIALS[(p, n)])
+            field = FiniteField(p, n, primitive)
+            packed_field = FiniteField(p, n, primitive, packed=True)
+            vectors = np.array(field.get_elements(view='vector'))
+
+            packed = packed_field.get_elements(view='packed')
+            self.assertEqual((p ** n - 1, 1), packed.shape)
+            self.assertEqual(np.uint64, packed.dtype)
+            indices = field.encode(vectors)
+            self.assertEqual(indices.tolist(), encode_packed(packed, p, n).tolist())
+            if p == 2:
+                # For small binary fields the packed word is the index of the element.
+                self.assertEqual(indices.tolist(), packed[:, 0].tolist())
+            self.assertTrue(np.array_equal(vectors, packed_field.unpack(packed)))
+            self.assertTrue(np.array_equal(packed, field.get_elements(view='packed')))
+            self.assertTrue(np.array_equal(vectors, np.array(packed_field.get_elements(view='vector'))))
+            self.assertTrue(np.array_equal(field.get_elements(view='matrix').array,
+                                           packed_field.get_elements(view='matrix').array))
+            self.assertTrue(np.array_equal(packed, np.concatenate(list(field.iter_elements('packed', chunk_size=7)))))
+            self.assertTrue(np.array_equal(np.concatenate(list(field.iter_elements('matrix', 3, 40, 6))),
+                                           np.concatenate(list(packed_field.iter_elements('matrix', 3, 40, 6)))))
+
+            total = packed_field.add_packed(packed, packed[::-1])
+            self.assertEqual(field.add(indices, indices[::-1]).tolist(), encode_packed(total, p, n).tolist())
+
+    @disable_logging
+    def test_packed_tables_are_unpacked_by_chunks(self):
+        for p, n in [(2, 5), (3, 3), (7, 2)]:
+            primitive = companion_matrix(p, PRIMITIVE_POLYNOMIALS[(p, n)])
+            field = FiniteField(p, n, primitive, memo_cache=MemoCache())
+            packed_field = FiniteField(p, n, primitive, packed=True, memo_cache=MemoCache())
+            with mock.patch("finite_fields.finite_field.CHUNK_ROWS", 5), mock.patch("finite_fields.packed.CHUNK_ROWS", 5):
+                matrices = packed_field.get_elements('matrix').array
+                log_table = packed_field.log_table
+
+            self.assertTrue(np.array_equal(field.get_elements('matrix').array, matrices))
+            self.assertTrue(np.array_equal(field.log_table, log_table))
+            self.assertTrue(np.array_equal(field.zech_table, packed_field.zech_table))
+
+    @disable_logging
+    def test_rebase_matches_fresh_build(self):
+        for (p, n), coefficients in PRIMITIVE_POLYNOMIALS.items():
+            order = p ** n - 1
+            for packed in (False, True):
+                field = FiniteField(p, n, companion_matrix(p, coefficients), packed=packed, memo_cache=MemoCache())
+                for k in range(1, order + 1):
+                    if np.gcd(k, order) != 1:
+                        continue
+                    rebased = field.rebase(exponent=k)
+                    again = field.rebase(rebased.primitive_matrix)
+                    fresh = FiniteField(p, n, rebased.primitive_matrix, memo_cache=MemoCache())
+                    for other in (rebased, again):
+                        self.assertTrue(np.array_equal(fresh.get_elements('packed'), other.get_elements('packed')),
+                                        (p, n, k, packed))
+                        for table in ('antilog_table', 'log_table', 'zech_table'):
+                            self.assertTrue(np.array_equal(getattr(fresh, table), getattr(other, table)), (p, n, k))
+
+    @disable_logging
+    def test_rebase_rejects_non_primitive_elements(self):
+        field = FiniteField(2, 4, companion_matrix(2, [1, 0, 0, 1, 1]), memo_cache=MemoCache())
+        with self.assertRaises(ValueError):
+            field.rebase(exponent=3)
+        with self.assertRaises(ValueError):
+            field.rebase()
+        with self.assertRaises(ValueError):
+            # x^4 + x^3 + x^2 + x + 1 is irreducible, but its roots have order 5.
+            field.rebase(companion_matrix(2, [1, 1, 1, 1, 1]))
+        with self.assertRaises(ValueError):
+            # x^4 + x^2 + 1 = (x^2 + x + 1)^2, its roots have order 3.
+            field.rebase(companion_matrix(2, [1, 0, 1, 0, 1]))
+        with self.assertRaises(ValueError):
+            # x^3 + x + 1 is irreducible, and GF(2^3) is not a subfield of GF(2^4).
+            find_root(field, [1, 1, 0, 1])
+
+    @disable_logging
+    def test_find_root(self):
+        for (p, n), coefficients in PRIMITIVE_POLYNOMIALS.items():
+            field = FiniteField(p, n, companion_matrix(p, coefficients), memo_cache=MemoCache())
+            order = p ** n - 1
+            # Roots in GF(p), with a repeated one.
+            for roots in ([0], [1, 1, p - 1], [2 % p, 0]):
+                polynomial = np.array([1])
+                for root in roots:
+                    polynomial = np.convolve(polynomial, [-root, 1]) % p
+                self.assertIn(find_root(field, polynomial, seed=p), roots, (p, n))
+            # Minimal polynomials, their roots are conjugates α^(k·p^i).
+            for k in range(1, min(order, 20)):
+                conjugates = {int(field.antilog_table[k * p ** i % order]) for i in range(n)}
+                polynomial = np.trim_zeros(minimal_polynomials(field, [k])[0], 'b')
+                self.assertIn(find_root(field, polynomial), conjugates, (p, n, k))
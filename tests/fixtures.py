@@ -0,0 +1,24 @@
+"""
+Helpers shared by test modules.
+"""
+import numpy as np
+
+from finite_fields.finite_field import FiniteField
+from primitive_element_finders.fast_primitive_finder import FastPrimitiveFinder
+from utils.memo_cache import MemoCache
+
+
+def companion_matrix(p, coefficients):
+    """ Companion matrix of a polynomial given by its coefficients over GF(p), highest degree first. """
+    n = len(coefficients) - 1
+    matrix = np.zeros((n, n), dtype=np.int32)
+    matrix[1:, :-1] = np.eye(n - 1)
+    matrix[:, -1] = [(-c) % p for c in reversed(coefficients[1:])]
+    return matrix
+
+
+def field_of(p: int, n: int, packed: bool = False) -> FiniteField:
+    """ Field built by the first primitive element, with a private memo cache so tests do not share tables. """
+    cache = MemoCache()
+    return FiniteField(p, n, FastPrimitiveFinder(p, n, memo_cache=cache).find_first(), packed=packed,
+                       memo_cache=cache)
@@ -0,0 +1,65 @@
+import json
+import os
+import tempfile
+import unittest
+
+from finite_fields.finite_field import FiniteField
+from primitive_element_finders.fast_primitive_finder import FastPrimitiveFinder
+from utils import instrumentation
+from utils.memo_cache import MemoCache
+from wrappers.disable_logging import disable_logging
+from wrappers.traced import traced
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def tearDown(self):
+        instrumentation.disable()
+
+    def test_disabled_instrumentation_records_nothing(self):
+        self.assertIsNone(instrumentation.current_tracer())
+        with instrumentation.span("a") as first, instrumentation.span("b") as second:
+            instrumentation.count("c")
+        self.assertIs(first, second)
+
+    def test_spans_counters_and_decorator(self):
+        @traced("square")
+        def square(x):
+            return x * x
+
+        tracer = instrumentation.enable()
+        with instrumentation.span("outer", size=3):
+            self.assertEqual(9, square(3))
+            instrumentation.count("items", 5)
+            instrumentation.count("items")
+        instrumentation.disable()
+        square(4)
+
+        self.assertEqual("square", square.__name__)
+        self.assertEqual({"outer": 1, "square": 1}, {name: s["calls"] for name, s in tracer.summary().items()})
+        self.assertEqual({"items": 6}, tracer.counters)
+        outer = next(event for event in tracer.events if event["name"] == "outer")
+        self.assertEqual({"size": 3}, outer["args"])
+
+    @disable_logging
+    def test_pipeline_trace_is_written_in_chrome_format(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.json")
+            with instrumentation.tracing(path):
+                cache = MemoCache()
+                primitive = FastPrimitiveFinder(2, 8, memo_cache=cache).find_first()
+                FiniteField(2, 8, primitive, memo_cache=cache).get_elements('matrix')
+            with open(path) as file:
+                trace = json.load(file)
+
+        names = {event["name"] for event in trace["traceEvents"] if event["ph"] == "X"}
+        self.assertTrue({"fast_finder.find_first", "field.build", "lfsr.fill_power_vectors",
+                         "field.matrices", "array_set.add_many"} <= names)
+        counters = {event["name"]: event["args"]["value"] for event in trace["traceEvents"] if event["ph"] == "C"}
+        self.assertEqual(1, counters["polynomials.primitive"])
+        # The primitive element cached by the finder and 255 elements of the field.
+        self.assertEqual(1 + 255, counters["array_set.inserted"])
+
+
+if __name__ == '__main__':
+    unittest.main()
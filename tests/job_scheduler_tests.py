@@ -0,0 +1,116 @@
+import threading
+import unittest
+
+import numpy as np
+
+from finite_fields.finite_field import FiniteField
+from gui.job_scheduler import JobScheduler, ResultCache
+from utils.cancellation import CancellationToken, OperationCancelled
+from utils.memo_cache import MemoCache
+from wrappers.disable_logging import disable_logging
+
+
+class FakeRoot:
+    """ Stands for the Tk root: after() callbacks run only when the test calls run_pending(). """
+    def __init__(self):
+        self.pending = []
+        self.thread = threading.current_thread()
+
+    def after(self, delay, callback):
+        self.pending.append(callback)
+
+    def run_pending(self):
+        pending, self.pending = self.pending, []
+        for callback in pending:
+            callback()
+
+
+class TestJobScheduler(unittest.TestCase):
+
+    @disable_logging
+    def test_callbacks_run_on_tk_thread(self):
+        root = FakeRoot()
+        scheduler = JobScheduler(root)
+        calls = []
+
+        def record(name):
+            return lambda *args: calls.append((name, args, threading.current_thread() is root.thread))
+
+        def job(token, progress):
+            progress(50, "half")
+            return 42
+
+        handle = scheduler.submit("job", job, on_done=record("done"), on_progress=record("progress"))
+        handle.future.result()
+        self.assertEqual([], calls)
+
+        root.run_pending()
+        self.assertEqual([("progress", (50, "half"), True), ("done", (42,), True)], calls)
+        scheduler.shutdown()
+
+    @disable_logging
+    def test_new_job_cancels_stale_job(self):
+        root = FakeRoot()
+        scheduler = JobScheduler(root)
+        started = threading.Event()
+        results = []
+
+        def slow_job(token, progress):
+            started.set()
+            while True:
+                progress(0)
+
+        first = scheduler.submit("slow", slow_job, on_done=results.append)
+        started.wait()
+        second = scheduler.submit("fast", lambda token, progress: "fast", on_done=results.append)
+        second.future.result(timeout=5)
+
+        self.assertTrue(first.cancelled)
+        root.run_pending()
+        self.assertEqual(["fast"], results)
+        scheduler.shutdown()
+
+    @disable_logging
+    def test_errors_are_reported(self):
+        root = FakeRoot()
+        scheduler = JobScheduler(root)
+        errors = []
+
+        def failing_job(token, progress):
+            raise ArithmeticError("broken")
+
+        scheduler.submit("failing", failing_job, on_done=None, on_error=errors.append).future.result()
+        root.run_pending()
+        self.assertEqual(1, len(errors))
+        self.assertIsInstance(errors[0], ArithmeticError)
+        scheduler.shutdown()
+
+    def test_result_cache_evicts_least_recently_used(self):
+        cache = ResultCache(max_items=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        self.assertEqual(1, cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(2, len(cache))
+
+
+class TestCancellableBuild(unittest.TestCase):
+
+    @disable_logging
+    def test_cancelled_build_raises_and_leaves_field_unbuilt(self):
+        primitive = np.zeros((16, 16), dtype=np.int32)
+        primitive[1:, :-1] = np.eye(15, dtype=np.int32)
+        primitive[:, -1] = [1, 0, 1, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]  # x^16 + x^5 + x^3 + x^2 + 1
+        field = FiniteField(2, 16, primitive, memo_cache=MemoCache())
+        token = CancellationToken()
+        token.cancel()
+
+        with self.assertRaises(OperationCancelled):
+            field.build(cancel_token=token)
+
+        reported = []
+        field.build(progress=lambda done, total: reported.append((done, total)))
+        self.assertEqual((2 ** 16 - 1, 2 ** 16 - 1), reported[-1])
@@ -0,0 +1,91 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from finite_fields.finite_field import FiniteField
+from primitive_element_finders.fast_primitive_finder import FastPrimitiveFinder
+from utils.memo_cache import MemoCache
+from wrappers.disable_logging import disable_logging
+
+
+class TestMemoCache(unittest.TestCase):
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        cache = MemoCache(max_bytes=2000)
+        cache.put("a", np.zeros(100))
+        cache.put("b", np.zeros(100))
+        cache.get("a")
+        cache.put("c", np.zeros(100))
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        stats = cache.stats()
+        self.assertEqual(1, stats["evictions"])
+        self.assertEqual(1600, stats["bytes"])
+
+    def test_values_bigger_than_budget_are_not_kept(self):
+        cache = MemoCache(max_bytes=100)
+        value = cache.get_or_create("big", lambda: np.zeros(100))
+        self.assertEqual(100, len(value))
+        self.assertEqual(0, len(cache))
+
+    def test_concurrent_requests_share_one_creation(self):
+        cache = MemoCache()
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def create():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return np.arange(10)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(cache.get_or_create, "key", create) for _ in range(8)]
+            started.wait(5)
+            release.set()
+            values = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual(1, len(calls))
+        self.assertTrue(all(value is values[0] for value in values))
+        stats = cache.stats()
+        self.assertEqual(1, stats["misses"])
+        self.assertEqual(7, stats["hits"])
+
+    def test_failed_creation_is_retried(self):
+        cache = MemoCache()
+
+        def fail():
+            raise ArithmeticError("broken")
+
+        with self.assertRaises(ArithmeticError):
+            cache.get_or_create("key", fail)
+        self.assertEqual(3, cache.get_or_create("key", lambda: 3))
+
+
+class TestSharedTables(unittest.TestCase):
+
+    @disable_logging
+    def test_fields_and_finders_share_tables(self):
+        cache = MemoCache()
+        primitive = FastPrimitiveFinder(2, 8, memo_cache=cache).find_first()
+        first = FiniteField(2, 8, primitive, memo_cache=cache)
+        second = FiniteField(2, 8, primitive.copy(), memo_cache=cache)
+
+        self.assertIs(first.get_elements('matrix'), second.get_elements('matrix'))
+        self.assertIs(first.log_table, second.log_table)
+        self.assertGreater(cache.stats()["bytes"], first.nbytes // 2)
+
+        all_first = FastPrimitiveFinder(2, 8, memo_cache=cache).find_all()
+        hits = cache.stats()["hits"]
+        all_second = FastPrimitiveFinder(2, 8, memo_cache=cache).find_all()
+        np.testing.assert_array_equal(all_first, all_second)
+        self.assertEqual(hits + 1, cache.stats()["hits"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from utils.is_prime import is_prime_power
+from utils.number_theory import euler_phi, factorize, integer_root, is_prime, prime_factors, prime_power
+
+
+class TestNumberTheory(unittest.TestCase):
+
+    def test_is_prime_matches_sieve(self):
+        limit = 10 ** 4
+        sieve = [True] * limit
+        sieve[0] = sieve[1] = False
+        for i in range(2, limit):
+            if sieve[i]:
+                sieve[i * i::i] = [False] * len(sieve[i * i::i])
+
+        self.assertEqual([i for i in range(limit) if sieve[i]], [i for i in range(limit) if is_prime(i)])
+
+    def test_is_prime_on_strong_pseudoprimes_and_big_primes(self):
+        for n in [3215031751, 2152302898747, 3474749660383, 341550071728321, 3825123056546413051,
+                  318665857834031151167461]:
+            self.assertFalse(is_prime(n), n)
+        for n in [2 ** 31 - 1, 2 ** 61 - 1, 2 ** 89 - 1, 18446744073709551557]:
+            self.assertTrue(is_prime(n), n)
+
+    def test_integer_root_is_exact(self):
+        for n in [0, 1, 2, 3 ** 40, 3 ** 40 - 1, 2 ** 200 + 1, 10 ** 30]:
+            for k in range(1, 8):
+                root = integer_root(n, k)
+                self.assertLessEqual(root ** k, n)
+                self.assertGreater((root + 1) ** k, n)
+
+    def test_prime_power(self):
+        self.assertEqual((2, 61), prime_power(2 ** 61))
+        self.assertEqual((3, 40), prime_power(3 ** 40))
+        self.assertEqual((2 ** 61 - 1, 2), prime_power((2 ** 61 - 1) ** 2))
+        self.assertEqual((13, 1), prime_power(13))
+        for n in [0, 1, 6, 12, 36, 3 ** 6 * 5 ** 6, 2 ** 61 - 2]:
+            self.assertIsNone(prime_power(n), n)
+        self.assertEqual(7, is_prime_power(7 ** 5))
+        self.assertEqual(-1, is_prime_power(100))
+
+    def test_factorize(self):
+        for n in [1, 2, 2 ** 61 - 2, 2 ** 64 - 1, 3 ** 40 - 1, 7 ** 22 - 1, 600851475143, (2 ** 31 - 1) ** 3 * 4]:
+            factors = factorize(n)
+            product = 1
+            for q, k in factors:
+                self.assertTrue(is_prime(q))
+                product *= q ** k
+            self.assertEqual(n, product)
+        self.assertEqual((3, 5, 17, 257, 641, 65537, 6700417), prime_factors(2 ** 64 - 1))
+        self.assertEqual(6, euler_phi(9))
+        self.assertEqual(2 ** 16, euler_phi(2 ** 17))
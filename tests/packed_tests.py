@@ -0,0 +1,48 @@
+import unittest
+
+import numpy as np
+
+from finite_fields.packed import add_packed, digits_per_word, neg_packed, pack, unpack, words_per_element
+
+
+class TestPacked(unittest.TestCase):
+
+    def test_pack_unpack_round_trip(self):
+        rng = np.random.default_rng(0)
+        for p, n in [(2, 1), (2, 63), (2, 64), (2, 65), (2, 200), (3, 40), (3, 41), (5, 100), (13, 7)]:
+            vectors = rng.integers(0, p, size=(50, n), dtype=np.int32)
+            packed = pack(vectors, p)
+
+            self.assertEqual((50, words_per_element(p, n)), packed.shape)
+            self.assertEqual(np.uint64, packed.dtype)
+            self.assertTrue(np.array_equal(vectors, unpack(packed, p, n)))
+            self.assertTrue(np.array_equal(vectors[3:5], unpack(pack(vectors[3:5].reshape(1, 2, n), p), p, n)[0]))
+
+    def test_binary_packing_is_bit_packing(self):
+        vectors = np.zeros((2, 70), dtype=np.int32)
+        vectors[0, [0, 3, 63]] = 1
+        vectors[1, [64, 69]] = 1
+
+        packed = pack(vectors, 2)
+
+        self.assertEqual([[2 ** 63 + 9, 0], [0, 33]], packed.tolist())
+        self.assertEqual(64, digits_per_word(2))
+        self.assertEqual(31, digits_per_word(3))
+
+    def test_odd_packing_uses_bit_fields(self):
+        packed = pack(np.array([[1, 2, 0, 2], [4, 0, 0, 3]]), 5)
+
+        self.assertEqual([[1 + (2 << 3) + (2 << 9)], [4 + (3 << 9)]], packed.tolist())
+        self.assertEqual(20, digits_per_word(5))
+
+    def test_packed_arithmetic(self):
+        rng = np.random.default_rng(1)
+        for p, n in [(2, 130), (3, 50), (3, 62), (7, 9), (13, 40), (65521, 5)]:
+            a = rng.integers(0, p, size=(20, n), dtype=np.int32)
+            b = rng.integers(0, p, size=(20, n), dtype=np.int32)
+
+            total = unpack(add_packed(pack(a, p), pack(b, p), p, n), p, n)
+            self.assertTrue(np.array_equal((a + b) % p, total))
+            self.assertTrue(np.array_equal((-a) % p, unpack(neg_packed(pack(a, p), p, n), p, n)))
+            self.assertTrue(np.array_equal(pack((a + b) % p, p), add_packed(pack(a, p), pack(b, p), p, n)))
+            self.assertTrue(np.array_equal(pack(a, p) * 0, add_packed(pack(a, p), neg_packed(pack(a, p), p, n), p, n)))
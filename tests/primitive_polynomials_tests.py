@@ -0,0 +1,146 @@
+import random
+import unittest
+from itertools import product
+
+import numpy as np
+
+from finite_fields import conjugacy
+from finite_fields.conjugacy import minimal_polynomials, primitive_class_representatives
+from finite_fields.finite_field import FiniteField
+from finite_fields.parallel_build import share_array, shared_view
+from finite_fields.polynomials import companion_polynomial
+from primitive_element_finders.fast_primitive_finder import FastPrimitiveFinder
+from primitive_element_finders.primitive_polynomials import (count_primitive_polys, is_irreducible, is_primitive,
+                                                             primitive_polys, random_primitive_poly)
+from utils.cancellation import CancellationToken, OperationCancelled
+from wrappers.disable_logging import disable_logging
+
+
+def companion_order(p, coefficients):
+    n = len(coefficients) - 1
+    matrix = np.zeros((n, n), dtype=np.int64)
+    matrix[1:, :-1] = np.eye(n - 1)
+    matrix[:, -1] = [(-c) % p for c in reversed(coefficients[1:])]
+    current = matrix.copy()
+    for order in range(1, p ** n):
+        if np.array_equal(current, np.eye(n)):
+            return order
+        current = current.dot(matrix) % p
+    return None
+
+
+class TestPrimitivePolynomials(unittest.TestCase):
+    SIZES = [(2, 1), (2, 2), (2, 3), (2, 4), (2, 6), (3, 1), (3, 2), (3, 3), (5, 2), (7, 1), (7, 2)]
+
+    def test_primitive_polys_match_brute_force(self):
+        for p, n in self.SIZES:
+            expected = []
+            for low in product(range(p), repeat=n):
+                coefficients = [1] + list(low)
+                if companion_order(p, coefficients) == p ** n - 1:
+                    expected.append(coefficients)
+
+            found = [poly.tolist() for poly in primitive_polys(p, n)]
+
+            self.assertEqual(expected, found)
+            self.assertEqual(len(expected), count_primitive_polys(p, n))
+
+    def test_irreducibility_tests_agree(self):
+        for p, n in [(2, 4), (2, 6), (3, 3), (5, 2)]:
+            for low in product(range(p), repeat=n):
+                f = np.array(list(low)[::-1] + [1], dtype=np.int64)
+                self.assertEqual(is_irreducible(f, p, 'rabin'), is_irreducible(f, p, 'ben-or'))
+
+    def test_reducible_and_non_primitive_polynomials(self):
+        self.assertFalse(is_irreducible(np.array([1, 0, 1]), 2))
+        self.assertTrue(is_irreducible(np.array([1, 1, 1, 1, 1]), 2))
+        self.assertFalse(is_primitive(np.array([1, 1, 1, 1, 1]), 2))
+        self.assertFalse(is_primitive(np.array([0, 1]), 3))
+
+    def test_random_primitive_poly(self):
+        rng = random.Random(1)
+        for p, n in [(2, 5), (3, 3), (5, 3), (2, 40), (3, 25)]:
+            poly = random_primitive_poly(p, n, rng)
+            self.assertEqual(n + 1, len(poly))
+            self.assertTrue(is_primitive(poly[::-1], p, 'rabin'))
+
+
+class TestFastPrimitiveFinder(unittest.TestCase):
+
+    @disable_logging
+    def test_find_first_next_all(self):
+        finder = FastPrimitiveFinder(2, 4)
+
+        first = finder.find_first()
+        second = finder.find_next()
+        everything = finder.find_all()
+
+        self.assertEqual([[0, 0, 0, 1], [1, 0, 0, 1], [0, 1, 0, 0], [0, 0, 1, 0]], first.tolist())
+        self.assertEqual([[0, 0, 0, 1], [1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 1]], second.tolist())
+        self.assertEqual(2, len(everything))
+
+    @disable_logging
+    def test_random_search_finds_every_primitive(self):
+        lexicographic = FastPrimitiveFinder(3, 3).find_all()
+        randomized = FastPrimitiveFinder(3, 3, search='random', seed=3).find_all()
+
+        self.assertEqual(sorted(map(bytes, lexicographic)), sorted(map(bytes, randomized)))
+
+    @disable_logging
+    def test_find_all_by_conjugacy_matches_polynomial_walk(self):
+        for p, n in [(2, 1), (3, 1), (2, 6), (3, 3), (5, 2), (2, 8)]:
+            walker = FastPrimitiveFinder(p, n)
+            walked = [companion_polynomial(walker.find_next(), p).tolist() for _ in range(count_primitive_polys(p, n))]
+            expected = [poly.tolist() for poly in primitive_polys(p, n)]
+
+            everything = FastPrimitiveFinder(p, n).find_all()
+
+            self.assertIsInstance(everything, np.ndarray)
+            self.assertEqual(expected, [companion_polynomial(matrix, p).tolist() for matrix in everything])
+            self.assertEqual(expected, walked)
+
+    @disable_logging
+    def test_find_all_in_worker_processes(self):
+        serial = FastPrimitiveFinder(2, 10).find_all()
+        parallel = FastPrimitiveFinder(2, 10, workers=2).find_all()
+
+        self.assertTrue(np.array_equal(serial, parallel))
+
+    @disable_logging
+    def test_workers_read_shared_log_tables(self):
+        primitive = FastPrimitiveFinder(3, 4).find_first()
+        field = FiniteField(3, 4, primitive)
+        tables = tuple(share_array(table) for table in (field.antilog_table, field.log_table, field.zech_table))
+        representatives = primitive_class_representatives(3, 4)
+        try:
+            conjugacy._init_worker(3, 4, primitive, tables)
+            polynomials = conjugacy._minimal_polynomials_shard(representatives)
+            worker_field = conjugacy._worker_field
+        finally:
+            conjugacy._worker_field = None
+
+        self.assertTrue(np.array_equal(minimal_polynomials(field, representatives), polynomials))
+        self.assertTrue(np.shares_memory(shared_view(tables[2]), worker_field.zech_table))
+        self.assertEqual(sum(shared_view(table).nbytes for table in tables), worker_field.nbytes)
+
+    @disable_logging
+    def test_find_next_cycles_after_find_all(self):
+        finder = FastPrimitiveFinder(3, 2)
+        everything = finder.find_all()
+
+        cycled = [finder.find_next() for _ in range(2 * len(everything))]
+
+        self.assertEqual([m.tolist() for m in everything] * 2, [m.tolist() for m in cycled])
+
+    @disable_logging
+    def test_cancelled_search_finds_nothing(self):
+        finder = FastPrimitiveFinder(3, 4)
+        token = CancellationToken()
+        token.cancel()
+
+        with self.assertRaises(OperationCancelled):
+            finder.find_first(cancel_token=token)
+        with self.assertRaises(OperationCancelled):
+            finder.find_next(cancel_token=token)
+        self.assertEqual(companion_polynomial(finder.find_first(), 3).tolist(),
+                         companion_polynomial(FastPrimitiveFinder(3, 4).find_first(), 3).tolist())
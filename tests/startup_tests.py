@@ -0,0 +1,21 @@
+import unittest
+
+from benchmarks.benchmark_suite import LAZY_MODULES, STARTUP_MODULES, measure_startup
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_entry_points_do_not_import_heavy_dependencies(self):
+        for module in STARTUP_MODULES:
+            imported = measure_startup(module, repeat=1)["modules"]
+            for lazy in LAZY_MODULES:
+                self.assertNotIn(lazy, imported, f"{module} imports {lazy}")
+
+    def test_finders_do_not_import_sympy(self):
+        imported = measure_startup("primitive_element_finders.dumb_primitive_element_finder", repeat=1)["modules"]
+        self.assertNotIn("sympy", imported)
+
+    def test_import_time_budget(self):
+        for module, budget in STARTUP_MODULES.items():
+            seconds = measure_startup(module, repeat=3)["seconds"]
+            self.assertLess(seconds, budget, f"importing {module} took {seconds:.3f} s")
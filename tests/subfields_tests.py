@@ -0,0 +1,69 @@
+import unittest
+
+import numpy as np
+
+from finite_fields.subfields import cyclotomic_cosets, element_orders, minimal_polynomial, \
+    minimal_polynomial_table, subfield, subfields
+from primitive_element_finders.primitive_polynomials import is_irreducible
+from tests.fixtures import field_of
+from wrappers.disable_logging import disable_logging
+
+FIELD_SIZES = ((2, 1), (2, 4), (2, 6), (3, 2), (3, 4), (5, 2))
+
+
+def evaluate(field, coefficients, index):
+    """ Value of a polynomial over GF(p) at the element with given index, by Horner's rule. """
+    value = 0
+    for c in reversed(coefficients):
+        value = field.add(field.mul(value, index), int(c))
+    return value
+
+
+class TestSubfields(unittest.TestCase):
+
+    @disable_logging
+    def test_element_orders_match_repeated_multiplication(self):
+        for p, n in FIELD_SIZES:
+            field = field_of(p, n)
+            expected = [0]
+            for index in range(1, field.order):
+                power, order = index, 1
+                while power != 1:
+                    power, order = field.mul(power, index), order + 1
+                expected.append(order)
+            self.assertEqual(expected, element_orders(field).tolist(), (p, n))
+
+    @disable_logging
+    def test_subfields_are_closed_and_have_right_size(self):
+        for p, n in FIELD_SIZES:
+            field = field_of(p, n)
+            found = subfields(field)
+            self.assertEqual([d for d in range(1, n + 1) if n % d == 0], sorted(found))
+            for d, elements in found.items():
+                self.assertEqual(p ** d, len(elements))
+                self.assertTrue(np.all(np.isin(field.add(elements[:, np.newaxis], elements), elements)), (p, n, d))
+                self.assertTrue(np.all(np.isin(field.mul(elements[:, np.newaxis], elements), elements)), (p, n, d))
+                # Elements of GF(p^d) are the roots of x^(p^d) - x.
+                self.assertTrue(np.array_equal(field.pow(elements, p ** d), elements))
+        with self.assertRaises(ValueError):
+            subfield(field_of(2, 4), 3)
+
+    @disable_logging
+    def test_minimal_polynomials_are_irreducible_and_vanish(self):
+        for p, n in FIELD_SIZES:
+            field = field_of(p, n)
+            _, sizes, _ = cyclotomic_cosets(p, n)
+            self.assertEqual(field.order - 1, sizes.sum())
+            polynomials, degrees, class_of = minimal_polynomial_table(field)
+            self.assertEqual(len(polynomials), len(np.unique(class_of)))
+            for index in range(field.order):
+                polynomial = minimal_polynomial(field, index)
+                self.assertEqual(1, polynomial[-1])
+                self.assertTrue(is_irreducible(polynomial, p), (p, n, index))
+                self.assertEqual(0, evaluate(field, polynomial, index), (p, n, index))
+                smallest = min(d for d, elements in subfields(field).items() if index in elements)
+                self.assertEqual(smallest, len(polynomial) - 1, (p, n, index))
+
+
+if __name__ == '__main__':
+    unittest.main()
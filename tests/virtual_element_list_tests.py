@@ -0,0 +1,133 @@
+import unittest
+
+import numpy as np
+
+from gui.tiled_matrix_view import TiledMatrixView
+from gui.virtual_element_list import VirtualElementList
+
+
+class FakeListbox:
+    def __init__(self):
+        self.rows = []
+
+    def config(self, **options):
+        pass
+
+    def bind(self, sequence, callback):
+        pass
+
+    def delete(self, first, last):
+        self.rows = []
+
+    def insert(self, index, *rows):
+        self.rows.extend(rows)
+
+
+class FakeScrollbar:
+    def __init__(self):
+        self.position = None
+
+    def config(self, **options):
+        pass
+
+    def set(self, first, last):
+        self.position = (first, last)
+
+
+class FakeCanvas:
+    def __init__(self, width, height):
+        self.width, self.height = width, height
+        self.x = self.y = 0
+        self.items = {}
+
+    def bind(self, sequence, callback):
+        pass
+
+    def canvasx(self, x):
+        return self.x + x
+
+    def canvasy(self, y):
+        return self.y + y
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def create_text(self, x, y, tags=None, **options):
+        self.items.setdefault(tags or "frame", []).append((x, y, options.get("text")))
+
+    def create_line(self, *args, **options):
+        self.items.setdefault("frame", []).append(args)
+
+    def delete(self, tag):
+        self.items.pop(tag, None)
+
+
+class TestVirtualElementList(unittest.TestCase):
+
+    def test_only_visible_rows_are_loaded(self):
+        listbox, scrollbar = FakeListbox(), FakeScrollbar()
+        loaded = []
+
+        def load_rows(start, stop):
+            loaded.append((start, stop))
+            return [f"row {i}" for i in range(start, stop)]
+
+        elements = VirtualElementList(listbox, scrollbar, visible_rows=10)
+        elements.set_source(10 ** 7, load_rows)
+        self.assertEqual([f"row {i}" for i in range(10)], listbox.rows)
+        self.assertEqual((0, 10 / 10 ** 7), scrollbar.position)
+
+        elements.yview("moveto", 0.5)
+        self.assertEqual(5 * 10 ** 6, elements.top)
+        self.assertEqual("row 5000000", listbox.rows[0])
+
+        elements.yview("scroll", 2, "pages")
+        self.assertEqual(5 * 10 ** 6 + 18, elements.top)
+        elements.yview("moveto", 1.0)
+        self.assertEqual(["row 9999990", "row 9999999"], [listbox.rows[0], listbox.rows[-1]])
+        elements.yview("scroll", -5, "units")
+        self.assertEqual("row 9999985", listbox.rows[0])
+
+        self.assertTrue(all(stop - start <= VirtualElementList.PAGE_SIZE for start, stop in loaded))
+        self.assertLessEqual(len(loaded), 6)
+
+    def test_short_and_empty_lists(self):
+        listbox, scrollbar = FakeListbox(), FakeScrollbar()
+        elements = VirtualElementList(listbox, scrollbar, visible_rows=10)
+
+        elements.set_source(3, lambda start, stop: [str(i) for i in range(start, stop)])
+        elements.yview("scroll", 5, "units")
+        self.assertEqual(["0", "1", "2"], listbox.rows)
+        self.assertEqual((0, 1), scrollbar.position)
+
+        elements.clear()
+        self.assertEqual([], listbox.rows)
+
+
+class TestTiledMatrixView(unittest.TestCase):
+
+    def test_only_visible_tiles_have_items(self):
+        array = np.arange(100 * 100).reshape(100, 100) % 7
+        canvas = FakeCanvas(290, 290)
+        view = TiledMatrixView(canvas, array, cell_size=25, tile_size=8)
+
+        view.render()
+        tiles = {tag for tag in canvas.items if tag.startswith("tile")}
+        self.assertEqual({"tile_0_0", "tile_0_1", "tile_1_0", "tile_1_1"}, tiles)
+        self.assertIn((30, 40 + 12, "0"), canvas.items["tile_0_0"])
+
+        canvas.x, canvas.y = 2000, 1000
+        view.render()
+        tiles = {tag for tag in canvas.items if tag.startswith("tile")}
+        self.assertEqual({f"tile_{r}_{c}" for r in (4, 5, 6) for c in (9, 10, 11)}, tiles)
+        x, y, text = canvas.items["tile_5_10"][0]
+        self.assertEqual(str(array[40, 80]), text)
+        self.assertEqual((80 * 25 + 30, 40 * 25 + 40 + 12), (x, y))
+
+    def test_tiles_are_clipped_to_matrix(self):
+        view = TiledMatrixView(FakeCanvas(290, 290), np.eye(3, dtype=np.int32), tile_size=16)
+
+        self.assertEqual({(0, 0)}, view.visible_tiles(0, 0, 10 ** 4, 10 ** 4))
@@ -0,0 +1,101 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.cancellation import CancellationToken
+
+
+class _Computation:
+    def __init__(self, future, token: CancellationToken):
+        self.future = future
+        self.token = token
+        self.waiters = 0
+
+
+class AsyncPool:
+    """
+    Runs blocking computations of finders and fields for asyncio code on a bounded thread pool.
+    Most of their time is spent in NumPy operations that release the GIL, so the threads overlap.
+
+    run(key, function) is awaited like a coroutine. Calls with the same key that overlap in time
+    share one computation: the later ones wait for the result of the first one. key None is never shared.
+
+    Cancelling an awaiting task cancels only the waiting. When the last task waiting
+    for a computation is cancelled, the computation is cancelled too: a computation that has not started
+    is dropped, and a running one is asked to stop through its CancellationToken, if it was given one.
+    A cancelled computation is not shared with later calls.
+
+    iterate(iterator) turns a blocking iterator into an async one by taking every item in the pool.
+    """
+    def __init__(self, max_workers: int = None):
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1,
+                                             thread_name_prefix="async-pool")
+        self.__running = {}
+        self.__lock = threading.Lock()
+
+    async def run(self, key, function, *args, token: CancellationToken = None):
+        """
+        Calls function(*args) in the pool, or waits for a running call with the same key.
+        :param token: token polled by the function; it is cancelled when every waiting task is cancelled.
+        :return: result of the function; its exception is raised in every waiting task.
+        """
+        with self.__lock:
+            computation = self.__running.get(key) if key is not None else None
+            created = computation is None or computation.token is not None and computation.token.cancelled
+            if created:
+                computation = _Computation(self.__executor.submit(function, *args), token)
+                if key is not None:
+                    self.__running[key] = computation
+            computation.waiters += 1
+        if created and key is not None:
+            computation.future.add_done_callback(lambda _: self.__forget(key, computation))
+        cancelled = False
+        try:
+            # shield() keeps the shared future alive when one of the waiting tasks is cancelled.
+            return await asyncio.shield(asyncio.wrap_future(computation.future))
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            with self.__lock:
+                computation.waiters -= 1
+                if cancelled and computation.waiters == 0:
+                    computation.future.cancel()
+                    if computation.token is not None:
+                        computation.token.cancel()
+                    if key is not None and self.__running.get(key) is computation:
+                        del self.__running[key]
+
+    async def iterate(self, iterator):
+        """
+        Async generator of items of a blocking iterator, every next() is called in the pool.
+        The iterator is not touched after the consuming task is cancelled.
+        """
+        done = object()
+        while True:
+            item = await self.run(None, next, iterator, done)
+            if item is done:
+                return
+            yield item
+
+    def shutdown(self, wait: bool = True):
+        self.__executor.shutdown(wait=wait, cancel_futures=True)
+
+    def __forget(self, key, computation):
+        with self.__lock:
+            if self.__running.get(key) is computation:
+                del self.__running[key]
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def shared_async_pool() -> AsyncPool:
+    """ Process-wide pool used by async methods of finders and fields by default, one thread per CPU. """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = AsyncPool()
+        return _shared_pool
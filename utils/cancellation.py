@@ -0,0 +1,25 @@
+import threading
+
+
+class OperationCancelled(Exception):
+    """ Raised by long operations when their CancellationToken is cancelled. """
+
+
+class CancellationToken:
+    """
+    Thread-safe flag that asks a long operation to stop.
+    The operation polls it with raise_if_cancelled() at convenient points.
+    """
+    def __init__(self):
+        self.__event = threading.Event()
+
+    def cancel(self):
+        self.__event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.__event.is_set()
+
+    def raise_if_cancelled(self):
+        if self.__event.is_set():
+            raise OperationCancelled()
@@ -0,0 +1,32 @@
+from utils.number_theory import prime_power
+
+
+class NotPrimePowerError(ValueError):
+    """ Raised by parse_field_size when the size is a number, but not a power of a prime number. """
+    def __init__(self, num: int):
+        super().__init__(f"{num} is not a power of a prime number")
+        self.num = num
+
+
+def parse_field_size(text: str):
+    """
+    Parses size of a finite field written as "p^n" or as a decimal prime power.
+    :return: tuple (p, n).
+    :raise ValueError: if text is not of form p^n or a decimal number.
+    :raise NotPrimePowerError: if the number is not a power of a prime number.
+    """
+    text = text.strip()
+    if '^' in text:
+        parts = text.split('^')
+        if len(parts) != 2 or not all(part.strip().isdecimal() for part in parts):
+            raise ValueError(f"{text} is not of form p^n")
+        num = int(parts[0]) ** int(parts[1])
+    elif text.isdecimal():
+        num = int(text)
+    else:
+        raise ValueError(f"{text} is not of form p^n")
+
+    decomposition = prime_power(num)
+    if decomposition is None:
+        raise NotPrimePowerError(num)
+    return decomposition
@@ -0,0 +1,148 @@
+"""
+Timing spans and counters for profiling the pipeline.
+
+Instrumentation is disabled by default: span() returns a shared no-op context manager
+and count() returns immediately, so instrumented hot paths cost one global lookup.
+After enable() spans and counters are recorded by a Tracer, which exports them
+in the Chrome trace event format (chrome://tracing, Perfetto, speedscope):
+
+    with tracing("trace.json"):
+        FastPrimitiveFinder(2, 16).find_all()
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("_tracer", "_name", "_args", "_start")
+
+    def __init__(self, tracer, name, args):
+        self._tracer = tracer
+        self._name = name
+        self._args = args
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self._tracer.record(self._name, self._start, time.perf_counter_ns(), self._args)
+        return False
+
+
+class Tracer:
+    """ Thread-safe recorder of finished spans and totals of counters. """
+    def __init__(self):
+        self.__origin = time.perf_counter_ns()
+        self.__events = []
+        self.__counters = {}
+        self.__lock = threading.Lock()
+
+    def span(self, name: str, args: dict = None):
+        return _Span(self, name, args)
+
+    def record(self, name: str, start_ns: int, end_ns: int, args: dict = None):
+        event = {"name": name, "ph": "X", "ts": (start_ns - self.__origin) / 1000, "dur": (end_ns - start_ns) / 1000,
+                 "pid": os.getpid(), "tid": threading.get_ident()}
+        if args:
+            event["args"] = args
+        with self.__lock:
+            self.__events.append(event)
+
+    def count(self, name: str, value: int = 1):
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + value
+
+    @property
+    def counters(self) -> dict:
+        with self.__lock:
+            return dict(self.__counters)
+
+    @property
+    def events(self) -> list:
+        with self.__lock:
+            return list(self.__events)
+
+    def summary(self) -> dict:
+        """ Number of calls and total seconds of every span name. """
+        result = {}
+        for event in self.events:
+            calls, seconds = result.get(event["name"], (0, 0.0))
+            result[event["name"]] = (calls + 1, seconds + event["dur"] / 1e6)
+        return {name: {"calls": calls, "seconds": seconds} for name, (calls, seconds) in result.items()}
+
+    def to_chrome_trace(self) -> dict:
+        """ Trace in the Chrome trace event format, counters are added as counter events at the end. """
+        events = self.events
+        end = max((event["ts"] + event["dur"] for event in events), default=0)
+        counters = [{"name": name, "ph": "C", "ts": end, "pid": os.getpid(), "args": {"value": value}}
+                    for name, value in sorted(self.counters.items())]
+        return {"traceEvents": events + counters, "displayTimeUnit": "ms"}
+
+    def write(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.to_chrome_trace(), file)
+
+
+_tracer: Tracer = None
+
+
+def enable(tracer: Tracer = None) -> Tracer:
+    """ Starts recording spans and counters into tracer (a new one by default). """
+    global _tracer
+    _tracer = tracer if tracer is not None else Tracer()
+    return _tracer
+
+
+def disable() -> Tracer:
+    """ Stops recording. :return: the tracer that was recording, or None. """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def current_tracer() -> Tracer:
+    return _tracer
+
+
+def span(name: str, **args):
+    """ Context manager that records its duration under name while instrumentation is enabled. """
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return tracer.span(name, args)
+
+
+def count(name: str, value: int = 1):
+    """ Adds value to the counter name while instrumentation is enabled. """
+    tracer = _tracer
+    if tracer is not None:
+        tracer.count(name, value)
+
+
+@contextmanager
+def tracing(path: str = None):
+    """ Enables instrumentation inside the block and writes the trace to path (if given) on exit. """
+    tracer = enable()
+    try:
+        yield tracer
+    finally:
+        disable()
+        if path is not None:
+            tracer.write(path)
@@ -1,20 +1,12 @@
-import math
+from utils import number_theory
 
 
 def is_prime(num):
-    if num < 2:
-        return False
-    for i in range(2, int(math.sqrt(num)) + 1):
-        if num % i == 0:
-            return False
-    return True
+    return number_theory.is_prime(num)
 
 
 def is_prime_power(n):
     if n < 1:
         return False
-    for k in range(1, int(math.log2(n)) + 1):
-        p = round(n ** (1 / k))
-        if p ** k == n and is_prime(p):
-            return p
-    return -1
\ No newline at end of file
+    decomposition = number_theory.prime_power(n)
+    return decomposition[0] if decomposition is not None else -1
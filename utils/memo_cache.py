@@ -0,0 +1,148 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def estimate_nbytes(value) -> int:
+    """ Memory used by a cached value: nbytes of arrays (and of objects that report nbytes), summed over tuples. """
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_nbytes(item) for item in value)
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, (int, np.integer)):
+        return int(nbytes)
+    return sys.getsizeof(value)
+
+
+class MemoCache:
+    """
+    Bounded thread-safe memoization cache with LRU eviction by memory budget.
+
+    get_or_create(key, factory) returns the cached value or calls factory() to create it.
+    Creation is single-flight: while one thread creates a value, other threads asking
+    for the same key wait for it instead of creating a duplicate. If creation fails, the error
+    is raised in the creating thread and one of the waiting threads tries again.
+
+    Values bigger than the whole budget are returned but not kept.
+    The budget bounds only the references held by the cache: an evicted value stays in memory
+    while its users (for example FiniteField objects, which keep their tables) still refer to it.
+    Hits, misses and evictions are counted, see stats().
+    """
+    def __init__(self, max_bytes: int = 1 << 30, sizeof=estimate_nbytes):
+        self.__max_bytes = max_bytes
+        self.__sizeof = sizeof
+        self.__entries = OrderedDict()
+        self.__in_flight = {}
+        self.__bytes = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__lock = threading.Lock()
+
+    @property
+    def max_bytes(self):
+        return self.__max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value: int):
+        with self.__lock:
+            self.__max_bytes = value
+            self.__evict()
+
+    def get(self, key, default=None):
+        with self.__lock:
+            if key in self.__entries:
+                self.__entries.move_to_end(key)
+                self.__hits += 1
+                return self.__entries[key][0]
+            self.__misses += 1
+            return default
+
+    def put(self, key, value):
+        size = self.__sizeof(value)
+        with self.__lock:
+            self.__put(key, value, size)
+
+    def get_or_create(self, key, factory):
+        while True:
+            with self.__lock:
+                if key in self.__entries:
+                    self.__entries.move_to_end(key)
+                    self.__hits += 1
+                    return self.__entries[key][0]
+                event = self.__in_flight.get(key)
+                if event is None:
+                    event = self.__in_flight[key] = threading.Event()
+                    self.__misses += 1
+                    break
+            event.wait()
+
+        try:
+            value = factory()
+            size = self.__sizeof(value)
+            with self.__lock:
+                self.__put(key, value, size)
+            return value
+        finally:
+            with self.__lock:
+                del self.__in_flight[key]
+            event.set()
+
+    def discard(self, key):
+        with self.__lock:
+            if key in self.__entries:
+                self.__bytes -= self.__entries.pop(key)[1]
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.__bytes = 0
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {"hits": self.__hits, "misses": self.__misses, "evictions": self.__evictions,
+                    "entries": len(self.__entries), "bytes": self.__bytes, "max_bytes": self.__max_bytes}
+
+    def __contains__(self, key):
+        with self.__lock:
+            return key in self.__entries
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__entries)
+
+    def __put(self, key, value, size):
+        if key in self.__entries:
+            self.__bytes -= self.__entries.pop(key)[1]
+        if size > self.__max_bytes:
+            return
+        self.__entries[key] = (value, size)
+        self.__bytes += size
+        self.__evict()
+
+    def __evict(self):
+        while self.__bytes > self.__max_bytes and self.__entries:
+            _, (_, size) = self.__entries.popitem(last=False)
+            self.__bytes -= size
+            self.__evictions += 1
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def shared_memo_cache() -> MemoCache:
+    """ Process-wide cache used by finders and fields by default. Its budget can be changed with max_bytes. """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = MemoCache(max_bytes=1 << 30)
+        return _shared_cache
+
+
+def array_key(kind: str, p: int, n: int, matrix: np.ndarray = None) -> tuple:
+    """ Cache key of an object determined by p, n and optionally a matrix (primitive element). """
+    if matrix is None:
+        return kind, p, n
+    return kind, p, n, np.ascontiguousarray(matrix, dtype=np.int64).tobytes()
@@ -0,0 +1,144 @@
+import math
+import random
+from functools import lru_cache
+
+# Miller–Rabin with these bases is deterministic for every n < 2^64 (Sinclair's set)...
+_WITNESSES_64 = (2, 325, 9375, 28178, 450775, 9780504, 1795265022)
+# ...and with these ones for every n < 3.3·10^24. For bigger n it is a strong probable prime test.
+_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+_SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97)
+
+
+def is_prime(n: int) -> bool:
+    """ Deterministic Miller–Rabin primality test for n < 3.3·10^24. """
+    if n < 2:
+        return False
+    for q in _SMALL_PRIMES:
+        if n % q == 0:
+            return n == q
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in _WITNESSES_64 if n < 1 << 64 else _WITNESSES:
+        a %= n
+        if a == 0:
+            continue
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def integer_root(n: int, k: int) -> int:
+    """
+    Exact floor of the k-th root of a non-negative integer, computed by integer Newton iteration.
+    """
+    if n < 0 or k < 1:
+        raise ValueError("integer_root needs n >= 0 and k >= 1")
+    if n < 2 or k == 1:
+        return n
+    x = 1 << -(-n.bit_length() // k)
+    while True:
+        y = ((k - 1) * x + n // x ** (k - 1)) // k
+        if y >= x:
+            return x
+        x = y
+
+
+def prime_power(n: int):
+    """
+    Decomposes a prime power.
+    :return: tuple (p, k) with n = p^k and prime p, or None if n is not a prime power.
+    """
+    if n < 2:
+        return None
+    if n % 2 == 0:
+        k = (n & -n).bit_length() - 1
+        return (2, k) if n == 1 << k else None
+    if is_prime(n):
+        return n, 1
+    # n = r^q for a prime q, then r is decomposed in turn.
+    for q in range(2, n.bit_length() + 1):
+        if not is_prime(q):
+            continue
+        r = integer_root(n, q)
+        if r ** q == n:
+            root = prime_power(r)
+            return None if root is None else (root[0], root[1] * q)
+    return None
+
+
+def _pollard_rho(n: int) -> int:
+    """ Nontrivial divisor of an odd composite n (Brent's variant with batched gcd). """
+    rng = random.Random(n)
+    while True:
+        y, c, m = rng.randrange(1, n), rng.randrange(1, n), 128
+        g = r = q = 1
+        x = ys = y
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += m
+            r *= 2
+        if g == n:
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+        if g != n:
+            return g
+
+
+@lru_cache(maxsize=1024)
+def factorize(n: int) -> tuple:
+    """
+    Memoized factorization by trial division by small primes and Pollard's rho.
+    :return: sorted tuple of pairs (prime, exponent).
+    """
+    if n < 1:
+        raise ValueError("factorize needs a positive integer")
+    factors = {}
+    for q in _SMALL_PRIMES:
+        while n % q == 0:
+            factors[q] = factors.get(q, 0) + 1
+            n //= q
+    stack = [n] if n > 1 else []
+    while stack:
+        m = stack.pop()
+        if is_prime(m):
+            factors[m] = factors.get(m, 0) + 1
+            continue
+        root = prime_power(m)
+        if root is not None:
+            factors[root[0]] = factors.get(root[0], 0) + root[1]
+            continue
+        d = _pollard_rho(m)
+        stack += [d, m // d]
+    return tuple(sorted(factors.items()))
+
+
+def prime_factors(n: int) -> tuple:
+    """ Sorted tuple of distinct prime divisors of n. """
+    return tuple(q for q, _ in factorize(n))
+
+
+def euler_phi(n: int) -> int:
+    result = n
+    for q in prime_factors(n):
+        result = result // q * (q - 1)
+    return result
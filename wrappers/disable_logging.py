@@ -2,10 +2,10 @@ from utils.logger import logging, logger
 
 
 def disable_logging(f):
-    def wrapper(*args):
+    def wrapper(*args, **kwargs):
         logging.disable(logging.CRITICAL)
         try:
-            result = f(*args)
+            result = f(*args, **kwargs)
         finally:
             logging.disable(logging.NOTSET)
         return result
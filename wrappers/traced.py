@@ -0,0 +1,16 @@
+import functools
+
+from utils import instrumentation
+
+
+def traced(name: str):
+    """ Records every call of the decorated function as a span (see utils.instrumentation). """
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            if instrumentation.current_tracer() is None:
+                return f(*args, **kwargs)
+            with instrumentation.span(name):
+                return f(*args, **kwargs)
+        return wrapper
+    return decorator